@@ -0,0 +1,127 @@
+"""Row insert throughput of crawl records: ORM writes versus the bulk loader.
+
+Writes the crawl history of synthetic pages (a recently_crawled_urls row for
+every URL of a page's redirect chain and a url_revisit_schedule row per page)
+twice: page by page through mark_crawled and record_crawl, the ORM path the
+crawl job used before, and in batches through bulk_record_crawls. Half of the
+pages of each run are re-crawls of known URLs, so both runs insert and update.
+Reports rows/sec of each path and their ratio as JSON.
+
+Runs against a throwaway SQLite database (executemany path) unless
+--database-url is given; on PostgreSQL with psycopg2 or psycopg 3 the bulk path
+uses COPY. The tables must exist there (alembic upgrade head) and are emptied.
+
+Usage: poetry run python -m benchmarks.bulk_load [--pages N] [--batch-size N]
+       [--redirect-rate FRACTION] [--database-url URL] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import datetime
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.common import configure_environment, create_tables, write_results
+
+
+def make_records(pages: int, redirect_rate: float, prefix: str, crawled_at: datetime.datetime):
+    from nds_crawler_svc.service.bulk_load import CrawlRecord
+
+    records = []
+    for i in range(pages):
+        url = f"http://example.com/{prefix}/{i % (pages // 2 or 1)}"
+        chain = [url, f"{url}/moved"] if i % 100 < redirect_rate * 100 else [url]
+        content_hash = hashlib.sha256(f"{url}-{i}".encode()).hexdigest()
+        records.append(CrawlRecord(url, chain, content_hash, crawled_at + datetime.timedelta(seconds=i)))
+    return records
+
+
+def row_count(records) -> int:
+    return sum(len(record.chain) + 1 for record in records)
+
+
+def write_orm(records, session) -> None:
+    from nds_crawler_svc.service.deduplication import mark_crawled
+    from nds_crawler_svc.service.recrawl import record_crawl
+
+    for record in records:
+        mark_crawled(record.chain, session, now=record.crawled_at)
+        record_crawl(record.url, record.content_hash, session, now=record.crawled_at)
+
+
+def write_bulk(records, session, batch_size: int) -> None:
+    from nds_crawler_svc.service.bulk_load import bulk_record_crawls
+
+    for start in range(0, len(records), batch_size):
+        bulk_record_crawls(records[start:start + batch_size], session)
+
+
+def clear_tables(session) -> None:
+    from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
+    from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+
+    session.query(RecentlyCrawledUrl).delete()
+    session.query(UrlRevisitSchedule).delete()
+    session.commit()
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500, help="Pages per bulk_record_crawls call")
+    parser.add_argument("--redirect-rate", type=float, default=0.2,
+                        help="Fraction of pages reached through a redirect")
+    parser.add_argument("--database-url", help="Benchmark this database instead of a temporary SQLite file")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        else:
+            configure_environment(tmp_dir)
+            create_tables()
+        from nds_crawler_svc.models.base import SessionLocal, get_engine
+
+        session = SessionLocal()
+        try:
+            clear_tables(session)
+            start = datetime.datetime(2026, 1, 1)
+            orm_records = make_records(args.pages, args.redirect_rate, "orm", start)
+            bulk_records = make_records(args.pages, args.redirect_rate, "bulk", start)
+            orm_seconds = timed(write_orm, orm_records, session)
+            bulk_seconds = timed(write_bulk, bulk_records, session, args.batch_size)
+            clear_tables(session)
+        finally:
+            session.close()
+        engine = get_engine()
+        parameters = {
+            "pages": args.pages,
+            "batch_size": args.batch_size,
+            "redirect_rate": args.redirect_rate,
+            "dialect": engine.dialect.name,
+            "driver": engine.dialect.driver,
+        }
+
+    orm_rows_per_sec = row_count(orm_records) / orm_seconds
+    bulk_rows_per_sec = row_count(bulk_records) / bulk_seconds
+    results = {
+        "rows": row_count(bulk_records),
+        "orm": {"seconds": round(orm_seconds, 3), "rows_per_sec": round(orm_rows_per_sec)},
+        "bulk": {"seconds": round(bulk_seconds, 3), "rows_per_sec": round(bulk_rows_per_sec)},
+        "speedup": round(bulk_rows_per_sec / orm_rows_per_sec, 1),
+    }
+    write_results("bulk_load", parameters, results, args.output, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Helpers shared by the benchmark scripts: process metrics and JSON result files."""
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from nds_crawler_svc.stats import percentile  # noqa: F401 - shared with the service
+
+
+def configure_environment(tmp_dir: str) -> None:
+    """Point the service at a throwaway SQLite database before nds_crawler_svc is imported."""
+    if "nds_crawler_svc.config" in sys.modules:
+        raise RuntimeError("configure_environment() must run before nds_crawler_svc is imported")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+
+
+def create_tables() -> None:
+    from nds_crawler_svc import models  # noqa: F401 - registers every table on Base
+    from nds_crawler_svc.models.base import Base, engine
+    Base.metadata.create_all(engine)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def open_sockets() -> int:
+    """Number of sockets open in this process, or -1 where /proc is unavailable."""
+    fd_dir = "/proc/self/fd"
+    if not os.path.isdir(fd_dir):
+        return -1
+    count = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).startswith("socket:"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(name: str, parameters: dict, results, output: str = None, baseline: str = None) -> dict:
+    """Print the benchmark report as JSON and optionally save it for comparison with later commits.
+
+    With a baseline report, numeric metrics that both reports share at the same
+    position are also reported as ratios of the current value to the baseline.
+    """
+    report = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "results": results,
+    }
+    if baseline:
+        with open(baseline) as f:
+            previous = json.load(f)
+        report["baseline_commit"] = previous.get("commit")
+        report["ratio_to_baseline"] = _ratios(results, previous.get("results"))
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def _ratios(current, previous):
+    if isinstance(current, dict) and isinstance(previous, dict):
+        ratios = {k: _ratios(v, previous[k]) for k, v in current.items() if k in previous}
+        return {k: v for k, v in ratios.items() if v is not None}
+    if isinstance(current, list) and isinstance(previous, list):
+        return [_ratios(c, p) for c, p in zip(current, previous)]
+    if isinstance(current, (int, float)) and isinstance(previous, (int, float)) \
+            and not isinstance(current, bool) and previous:
+        return round(current / previous, 3)
+    return None
@@ -0,0 +1,162 @@
+"""End-to-end crawl throughput against a local synthetic website.
+
+Crawls the mock site (see benchmarks.mock_site) either by awaiting
+start_crawling_job directly ("job") or through the /submit endpoint ("submit"),
+and reports pages/sec, fetch-to-store latency percentiles, peak RSS, peak open
+sockets and event-loop lag as JSON.
+
+Usage: poetry run python -m benchmarks.crawl [--mode job|submit|both] [--fanout N] [--depth N]
+       [--page-size BYTES] [--latency SECONDS] [--error-rate FRACTION] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from dataclasses import asdict
+
+from benchmarks.common import (
+    configure_environment,
+    create_tables,
+    open_sockets,
+    peak_rss_bytes,
+    percentile,
+    write_results,
+)
+from benchmarks.mock_site import MockSite, SiteShape
+
+# Interval of the event-loop lag probe in seconds
+LAG_PROBE_INTERVAL = 0.01
+
+
+class CrawlProbe:
+    """Instruments the crawler to time every page from the start of its fetch until it is stored."""
+
+    def __init__(self):
+        self.fetch_started = {}
+        self.latencies = []
+        self.stored = 0
+        self.loop_lags = []
+        self.peak_sockets = 0
+
+    def install(self) -> None:
+        from nds_crawler_svc import crawling_job
+        from nds_crawler_svc.service.retry_policy import retry_policy
+
+        fetch = retry_policy.fetch
+        store = crawling_job.store_crawled_data
+
+        async def timed_fetch(client, url, *args, **kwargs):
+            self.fetch_started.setdefault(url, time.perf_counter())
+            return await fetch(client, url, *args, **kwargs)
+
+        def timed_store(job_id, data):
+            result = store(job_id, data)
+            started = self.fetch_started.pop(data["url"], None)
+            if started is not None:
+                self.latencies.append(time.perf_counter() - started)
+            self.stored += 1
+            return result
+
+        retry_policy.fetch = timed_fetch
+        crawling_job.store_crawled_data = timed_store
+        self._originals = (fetch, store)
+
+    def uninstall(self) -> None:
+        from nds_crawler_svc import crawling_job
+        from nds_crawler_svc.service.retry_policy import retry_policy
+
+        del retry_policy.fetch
+        crawling_job.store_crawled_data = self._originals[1]
+
+    async def monitor_loop(self) -> None:
+        """Record how late the loop wakes a sleeping task, and sample open sockets."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.loop_lags.append(max(0.0, time.perf_counter() - start - LAG_PROBE_INTERVAL))
+            self.peak_sockets = max(self.peak_sockets, open_sockets())
+
+
+async def _wait_for_crawl(*exclude: asyncio.Task) -> None:
+    """Wait until every task spawned by the crawl has finished."""
+    while True:
+        pending = asyncio.all_tasks() - {asyncio.current_task(), *exclude}
+        if not pending:
+            return
+        await asyncio.wait(pending)
+
+
+async def run_crawl(mode: str, site: MockSite) -> dict:
+    from nds_crawler_svc.crawling_job import start_crawling_job
+
+    probe = CrawlProbe()
+    probe.install()
+    monitor = asyncio.create_task(probe.monitor_loop())
+    start = time.perf_counter()
+    try:
+        if mode == "job":
+            await start_crawling_job(site.root_url)
+        else:
+            import httpx
+            from nds_crawler_svc.app import app
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                response = await client.post("/submit", json={"urls": [site.root_url]})
+                response.raise_for_status()
+            await _wait_for_crawl(monitor)
+        elapsed = time.perf_counter() - start
+    finally:
+        monitor.cancel()
+        probe.uninstall()
+
+    return {
+        "mode": mode,
+        "pages_expected": site.shape.page_count(),
+        "pages_stored": probe.stored,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(probe.stored / elapsed, 2) if elapsed else 0.0,
+        "fetch_to_store_seconds": {
+            "p50": round(percentile(probe.latencies, 0.5), 5),
+            "p99": round(percentile(probe.latencies, 0.99), 5),
+        },
+        "loop_lag_seconds": {
+            "p50": round(percentile(probe.loop_lags, 0.5), 5),
+            "p99": round(percentile(probe.loop_lags, 0.99), 5),
+            "max": round(max(probe.loop_lags, default=0.0), 5),
+        },
+        "peak_open_sockets": probe.peak_sockets,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("job", "submit", "both"), default="both")
+    for field, value in asdict(SiteShape()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    shape = SiteShape(args.fanout, args.depth, args.page_size, args.latency, args.error_rate)
+    modes = ("job", "submit") if args.mode == "both" else (args.mode,)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        configure_environment(tmp_dir)
+        create_tables()
+        from nds_crawler_svc import storage
+        storage.STORAGE_DIR = tmp_dir
+
+        results = []
+        for mode in modes:
+            # A fresh site per run so that each mode crawls URLs it has not seen
+            with MockSite(shape) as site:
+                results.append(asyncio.run(run_crawl(mode, site)))
+
+    write_results("crawl", asdict(shape), results, args.output, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
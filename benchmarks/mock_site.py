@@ -0,0 +1,123 @@
+"""Synthetic website served locally for end-to-end crawl benchmarks.
+
+Pages form a tree: /page/<depth>/<index> links to `fanout` children on the next
+level until `depth` is reached. Each response is padded to `page_size` bytes,
+delayed by `latency` seconds and fails with a 503 with probability `error_rate`.
+The server runs in a child process so its sockets and memory do not count
+towards the crawler's metrics.
+
+Usage: poetry run python -m benchmarks.mock_site [--port N] [--fanout N] [--depth N] ...
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import time
+from dataclasses import asdict, dataclass
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, Response
+from starlette.routing import Route
+
+
+@dataclass
+class SiteShape:
+    fanout: int = 5
+    depth: int = 3
+    page_size: int = 16 * 1024
+    latency: float = 0.01
+    error_rate: float = 0.0
+
+    def page_count(self) -> int:
+        return sum(self.fanout ** level for level in range(self.depth + 1))
+
+
+def render_page(shape: SiteShape, base_url: str, depth: int, index: int) -> str:
+    links = ""
+    if depth < shape.depth:
+        links = "".join(
+            f'<li><a href="{base_url}page/{depth + 1}/{index * shape.fanout + k}">child {k}</a></li>'
+            for k in range(shape.fanout)
+        )
+    head = f"<html><head><title>Page {depth}/{index}</title></head><body><ul>{links}</ul>"
+    tail = "</body></html>"
+    padding = max(0, shape.page_size - len(head) - len(tail) - 7)
+    return f"{head}<p>{'x' * padding}</p>{tail}"
+
+
+def build_app(shape: SiteShape) -> Starlette:
+    async def page(request):
+        if shape.latency:
+            await asyncio.sleep(shape.latency)
+        if shape.error_rate and random.random() < shape.error_rate:
+            return Response("unavailable", status_code=503)
+        depth = int(request.path_params["depth"])
+        index = int(request.path_params["index"])
+        if depth > shape.depth or index >= shape.fanout ** depth:
+            return Response("not found", status_code=404)
+        # Absolute links, so the crawler does not need to resolve relative ones
+        return HTMLResponse(render_page(shape, str(request.base_url), depth, index))
+
+    return Starlette(routes=[Route("/page/{depth:int}/{index:int}", page)])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(shape: SiteShape, port: int) -> None:
+    uvicorn.run(build_app(shape), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+class MockSite:
+    """Context manager running the synthetic site in a child process."""
+
+    def __init__(self, shape: SiteShape, port: int = 0):
+        self.shape = shape
+        self.port = port or free_port()
+        self._process = None
+
+    @property
+    def root_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/page/0/0"
+
+    def __enter__(self) -> "MockSite":
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_serve, args=(self.shape, self.port), daemon=True
+        )
+        self._process.start()
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                httpx.get(f"http://127.0.0.1:{self.port}/page/0/0", timeout=1)
+                return self
+            except httpx.TransportError:
+                time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Mock site did not start")
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(5)
+            self._process = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8800)
+    for field, value in asdict(SiteShape()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    shape = SiteShape(args.fanout, args.depth, args.page_size, args.latency, args.error_rate)
+    print(f"Serving {shape.page_count()} pages at http://127.0.0.1:{args.port}/page/0/0")
+    _serve(shape, args.port)
+
+
+if __name__ == "__main__":
+    main()
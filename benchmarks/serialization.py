@@ -0,0 +1,52 @@
+"""Compare records per second for each installed JSON backend.
+
+Usage: poetry run python -m benchmarks.serialization [--records N] [--content-size BYTES]
+"""
+import argparse
+import json
+import time
+
+from nds_crawler_svc import serialization
+
+
+def make_record(i: int, content_size: int) -> dict:
+    return {
+        "url": f"http://example.com/page/{i}",
+        "title": f"Page {i}",
+        "metadata": {"status": 200, "depth": i % 6, "content_type": "text/html"},
+        "content": ("lorem ipsum dolor sit amet " * (content_size // 27 + 1))[:content_size],
+        "links": [f"http://example.com/page/{i}/{j}" for j in range(40)],
+    }
+
+
+def bench_backend(name: str, records: list) -> dict:
+    dumps, loads = serialization.BACKENDS[name]
+    start = time.perf_counter()
+    encoded = [dumps(record) for record in records]
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for payload in encoded:
+        loads(payload)
+    decode_seconds = time.perf_counter() - start
+
+    return {
+        "backend": name,
+        "encode_records_per_sec": round(len(records) / encode_seconds),
+        "decode_records_per_sec": round(len(records) / decode_seconds),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--content-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    records = [make_record(i, args.content_size) for i in range(args.records)]
+    results = [bench_backend(name, records) for name in serialization.BACKENDS]
+    print(json.dumps({"records": args.records, "content_size": args.content_size, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
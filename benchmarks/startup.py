@@ -0,0 +1,135 @@
+"""Cold-start cost of the service: import time and time to the first ready response.
+
+Each run starts a fresh interpreter. "import" runs time the import of
+nds_crawler_svc.app and report which heavy modules it loaded; "serve" runs
+launch uvicorn on a free port and poll /ready, reporting the time from process
+spawn to the first HTTP response and to the first 200 from /ready. The
+interpreter's own start-up time is reported for reference.
+
+Usage: poetry run python -m benchmarks.startup [--runs N] [--timeout SECONDS] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import percentile, write_results
+
+# Modules whose presence after import shows whether optional work was deferred
+WATCHED_MODULES = ("bs4", "sqlalchemy.dialects.postgresql", "charset_normalizer")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import nds_crawler_svc.app
+seconds = time.perf_counter() - start
+from nds_crawler_svc.models import base
+print(json.dumps({{
+    "seconds": seconds,
+    "modules": len(sys.modules),
+    "loaded": [name for name in {WATCHED_MODULES!r} if name in sys.modules],
+    "engine_created": base._engine is not None,
+}}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def service_env(tmp_dir: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, ["src", env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_interpreter() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def measure_import(env: dict) -> dict:
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_serve(env: dict, timeout: float) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/ready"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "nds_crawler_svc.app:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = None
+    ready = None
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except OSError:
+                time.sleep(0.005)
+                continue
+            now = time.perf_counter() - start
+            first_response = first_response if first_response is not None else now
+            if status == 200:
+                ready = now
+                break
+            time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait()
+    return {"first_response_seconds": first_response, "ready_seconds": ready}
+
+
+def summarize(samples) -> dict:
+    samples = [sample for sample in samples if sample is not None]
+    return {
+        "p50": round(percentile(samples, 0.5), 4),
+        "max": round(max(samples, default=0.0), 4),
+        "failed": 0 if samples else 1,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for /ready per run")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = service_env(tmp_dir)
+        interpreter = [measure_interpreter() for _ in range(args.runs)]
+        imports = [measure_import(env) for _ in range(args.runs)]
+        serves = [measure_serve(env, args.timeout) for _ in range(args.runs)]
+
+    results = {
+        "interpreter_seconds": summarize(interpreter),
+        "import_seconds": summarize([run["seconds"] for run in imports]),
+        "modules_loaded": imports[-1]["modules"],
+        "deferred_modules_loaded": imports[-1]["loaded"],
+        "engine_created_at_import": imports[-1]["engine_created"],
+        "first_response_seconds": summarize([run["first_response_seconds"] for run in serves]),
+        "ready_seconds": summarize([run["ready_seconds"] for run in serves]),
+    }
+    write_results("startup", {"runs": args.runs}, results, args.output, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Storage and /results pagination at scale.
+
+For each record count, writes synthetic records with store_crawled_data into a
+temporary storage directory, then measures cold reads of the first and last
+/results pages (offset pagination) and of a mid-job page (cursor pagination),
+and the wall time of cleanup_old_data with half of the records past retention.
+Reads and cleanup also report peak Python heap allocation via tracemalloc.
+
+Usage: poetry run python -m benchmarks.storage [--sizes 10000,100000,1000000] [--limit N]
+       [--content-size BYTES] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import peak_rss_bytes, write_results
+from nds_crawler_svc import storage
+from nds_crawler_svc.result_cache import result_cache
+from nds_crawler_svc.routers.results import get_crawl_results
+
+JOB_ID = "benchmark"
+
+
+def make_record(i: int, content_size: int) -> dict:
+    return {
+        "url": f"http://example.com/page/{i}",
+        "title": f"Page {i}",
+        "metadata": {"status": 200, "depth": i % 6},
+        "content": ("lorem ipsum dolor sit amet " * (content_size // 27 + 1))[:content_size],
+    }
+
+
+def measure(func, *args, **kwargs) -> dict:
+    """Run func once and return its wall time and peak traced Python allocation."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 4), "peak_alloc_bytes": peak}
+
+
+def read_page(page: int = 1, cursor: str = None, limit: int = 100) -> bytes:
+    # Clear the page cache so every read goes to disk
+    result_cache.clear()
+    response = get_crawl_results(JOB_ID, page=page, cursor=cursor, limit=limit, fields=None, if_none_match=None)
+    return response.body
+
+
+def bench_size(records: int, limit: int, content_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage.STORAGE_DIR = tmp_dir
+        directory = os.path.join(tmp_dir, JOB_ID)
+
+        start = time.perf_counter()
+        for i in range(records):
+            storage.store_crawled_data(JOB_ID, make_record(i, content_size))
+        write_seconds = time.perf_counter() - start
+
+        names = sorted(n for n in os.listdir(directory) if storage.record_key(n) is not None)
+        # Records written within the same microsecond share a filename; report what survived
+        on_disk = len(names)
+        total_pages = max(1, (on_disk + limit - 1) // limit)
+        mid_cursor = storage.record_key(names[on_disk // 2]) if names else None
+
+        reads = {
+            "page_1": measure(read_page, 1, None, limit),
+            "page_last": measure(read_page, total_pages, None, limit),
+            "cursor_mid": measure(read_page, 1, mid_cursor, limit),
+        }
+
+        # Age the older half past the 30 day retention so cleanup deletes it
+        aged = time.time() - 31 * 24 * 3600
+        for name in names[:on_disk // 2]:
+            os.utime(os.path.join(directory, name), (aged, aged))
+            header = os.path.join(directory, storage.record_key(name) + storage.HEADER_EXTENSION)
+            if os.path.exists(header):
+                os.utime(header, (aged, aged))
+        cleanup = measure(storage.cleanup_old_data)
+
+        return {
+            "records": records,
+            "records_on_disk": on_disk,
+            "write_seconds": round(write_seconds, 3),
+            "writes_per_sec": round(records / write_seconds) if write_seconds else 0,
+            "read": reads,
+            "cleanup": cleanup,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="Comma separated record counts")
+    parser.add_argument("--limit", type=int, default=100, help="Page size of /results reads")
+    parser.add_argument("--content-size", type=int, default=2048)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = [bench_size(size, args.limit, args.content_size) for size in sizes]
+    parameters = {
+        "sizes": sizes,
+        "limit": args.limit,
+        "content_size": args.content_size,
+        "compression": storage.COMPRESSION,
+    }
+    write_results("storage", parameters, results, args.output, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
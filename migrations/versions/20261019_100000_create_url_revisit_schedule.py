@@ -0,0 +1,45 @@
+'''create url revisit schedule table
+
+Revision ID: 20261019_100000
+Revises: 20231010_123456
+Create Date: 2026-10-19 10:00:00
+
+'''
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_100000'
+down_revision = '20231010_123456'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    try:
+        op.create_table(
+            'url_revisit_schedule',
+            sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column('url', sa.String, nullable=False, unique=True, index=True),
+            sa.Column('content_hash', sa.String(64), nullable=False),
+            sa.Column('first_crawled_at', sa.TIMESTAMP, nullable=False),
+            sa.Column('last_crawled_at', sa.TIMESTAMP, nullable=False),
+            sa.Column('next_crawl_at', sa.TIMESTAMP, nullable=False, index=True),
+            sa.Column('crawl_count', sa.Integer, nullable=False),
+            sa.Column('change_count', sa.Integer, nullable=False),
+            sa.Column('revisit_interval', sa.Integer, nullable=False)
+        )
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
+
+
+def downgrade() -> None:
+    try:
+        op.drop_table('url_revisit_schedule')
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
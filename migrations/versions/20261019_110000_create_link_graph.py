@@ -0,0 +1,46 @@
+'''create link graph tables
+
+Revision ID: 20261019_110000
+Revises: 20261019_100000
+Create Date: 2026-10-19 11:00:00
+
+'''
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_110000'
+down_revision = '20261019_100000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    try:
+        op.create_table(
+            'url_ids',
+            sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column('url', sa.String, nullable=False, unique=True, index=True)
+        )
+        op.create_table(
+            'page_outlinks',
+            sa.Column('page_id', sa.Integer, sa.ForeignKey('url_ids.id'), primary_key=True),
+            sa.Column('outlinks', sa.LargeBinary, nullable=False),
+            sa.Column('link_count', sa.Integer, nullable=False),
+            sa.Column('updated_at', sa.TIMESTAMP, nullable=False)
+        )
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
+
+
+def downgrade() -> None:
+    try:
+        op.drop_table('page_outlinks')
+        op.drop_table('url_ids')
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
@@ -0,0 +1,43 @@
+'''create crawl_jobs table
+
+Revision ID: 20261019_120000
+Revises: 20261019_110000
+Create Date: 2026-10-19 12:00:00
+
+'''
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_120000'
+down_revision = '20261019_110000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    try:
+        op.create_table(
+            'crawl_jobs',
+            sa.Column('job_id', sa.String, primary_key=True),
+            sa.Column('status', sa.String(16), nullable=False, index=True),
+            sa.Column('priority', sa.String(16), nullable=False),
+            sa.Column('worker', sa.String, nullable=False),
+            sa.Column('pages_processed', sa.Integer, nullable=False),
+            sa.Column('started_at', sa.TIMESTAMP, nullable=False),
+            sa.Column('finished_at', sa.TIMESTAMP, nullable=True)
+        )
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
+
+
+def downgrade() -> None:
+    try:
+        op.drop_table('crawl_jobs')
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
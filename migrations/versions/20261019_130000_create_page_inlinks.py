@@ -0,0 +1,61 @@
+'''create page_inlinks table
+
+Revision ID: 20261019_130000
+Revises: 20261019_120000
+Create Date: 2026-10-19 13:00:00
+
+'''
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_130000'
+down_revision = '20261019_120000'
+branch_labels = None
+depends_on = None
+
+
+def _decode_ids(blob):
+    # Same format as service.link_graph.encode_ids: varint-encoded gaps of sorted ids
+    value = gap = shift = 0
+    for byte in blob:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        value += gap
+        yield value
+        gap = shift = 0
+
+
+def upgrade() -> None:
+    try:
+        page_inlinks = op.create_table(
+            'page_inlinks',
+            sa.Column('target_id', sa.Integer, sa.ForeignKey('url_ids.id'), primary_key=True),
+            sa.Column('source_id', sa.Integer, sa.ForeignKey('url_ids.id'), primary_key=True)
+        )
+        # Build the reverse index of the outlinks stored so far
+        connection = op.get_bind()
+        rows = []
+        for page_id, outlinks in connection.execute(sa.text("SELECT page_id, outlinks FROM page_outlinks")):
+            rows.extend({'target_id': target_id, 'source_id': page_id} for target_id in _decode_ids(outlinks))
+            if len(rows) >= 10000:
+                op.bulk_insert(page_inlinks, rows)
+                rows = []
+        if rows:
+            op.bulk_insert(page_inlinks, rows)
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
+
+
+def downgrade() -> None:
+    try:
+        op.drop_table('page_inlinks')
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
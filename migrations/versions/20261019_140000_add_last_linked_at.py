@@ -0,0 +1,39 @@
+'''add last_linked_at to url revisit schedule
+
+Revision ID: 20261019_140000
+Revises: 20261019_130000
+Create Date: 2026-10-19 14:00:00
+
+'''
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_140000'
+down_revision = '20261019_130000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    try:
+        op.add_column('url_revisit_schedule', sa.Column('last_linked_at', sa.TIMESTAMP, nullable=True))
+        # Entries so far count as linked at their last crawl
+        op.execute("UPDATE url_revisit_schedule SET last_linked_at = last_crawled_at")
+        with op.batch_alter_table('url_revisit_schedule') as batch_op:
+            batch_op.alter_column('last_linked_at', existing_type=sa.TIMESTAMP, nullable=False)
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
+
+
+def downgrade() -> None:
+    try:
+        with op.batch_alter_table('url_revisit_schedule') as batch_op:
+            batch_op.drop_column('last_linked_at')
+    except Exception as e:
+        import logging
+        logging.error(e, exc_info=True)
+        raise
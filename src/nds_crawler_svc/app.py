@@ -1,35 +1,92 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import asyncio
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from nds_crawler_svc.routers import url_submission, url_submission_batch, results
+from nds_crawler_svc.routers import url_submission, url_submission_batch, results, metrics, debug, links, jobs, health
+from nds_crawler_svc.config import RECRAWL_POLL_SECONDS, URL_CLEANUP_INTERVAL
+from nds_crawler_svc.crawling_job import flush_crawl_records
+from nds_crawler_svc.maintenance import maintenance
+from nds_crawler_svc.models.base import get_engine
+from nds_crawler_svc.profiling import profiler
+from nds_crawler_svc.service.dns_cache import close_shared_transport
 from nds_crawler_svc.storage import cleanup_old_data
+from nds_crawler_svc.tasks import cleanup_old_urls, enqueue_due_recrawls
+from nds_crawler_svc.write_queue import write_queue
 
-app = FastAPI(debug=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
+
+
+app = FastAPI(debug=True, lifespan=lifespan)
+app.state.ready = False
 
 app.include_router(url_submission.router)
 app.include_router(url_submission_batch.router)
 app.include_router(results.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
+app.include_router(links.router)
+app.include_router(jobs.router)
+app.include_router(health.router)
 
 scheduler = BackgroundScheduler()
 
-@app.on_event("startup")
+
+def add_maintenance_job(name, func, *args, **trigger_args):
+    """Schedule func on the leader only; a run still in progress is never overlapped or queued twice."""
+    scheduler.add_job(
+        maintenance.run_job, 'interval', args=[name, func, *args], id=name, replace_existing=True,
+        max_instances=1, coalesce=True, **trigger_args
+    )
+
+
 async def startup_event():
     try:
+        loop = asyncio.get_running_loop()
+        # Sample event-loop lag (and slow callbacks, if enabled) from the start
+        profiler.start()
+        # Create the database engine, which imports the driver, off the event loop thread
+        await loop.run_in_executor(None, get_engine)
         # Schedule the cleanup_old_data job to run every 1 day
-        scheduler.add_job(cleanup_old_data, 'interval', days=1)
-        scheduler.start()
-        # Run an immediate cleanup on startup
-        cleanup_old_data()
+        add_maintenance_job("cleanup_old_data", cleanup_old_data, days=1)
+        # Purge expired entries of the recently crawled URLs table
+        add_maintenance_job("cleanup_old_urls", cleanup_old_urls, seconds=URL_CLEANUP_INTERVAL)
+        # Enqueue re-crawls of URLs whose adaptive revisit time has come
+        add_maintenance_job("enqueue_due_recrawls", enqueue_due_recrawls, loop, seconds=RECRAWL_POLL_SECONDS)
+        if not scheduler.running:
+            scheduler.start()
         app.state.scheduler = scheduler
+        # Run an immediate cleanup in the background; a full walk of the storage
+        # directory must not delay readiness
+        app.state.boot_maintenance = loop.run_in_executor(
+            None, maintenance.run_job, "cleanup_old_data", cleanup_old_data
+        )
+        app.state.ready = True
     except Exception as e:
         logging.error(e, exc_info=True)
 
 
-@app.on_event("shutdown")
 async def shutdown_event():
     try:
+        app.state.ready = False
+        profiler.stop()
         if hasattr(app.state, "scheduler"):
             app.state.scheduler.shutdown()
+        # Record pages still waiting for a bulk write, then commit crawl writes
+        # still waiting for the SQLite writer
+        await flush_crawl_records()
+        if write_queue is not None:
+            write_queue.stop()
+        # Close the crawl's pooled connections
+        await close_shared_transport()
+        maintenance.election.release()
     except Exception as e:
         logging.error(e, exc_info=True)
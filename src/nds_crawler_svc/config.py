@@ -1,8 +1,138 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
 SERVICE_URL = os.getenv("SERVICE_URL", "0.0.0.0")
-SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
\ No newline at end of file
+SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
+# Worker processes serving the API and running crawls; more than one requires a
+# database shared between processes (not in-memory SQLite)
+WORKERS = int(os.getenv("WORKERS", 1))
+
+# Compression applied to stored crawl records: "none", "gzip" or "zstd".
+# zstd requires the optional `zstandard` package and falls back to gzip without it.
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "none").lower()
+STORAGE_COMPRESSION_LEVEL = int(os.getenv("STORAGE_COMPRESSION_LEVEL", 6))
+# Optional zstd dictionary trained with storage.train_compression_dictionary()
+STORAGE_ZSTD_DICT_PATH = os.getenv("STORAGE_ZSTD_DICT_PATH", "")
+
+# JSON backend used for stored records and /results responses: "auto" picks the
+# fastest installed one (orjson, then msgspec), or name "orjson", "msgspec" or "json".
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+# Upper bound in bytes for the in-memory cache of serialized /results pages
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 64 * 1024**2))
+
+# Fetch retries: attempts per URL and the jittered exponential backoff bounds in seconds
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 30))
+# Per-host circuit breaker: consecutive failures before tripping and the cool-down in seconds
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 60))
+# URLs held per tripped host until it recovers; further URLs are dropped
+PARKED_URLS_PER_HOST = int(os.getenv("PARKED_URLS_PER_HOST", 1000))
+
+# Shared DNS cache: lifetime in seconds of positive and negative answers, number of
+# cached names, and concurrent getaddrinfo calls allowed
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", 300))
+DNS_NEGATIVE_TTL = float(os.getenv("DNS_NEGATIVE_TTL", 30))
+DNS_CACHE_MAX_ENTRIES = int(os.getenv("DNS_CACHE_MAX_ENTRIES", 10000))
+DNS_MAX_CONCURRENT_LOOKUPS = int(os.getenv("DNS_MAX_CONCURRENT_LOOKUPS", 16))
+
+# Concurrent page fetches shared by all crawl jobs
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 32))
+
+# Adaptive recrawl: bounds and initial value of per-URL revisit intervals in seconds,
+# how often due URLs are enqueued and how many per run
+RECRAWL_MIN_INTERVAL = int(os.getenv("RECRAWL_MIN_INTERVAL", 3600))
+RECRAWL_MAX_INTERVAL = int(os.getenv("RECRAWL_MAX_INTERVAL", 30 * 24 * 3600))
+RECRAWL_INITIAL_INTERVAL = int(os.getenv("RECRAWL_INITIAL_INTERVAL", 24 * 3600))
+RECRAWL_POLL_SECONDS = int(os.getenv("RECRAWL_POLL_SECONDS", 60))
+RECRAWL_BATCH_SIZE = int(os.getenv("RECRAWL_BATCH_SIZE", 100))
+# URLs not reached through a link or a submission for this many seconds stop being re-crawled
+RECRAWL_EXPIRY = int(os.getenv("RECRAWL_EXPIRY", 90 * 24 * 3600))
+
+# Maintenance jobs run only in the process holding the leader lock: "database" uses a
+# PostgreSQL advisory lock, "file" an flock on MAINTENANCE_LOCK_PATH, "auto" picks by dialect
+MAINTENANCE_LOCK_BACKEND = os.getenv("MAINTENANCE_LOCK_BACKEND", "auto")
+MAINTENANCE_LOCK_PATH = os.getenv(
+    "MAINTENANCE_LOCK_PATH", os.path.join(tempfile.gettempdir(), "nds_crawler_svc_maintenance.lock")
+)
+# How often expired entries are purged from the recently crawled URLs table, in seconds
+URL_CLEANUP_INTERVAL = int(os.getenv("URL_CLEANUP_INTERVAL", 3600))
+
+# Runtime profiling, also switchable through /debug/profile: event-loop lag sampling
+# every PROFILE_LOOP_LAG_INTERVAL seconds, stack capture of callbacks blocking the loop
+# longer than PROFILE_SLOW_CALLBACK_THRESHOLD seconds, and per-stage crawl timings
+PROFILE_LOOP_LAG = os.getenv("PROFILE_LOOP_LAG", "true").lower() == "true"
+PROFILE_SLOW_CALLBACKS = os.getenv("PROFILE_SLOW_CALLBACKS", "false").lower() == "true"
+PROFILE_SPANS = os.getenv("PROFILE_SPANS", "true").lower() == "true"
+PROFILE_LOOP_LAG_INTERVAL = float(os.getenv("PROFILE_LOOP_LAG_INTERVAL", 0.05))
+PROFILE_SLOW_CALLBACK_THRESHOLD = float(os.getenv("PROFILE_SLOW_CALLBACK_THRESHOLD", 0.1))
+
+# Token required in the X-Admin-Token header of /debug endpoints; unset disables them (404)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Longest CPU profile /debug/cpu-profile may run, in seconds
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 60))
+
+# Keep each page's links list in its stored record in addition to the link graph;
+# off by default, as the link graph already holds them
+STORE_RECORD_LINKS = os.getenv("STORE_RECORD_LINKS", "false").lower() == "true"
+
+# Pages of one job crawled at once from its priority frontier; by default a single
+# job can use every fetch slot
+FRONTIER_WORKERS = int(os.getenv("FRONTIER_WORKERS", CRAWL_CONCURRENCY))
+
+# Sitemap ingestion limits: decompressed bytes and entries read per sitemap (the
+# protocol's own limits) and sitemap files read per seed, including index children
+SITEMAP_MAX_BYTES = int(os.getenv("SITEMAP_MAX_BYTES", 50 * 1024**2))
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", 50000))
+SITEMAP_MAX_FILES = int(os.getenv("SITEMAP_MAX_FILES", 50))
+
+# Distinct links taken from one page; the rest of a link farm's anchors are ignored
+MAX_OUTLINKS_PER_PAGE = int(os.getenv("MAX_OUTLINKS_PER_PAGE", 1000))
+
+# Charset resolution for fetched pages: bytes searched for a <meta> charset, and
+# bytes sampled when the charset has to be detected from the content
+CHARSET_SNIFF_BYTES = int(os.getenv("CHARSET_SNIFF_BYTES", 4096))
+CHARSET_DETECT_SAMPLE = int(os.getenv("CHARSET_DETECT_SAMPLE", 64 * 1024))
+
+# Fetch strategy: redirects followed per page, statuses that make a page be requested
+# again with the fallback User-Agent (empty disables the fallback), and hosts whose
+# working User-Agent is remembered
+FETCH_MAX_REDIRECTS = int(os.getenv("FETCH_MAX_REDIRECTS", 5))
+FETCH_FALLBACK_STATUSES = frozenset(
+    int(code) for code in os.getenv("FETCH_FALLBACK_STATUSES", "403").split(",") if code.strip()
+)
+FETCH_FALLBACK_USER_AGENT = os.getenv(
+    "FETCH_FALLBACK_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+)
+FETCH_LEARNED_HOSTS = int(os.getenv("FETCH_LEARNED_HOSTS", 10000))
+
+# Permanent redirects remembered so that later links to the old URL are fetched from
+# its target directly: number of entries and their lifetime in seconds
+REDIRECT_CACHE_MAX_ENTRIES = int(os.getenv("REDIRECT_CACHE_MAX_ENTRIES", 10000))
+REDIRECT_CACHE_TTL = float(os.getenv("REDIRECT_CACHE_TTL", 24 * 3600))
+
+# SQLite tuning applied to every connection: WAL journaling, fsync only at WAL
+# checkpoints (synchronous=NORMAL), memory-mapped I/O and page cache sizes in bytes,
+# and how long a connection waits for a lock in milliseconds before failing
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() == "true"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024**2))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", 64 * 1024**2))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+# Crawl writes to a file SQLite database go through one writer thread that commits
+# up to SQLITE_WRITE_BATCH_SIZE of them per transaction, waiting at most
+# SQLITE_WRITE_BATCH_WAIT seconds for a batch to fill
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "true").lower() == "true"
+SQLITE_WRITE_BATCH_SIZE = int(os.getenv("SQLITE_WRITE_BATCH_SIZE", 200))
+SQLITE_WRITE_BATCH_WAIT = float(os.getenv("SQLITE_WRITE_BATCH_WAIT", 0.005))
+# Crawled pages are recorded in the database in bulk, CRAWL_RECORD_BATCH_SIZE pages
+# at a time, and at most BULK_LOAD_BATCH_SIZE rows go to the database per COPY
+# or executemany call
+CRAWL_RECORD_BATCH_SIZE = int(os.getenv("CRAWL_RECORD_BATCH_SIZE", 50))
+BULK_LOAD_BATCH_SIZE = int(os.getenv("BULK_LOAD_BATCH_SIZE", 5000))
@@ -1,21 +1,195 @@
 import asyncio
 import datetime
+import hashlib
 import logging
+from typing import Optional
 from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
 
-from nds_crawler_svc.service.deduplication import is_recently_crawled
+from nds_crawler_svc.config import (
+    CRAWL_RECORD_BATCH_SIZE,
+    FETCH_MAX_REDIRECTS,
+    FRONTIER_WORKERS,
+    MAX_OUTLINKS_PER_PAGE,
+    STORE_RECORD_LINKS,
+)
+from nds_crawler_svc.profiling import profiler
+from nds_crawler_svc.service.bulk_load import CrawlRecord, CrawlRecordBuffer, bulk_record_crawls
+from nds_crawler_svc.service.crawl_policy import MAX_CRAWL_DEPTH, CrawlPolicy
+from nds_crawler_svc.service.crawl_scheduler import crawl_scheduler
+from nds_crawler_svc.service.decoding import resolve_charset
+from nds_crawler_svc.service.deduplication import claim_url, is_recently_crawled, release_claim
+from nds_crawler_svc.service.dns_cache import shared_transport
+from nds_crawler_svc.service.fetch_strategy import fetch_strategy
+from nds_crawler_svc.service.frontier import CrawlFrontier, frontiers
+from nds_crawler_svc.service.job_registry import finish_job, new_job_id, register_job
+from nds_crawler_svc.service.link_extraction import extract_links
+from nds_crawler_svc.service.link_graph import store_outlinks
+from nds_crawler_svc.service.redirects import redirect_cache, redirect_chain
+from nds_crawler_svc.service.sitemap import ingest_sitemaps
+from nds_crawler_svc.service.retry_policy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    host_breakers,
+    host_key,
+)
 from nds_crawler_svc.storage import store_crawled_data
+from nds_crawler_svc.write_queue import run_write
 from nds_crawler_svc.models.base import SessionLocal
 
 
-async def start_crawling_job(url: str, depth: int = 0) -> None:
+# Crawled pages waiting to be recorded by flush_crawl_records
+crawl_records = CrawlRecordBuffer(CRAWL_RECORD_BATCH_SIZE)
+
+# Crawls of released parked URLs, referenced until they finish
+_released_crawls = set()
+
+
+async def start_crawling_job(
+    url: str,
+    depth: int = 0,
+    policy: Optional[CrawlPolicy] = None,
+    job_id: Optional[str] = None,
+    priority: str = "normal",
+    weight: float = 1.0,
+    recrawl: bool = False,
+    use_sitemaps: bool = False,
+) -> None:
     """
     Asynchronous function to start a crawling job for the given URL.
-    Recursively crawls links extracted from the page up to a maximum depth of 5.
+    Crawls links extracted from the page up to a maximum depth of 5. Discovered links
+    go to the job's priority frontier, which the job's first call drains in order of
+    OPIC link importance and URL heuristics, so a page budget goes to the best pages.
+    An optional per-job policy restricts which links are followed and how many pages are crawled.
+    Pages are stored under job_id (a new one is generated if omitted), and fetches wait for
+    a slot from the shared scheduler according to the job's priority class and weight.
+    Scheduled re-crawls pass recrawl=True to bypass the recently-crawled check.
+    With use_sitemaps=True, pages listed in the site's sitemaps are queued as well.
     """
+    if job_id is None:
+        job_id = new_job_id()
+    job_kwargs = {"policy": policy, "job_id": job_id, "priority": priority, "weight": weight}
+
+    frontier = frontiers.get(job_id)
+    owner = frontier is None
+    if owner:
+        frontier = frontiers[job_id] = CrawlFrontier(FRONTIER_WORKERS, policy)
+        await _update_registry(register_job, job_id, priority)
+    cash = frontier.enter(url)
+    if use_sitemaps:
+        # The sitemaps' pages and the seed's own outlinks share the seed's cash
+        cash /= 2
+        frontier.add_source(ingest_sitemaps(url, frontier, job_kwargs, cash))
+    try:
+        try:
+            await _crawl_page(url, depth, job_kwargs, recrawl, frontier, cash)
+        except Exception as e:
+            logging.error(f"Error crawling {url}: {e}", exc_info=True)
+        finally:
+            frontier.leave()
+
+        if owner:
+            # The first page of a job crawls the rest of its frontier, best pages first
+            await frontier.run(lambda link, link_depth: start_crawling_job(link, link_depth, **job_kwargs))
+    finally:
+        if owner:
+            del frontiers[job_id]
+            await flush_crawl_records()
+            await _update_registry(finish_job, job_id, frontier.finished)
+
+
+async def _update_registry(func, job_id: str, *args) -> None:
+    """Record a job's state in the registry shared by all worker processes."""
+    try:
+        await run_write(func, job_id, *args)
+    except Exception as e:
+        logging.error(f"Error updating the job registry for {job_id}: {e}", exc_info=True)
+
+
+def _write_crawl_records(records, session) -> None:
+    try:
+        bulk_record_crawls(records, session)
+    except Exception as e:
+        logging.error(f"Error recording crawl history of {len(records)} pages: {e}", exc_info=True)
+        session.rollback()
+
+
+async def flush_crawl_records() -> None:
+    """Mark the buffered pages' URLs as crawled and update their revisit schedules."""
+    records = crawl_records.take()
+    if not records:
+        return
+    try:
+        await run_write(_write_crawl_records, records)
+    except Exception as e:
+        logging.error(f"Error recording crawl history of {len(records)} pages: {e}", exc_info=True)
+    finally:
+        crawl_records.done(records)
+
+
+def _park(host: str, url: str, depth: int, job_kwargs: dict) -> bool:
+    """
+    Park a URL of a tripped host. The first URL parked for a host schedules its
+    release after the breaker's reset timeout, so that a parked host is always
+    probed again even if nothing else fetches from it.
+    """
+    first = not host_breakers.parked(host)
+    if not host_breakers.park(host, url, depth, **job_kwargs):
+        return False
+    if first:
+        asyncio.get_running_loop().call_later(host_breakers.reset_timeout, _release_parked, host)
+    return True
+
+
+def _release_parked(host: str) -> None:
+    """
+    Crawl the URLs parked for a host in the background. If the host is still
+    tripped, the first of them is its half-open probe and the rest are parked
+    again until the probe succeeds or the next reset timeout.
+    """
+    parked = host_breakers.drain_parked(host)
+    if parked:
+        logging.info(f"Releasing {len(parked)} parked URLs of host {host}")
+    for parked_url, parked_depth, crawl_kwargs in parked:
+        task = asyncio.create_task(start_crawling_job(parked_url, parked_depth, **crawl_kwargs))
+        _released_crawls.add(task)
+        task.add_done_callback(_released_crawls.discard)
+
+
+async def _release_claim(claim) -> None:
+    """Release the claim of a URL that was not crawled, so that it can be crawled later."""
+    if claim is None:
+        return
+    try:
+        await run_write(release_claim, claim)
+    except Exception as e:
+        logging.error(f"Error releasing a URL claim: {e}", exc_info=True)
+
+
+async def _release_page(claim, policy: Optional[CrawlPolicy]) -> None:
+    """Give back the claim and the budgeted page of a URL that was not stored."""
+    if policy is not None:
+        policy.release_page()
+    await _release_claim(claim)
+
+
+def _store_outlinks(url: str, links, session) -> None:
+    try:
+        store_outlinks(url, links, session)
+    except Exception as e:
+        logging.error(f"Error storing outlinks for {url}: {e}", exc_info=True)
+        session.rollback()
+
+
+async def _crawl_page(url: str, depth: int, job_kwargs: dict, recrawl: bool,
+                      frontier: CrawlFrontier, cash: float) -> None:
+    """Fetch, parse and store one page, queueing its in-scope links on the job's frontier."""
+    policy = job_kwargs["policy"]
+    job_id = job_kwargs["job_id"]
+    priority = job_kwargs["priority"]
+    weight = job_kwargs["weight"]
+
     # Validate URL
     parsed_url = urlparse(url)
     if parsed_url.scheme not in ('http', 'https'):
@@ -23,14 +197,30 @@ async def start_crawling_job(url: str, depth: int = 0) -> None:
         return
 
     # Enforce maximum depth
-    if depth > 5:
+    max_depth = policy.max_depth if policy is not None else MAX_CRAWL_DEPTH
+    if depth > max_depth:
         logging.info(f"Maximum crawling depth reached for URL: {url}")
         return
 
+    # Once the job's page budget is spent, skip the URL before any database work
+    if policy is not None and policy.exhausted():
+        logging.info(f"Page budget exhausted; skipping URL: {url}")
+        return
+
+    # Known permanent redirects are fetched from their target directly
+    fetch_url = redirect_cache.resolve(url)
+
     # Deduplication check
     session = SessionLocal()
     try:
-        if is_recently_crawled(url, session):
+        with profiler.span("dedup"):
+            recently_crawled = not recrawl and (
+                url in crawl_records
+                or fetch_url in crawl_records
+                or is_recently_crawled(url, session)
+                or (fetch_url != url and is_recently_crawled(fetch_url, session))
+            )
+        if recently_crawled:
             logging.info(f"URL already crawled recently: {url}")
             return
     except Exception as e:
@@ -39,51 +229,132 @@ async def start_crawling_job(url: str, depth: int = 0) -> None:
     finally:
         session.close()
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = None
-        # Attempt standard fetch
+    # Claim the URL, so that no other worker process crawls it meanwhile; every
+    # exit that does not record the page as crawled releases the claim
+    claim = None
+    if not recrawl:
         try:
-            response = await client.get(url)
+            with profiler.span("dedup"):
+                claim = await run_write(claim_url, url)
+            claimed = claim is not None
         except Exception as e:
-            logging.error(f"Standard fetch failed for {url}: {e}", exc_info=True)
+            # Like claim_url's own database errors, a failed write counts as a claim
+            logging.error(f"Error claiming {url}: {e}", exc_info=True)
+            claimed = True
+        if not claimed:
+            logging.info(f"URL is being crawled by another worker: {url}")
+            return
 
-        # If standard fetch fails or non-200 status, attempt fallback dynamic content retrieval
-        if response is None or response.status_code != 200:
-            fallback_headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-            try:
-                response = await client.get(url, headers=fallback_headers)
-            except Exception as e:
-                logging.error(f"Dynamic fetch failed for {url}: {e}", exc_info=True)
-                return
+    # Enforce the job's page budget
+    if policy is not None and not policy.acquire_page():
+        logging.info(f"Page budget exhausted; skipping URL: {url}")
+        await _release_claim(claim)
+        return
 
-        content_type = response.headers.get("content-type", "")
-        if response.status_code == 200 and "text/html" in content_type:
+    # From here on, every exit that does not record the page, including errors
+    # and cancellation, gives back its claim and budgeted page
+    recorded = False
+    try:
+        host = host_key(fetch_url)
+        async with httpx.AsyncClient(timeout=10, transport=shared_transport(),
+                                     follow_redirects=True, max_redirects=FETCH_MAX_REDIRECTS) as client:
+            # Fetch with retries for transient failures, following redirects; pages refused
+            # to the default client are requested again with a browser User-Agent. Each
+            # request holds a slot from the shared scheduler, which is free while waiting
+            # to retry
             try:
-                soup = BeautifulSoup(response.text, "html.parser")
-                links = []
-                # Extract all href links from <a> tags
-                for tag in soup.find_all("a", href=True):
-                    link = tag.get("href")
-                    if link:
-                        links.append(link)
+                with profiler.span("fetch"):
+                    response = await fetch_strategy.fetch(
+                        client, fetch_url, slot=lambda: crawl_scheduler.slot(job_id, priority, weight)
+                    )
+            except CircuitOpenError:
+                # Parked URLs are crawled again once the host recovers
+                if _park(host, url, depth, job_kwargs):
+                    logging.info(f"Host {host} is unavailable; parked URL {url}")
+                else:
+                    logging.warning(f"Host {host} is unavailable and its parking queue is full; dropped URL {url}")
+                return
+            except httpx.TooManyRedirects:
+                logging.info(f"More than {FETCH_MAX_REDIRECTS} redirects for {url}; skipped")
+                return
             except Exception as e:
-                logging.error(f"Error parsing HTML for {url}: {e}", exc_info=True)
+                logging.error(f"Fetch failed for {url}: {e}", exc_info=True)
                 return
 
-            # Prepare job data and store crawled data
-            job_id = datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
-            data = {"url": url, "links": links}
-            try:
-                store_result = store_crawled_data(job_id, data)
-                logging.info(f"Stored crawled data for URL {url}: {store_result}")
-            except Exception as e:
-                logging.error(f"Error storing crawled data for {url}: {e}", exc_info=True)
-
-            # Recursively crawl extracted links concurrently
-            tasks = []
-            for link in links:
-                tasks.append(asyncio.create_task(start_crawling_job(link, depth + 1)))
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-        else:
-            logging.error(f"Non-HTML content or unsuccessful response for {url}. Status code: {response.status_code}")
+            # Any response that did not count as a failure closes the host's breaker;
+            # crawl the URLs that were parked while it was unavailable
+            if host_breakers.parked(host) and host_breakers.get(host).state == CircuitBreaker.CLOSED:
+                _release_parked(host)
+
+            # Every URL the page was reached through is marked as crawled with it, and a
+            # redirected page's final URL is checked for duplicates too, since it may
+            # have been crawled already under that URL
+            chain = list(dict.fromkeys([url, *redirect_chain(fetch_url, response)]))
+            final_url = chain[-1]
+            redirect_cache.record(response)
+            if final_url != fetch_url and not recrawl:
+                session = SessionLocal()
+                try:
+                    redirects_to_crawled = final_url in crawl_records or is_recently_crawled(final_url, session)
+                finally:
+                    session.close()
+                if redirects_to_crawled:
+                    logging.info(f"{url} redirects to recently crawled URL {final_url}")
+                    return
+
+            content_type = response.headers.get("content-type", "")
+            if response.status_code == 200 and "text/html" in content_type:
+                try:
+                    # Work out the charset from the header, a <meta> tag or the bytes
+                    # themselves, and let the parser decode the body once with it
+                    with profiler.span("decode"):
+                        charset, charset_source = resolve_charset(response.content, content_type)
+                    logging.debug(f"Decoding {url} as {charset} ({charset_source})")
+                    with profiler.span("parse"):
+                        # Distinct canonical links of <a> tags, capped per page, with their
+                        # anchor text for scoring
+                        anchors = extract_links(response.content, final_url, MAX_OUTLINKS_PER_PAGE, encoding=charset)
+                        links = [link for link, _ in anchors]
+                except Exception as e:
+                    logging.error(f"Error parsing HTML for {url}: {e}", exc_info=True)
+                    return
+
+                recorded = True
+                # Mark the page's URLs as crawled and track content changes to adapt the
+                # URL's revisit interval, in bulk once CRAWL_RECORD_BATCH_SIZE pages are
+                # buffered, and record its outlinks in the link graph
+                try:
+                    with profiler.span("history"):
+                        content_hash = hashlib.sha256(response.content).hexdigest()
+                        record = CrawlRecord(url, chain, content_hash, datetime.datetime.utcnow(), recrawl)
+                        if crawl_records.add(record):
+                            await flush_crawl_records()
+                        await run_write(_store_outlinks, url, links)
+                except Exception as e:
+                    logging.error(f"Error recording crawl of {url}: {e}", exc_info=True)
+
+                # Prepare job data and store crawled data; the link graph keeps the links
+                # in compact form, so the record only holds them when STORE_RECORD_LINKS is set
+                data = {"url": url, "links": links} if STORE_RECORD_LINKS else {"url": url}
+                if final_url != url:
+                    data["final_url"] = final_url
+                try:
+                    with profiler.span("store"):
+                        store_result = store_crawled_data(job_id, data)
+                    logging.info(f"Stored crawled data for URL {url}: {store_result}")
+                except Exception as e:
+                    logging.error(f"Error storing crawled data for {url}: {e}", exc_info=True)
+
+                # Queue in-scope links on the job's frontier, handing this page's OPIC
+                # cash out to them; the frontier crawls the most valuable ones first
+                if depth + 1 <= max_depth:
+                    frontier.add_links(cash, depth + 1, [
+                        (link, anchor_text) for link, anchor_text in anchors
+                        if policy is None or policy.allows(link, depth + 1)
+                    ])
+
+            else:
+                logging.error(f"Non-HTML content or unsuccessful response for {url}. Status code: {response.status_code}")
+    finally:
+        if not recorded:
+            await _release_page(claim, policy)
@@ -1,8 +1,10 @@
 import logging
 
 import uvicorn
+
 from nds_crawler_svc.app import app
-from nds_crawler_svc.config import SERVICE_URL, SERVICE_PORT
+from nds_crawler_svc.config import DATABASE_URL, SERVICE_URL, SERVICE_PORT, WORKERS
+from nds_crawler_svc.models.base import is_process_local_database
 
 
 # Set up logging for the application
@@ -13,9 +15,18 @@ logger = logging.getLogger(__name__)
 def main():
     service_url = SERVICE_URL
     service_port = int(SERVICE_PORT)
-    uvicorn.run(app, host=service_url, port=service_port)
+    workers = WORKERS
+    if workers > 1 and is_process_local_database(DATABASE_URL):
+        logger.warning("WORKERS > 1 requires a database shared between processes; starting a single worker")
+        workers = 1
+    if workers > 1:
+        # Each worker process imports the app itself. Dedup claims and the job registry
+        # live in the database, and maintenance jobs run in the elected leader only.
+        uvicorn.run("nds_crawler_svc.app:app", host=service_url, port=service_port, workers=workers)
+    else:
+        uvicorn.run(app, host=service_url, port=service_port)
 
 
 if __name__ == "__main__":
     # Entry point for the application
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from nds_crawler_svc.config import MAINTENANCE_LOCK_BACKEND, MAINTENANCE_LOCK_PATH
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+# Key of the PostgreSQL advisory lock that elects the maintenance leader
+ADVISORY_LOCK_KEY = 0x6E647363  # "ndsc"
+
+
+class LeaderElection:
+    """Elects one process per deployment to run maintenance jobs.
+
+    The leader holds either a PostgreSQL session-level advisory lock or an
+    exclusive flock on a lock file for as long as it lives; both are released
+    by the operating system or database if the process dies, so another worker
+    takes over on its next attempt. The advisory lock's connection runs in
+    autocommit mode, so it does not sit idle in a transaction, and is checked
+    on every leadership query; a lost lock is dropped and acquired anew.
+    """
+
+    def __init__(self, backend: str, lock_path: str):
+        self.backend = backend
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._connection = None
+        self._mutex = threading.Lock()
+
+    def _resolve_backend(self) -> str:
+        if self.backend != "auto":
+            return self.backend
+        from nds_crawler_svc.models.base import get_engine
+        return "database" if get_engine().dialect.name == "postgresql" else "file"
+
+    def is_leader(self) -> bool:
+        with self._mutex:
+            return self._lock_file is not None or self._holds_advisory_lock()
+
+    def try_acquire(self) -> bool:
+        """Become the leader if no other process is; returns whether this process leads."""
+        with self._mutex:
+            if self._lock_file is not None or self._holds_advisory_lock():
+                return True
+            try:
+                if self._resolve_backend() == "database":
+                    return self._acquire_advisory_lock()
+                return self._acquire_lock_file()
+            except Exception as e:
+                logging.error(e, exc_info=True)
+                return False
+
+    def _acquire_lock_file(self) -> bool:
+        if fcntl is None:
+            # Without flock there is no way to coordinate; assume a single process
+            self._lock_file = True
+            return True
+        lock_file = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        return True
+
+    def _holds_advisory_lock(self) -> bool:
+        """Check that the advisory lock's session still holds it; the caller holds self._mutex."""
+        if self._connection is None:
+            return False
+        try:
+            held = self._connection.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' "
+                "AND pid = pg_backend_pid() AND objid = :key AND objsubid = 1)"
+            ), {"key": ADVISORY_LOCK_KEY}).scalar()
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            held = False
+        if not held:
+            logging.warning("Lost the maintenance advisory lock")
+            try:
+                self._connection.close()
+            except Exception as e:
+                logging.error(e, exc_info=True)
+            self._connection = None
+        return bool(held)
+
+    def _acquire_advisory_lock(self) -> bool:
+        from nds_crawler_svc.models.base import get_engine
+        # Autocommit, so that the held connection is not left idle in a transaction
+        connection = get_engine().connect().execution_options(isolation_level="AUTOCOMMIT")
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar()
+        if not acquired:
+            connection.close()
+            return False
+        # Keep the session open: the advisory lock lives as long as it does
+        self._connection = connection
+        return True
+
+    def release(self) -> None:
+        with self._mutex:
+            if self._lock_file is not None and self._lock_file is not True:
+                self._lock_file.close()
+            self._lock_file = None
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                finally:
+                    self._connection.close()
+            self._connection = None
+
+
+class MaintenanceRunner:
+    """Runs maintenance jobs on the elected leader only and records their run durations."""
+
+    def __init__(self, election: LeaderElection):
+        self.election = election
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, **values) -> dict:
+        """Update a job's stats entry; the caller holds self._lock."""
+        stats = self._stats.setdefault(name, {
+            "runs": 0, "failures": 0, "skipped": 0,
+            "last_started_at": None, "last_duration_seconds": None, "last_status": None,
+        })
+        stats.update(values)
+        return stats
+
+    def run_job(self, name: str, func: Callable[..., None], *args) -> Optional[bool]:
+        """Run func if this process is the leader.
+
+        Returns True on success, False on failure and None when skipped because
+        another process leads.
+        """
+        if not self.election.try_acquire():
+            with self._lock:
+                self._record(name)["skipped"] += 1
+            return None
+        started = time.time()
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            func(*args)
+        except Exception as e:
+            status = "failed"
+            logging.error(e, exc_info=True)
+        duration = time.perf_counter() - start
+        with self._lock:
+            stats = self._record(name, last_started_at=started, last_duration_seconds=duration, last_status=status)
+            stats["runs"] += 1
+            if status == "failed":
+                stats["failures"] += 1
+        logging.info(f"Maintenance job {name} finished with status {status} in {duration:.3f}s")
+        return status == "ok"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leader": self.election.is_leader(),
+                "jobs": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+
+maintenance = MaintenanceRunner(LeaderElection(MAINTENANCE_LOCK_BACKEND, MAINTENANCE_LOCK_PATH))
@@ -1,2 +1,7 @@
 from .base import Base, get_db
 from .recently_crawled_urls import RecentlyCrawledUrl
+from .url_revisit_schedule import UrlRevisitSchedule
+from .url_ids import UrlId
+from .page_outlinks import PageOutlinks
+from .page_inlinks import PageInlink
+from .crawl_jobs import CrawlJob
@@ -1,19 +1,99 @@
+import threading
+
 from sqlalchemy import Column, PrimaryKeyConstraint, String
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker, Session
 
-from nds_crawler_svc.config import DATABASE_URL
+from nds_crawler_svc.config import (
+    DATABASE_URL,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TUNING,
+)
 
 Base = declarative_base()
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def is_process_local_database(database_url: str) -> bool:
+    """Return True for databases that worker processes cannot share, i.e. in-memory SQLite."""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """
+    Apply the SQLite tuning profile to every connection of the engine.
+
+    WAL lets readers proceed while a write is in progress, synchronous=NORMAL
+    fsyncs at checkpoints rather than on every commit, and busy_timeout makes a
+    connection wait for a lock instead of failing with "database is locked".
+
+    The driver's own transaction handling is turned off and BEGIN is emitted by
+    SQLAlchemy instead, so that SAVEPOINTs work and a connection can take the
+    write lock up front with the `sqlite_begin="IMMEDIATE"` execution option.
+    """
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            # A negative cache_size is in KiB rather than pages
+            cursor.execute(f"PRAGMA cache_size={-(SQLITE_CACHE_SIZE // 1024)}")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql(f"BEGIN {connection.get_execution_options().get('sqlite_begin', '')}")
+
+
+def get_engine() -> Engine:
+    """Return the service's engine, creating it (and importing the DB driver) on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(DATABASE_URL)
+                if SQLITE_TUNING and engine.dialect.name == "sqlite":
+                    configure_sqlite(engine)
+                _engine = engine
+    return _engine
+
+
+class _LazySessionMaker(sessionmaker):
+    """sessionmaker that binds itself to the engine when the first session is made."""
+
+    def __call__(self, **local_kw) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionMaker()
+
+
+def __getattr__(name: str):
+    # `engine` stays importable from here without being created at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Session:
-    session = scoped_session(sessionmaker(bind=engine))
+    session = scoped_session(sessionmaker(bind=get_engine()))
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
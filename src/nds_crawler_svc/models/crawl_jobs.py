@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from .base import Base
+
+class CrawlJob(Base):
+    __tablename__ = 'crawl_jobs'
+
+    job_id = Column(String, primary_key=True)
+    status = Column(String(16), nullable=False, index=True)
+    priority = Column(String(16), nullable=False)
+    worker = Column(String, nullable=False)
+    pages_processed = Column(Integer, nullable=False, default=0)
+    started_at = Column(TIMESTAMP, nullable=False)
+    finished_at = Column(TIMESTAMP, nullable=True)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, ForeignKey, Integer
+from .base import Base
+
+class PageInlink(Base):
+    __tablename__ = 'page_inlinks'
+
+    # Reverse index of page_outlinks: one row per (linked page, linking page)
+    target_id = Column(Integer, ForeignKey('url_ids.id'), primary_key=True)
+    source_id = Column(Integer, ForeignKey('url_ids.id'), primary_key=True)
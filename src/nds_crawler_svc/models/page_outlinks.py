@@ -0,0 +1,11 @@
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, TIMESTAMP
+from .base import Base
+
+class PageOutlinks(Base):
+    __tablename__ = 'page_outlinks'
+
+    # Outlinks are the sorted url_ids of linked pages, delta and varint encoded
+    page_id = Column(Integer, ForeignKey('url_ids.id'), primary_key=True)
+    outlinks = Column(LargeBinary, nullable=False)
+    link_count = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP, nullable=False)
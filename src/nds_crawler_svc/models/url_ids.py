@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, String
+from .base import Base
+
+class UrlId(Base):
+    __tablename__ = 'url_ids'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, nullable=False, unique=True, index=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from .base import Base
+
+class UrlRevisitSchedule(Base):
+    __tablename__ = 'url_revisit_schedule'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, nullable=False, unique=True, index=True)
+    content_hash = Column(String(64), nullable=False)
+    first_crawled_at = Column(TIMESTAMP, nullable=False)
+    last_crawled_at = Column(TIMESTAMP, nullable=False)
+    # Last crawl that reached the URL through a link or a submission rather than a scheduled re-crawl
+    last_linked_at = Column(TIMESTAMP, nullable=False)
+    next_crawl_at = Column(TIMESTAMP, nullable=False, index=True)
+    crawl_count = Column(Integer, nullable=False, default=1)
+    change_count = Column(Integer, nullable=False, default=0)
+    revisit_interval = Column(Integer, nullable=False)
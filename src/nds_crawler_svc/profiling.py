@@ -0,0 +1,339 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from nds_crawler_svc.config import (
+    PROFILE_LOOP_LAG,
+    PROFILE_LOOP_LAG_INTERVAL,
+    PROFILE_SLOW_CALLBACK_THRESHOLD,
+    PROFILE_SLOW_CALLBACKS,
+    PROFILE_SPANS,
+)
+from nds_crawler_svc.stats import percentile
+
+# Samples kept per series for percentile estimates
+SAMPLES = 1024
+# Slow callbacks whose stacks are kept
+SLOW_CALLBACK_RECORDS = 50
+
+
+class _Series:
+    """Running count, total and max plus a window of recent samples."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": percentile(self.samples, 0.5),
+            "p99": percentile(self.samples, 0.99),
+            "max": self.max,
+        }
+
+
+class LoopProfiler:
+    """Measures how long the event loop is blocked and where crawl time goes.
+
+    - Loop lag: a task sleeps for `lag_interval` and records how late it wakes up.
+    - Slow callbacks: the same task acts as a heartbeat; a watchdog thread that
+      sees no beat for `slow_callback_threshold` seconds samples the loop thread's
+      stack, which is the code blocking the loop at that moment. Unlike asyncio's
+      debug mode, this names the blocking line and adds no per-callback overhead.
+    - Spans: named stages of a crawl (fetch, parse, dedup, store) timed with span().
+
+    Everything can be switched on and off at runtime through configure().
+    """
+
+    def __init__(self, loop_lag: bool, slow_callbacks: bool, spans: bool,
+                 lag_interval: float, slow_callback_threshold: float):
+        self.loop_lag = loop_lag
+        self.slow_callbacks = slow_callbacks
+        self.spans = spans
+        self.lag_interval = lag_interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self._lock = threading.Lock()
+        self._lag = _Series()
+        self._spans: Dict[str, _Series] = {}
+        self._slow_callbacks = deque(maxlen=SLOW_CALLBACK_RECORDS)
+        self._sampler: Optional[asyncio.Task] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._watchdog: Optional[threading.Thread] = None
+        self._watchdog_stop = threading.Event()
+
+    def start(self) -> None:
+        """Start the enabled samplers on the running event loop."""
+        loop = asyncio.get_running_loop()
+        running = self._sampler is not None and not self._sampler.done() and self._sampler.get_loop() is loop
+        if (self.loop_lag or self.slow_callbacks) and not running:
+            self._loop_thread_id = threading.get_ident()
+            self._last_beat = time.monotonic()
+            self._sampler = loop.create_task(self._sample_lag())
+        if self.slow_callbacks and (self._watchdog is None or not self._watchdog.is_alive()):
+            self._watchdog_stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+        self._stop_watchdog()
+
+    def _stop_watchdog(self) -> None:
+        self._watchdog_stop.set()
+        if self._watchdog is not None and self._watchdog is not threading.current_thread():
+            self._watchdog.join(1)
+        self._watchdog = None
+
+    def configure(self, loop_lag: Optional[bool] = None, slow_callbacks: Optional[bool] = None,
+                  spans: Optional[bool] = None, slow_callback_threshold: Optional[float] = None) -> None:
+        """Change settings at runtime; must be called from the event loop thread."""
+        if loop_lag is not None:
+            self.loop_lag = loop_lag
+        if slow_callbacks is not None:
+            self.slow_callbacks = slow_callbacks
+        if spans is not None:
+            self.spans = spans
+        if slow_callback_threshold is not None:
+            self.slow_callback_threshold = slow_callback_threshold
+        if not self.slow_callbacks:
+            self._stop_watchdog()
+        if not self.loop_lag and not self.slow_callbacks and self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+        self.start()
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - start - self.lag_interval)
+            self._last_beat = time.monotonic()
+            if self.loop_lag:
+                with self._lock:
+                    self._lag.add(lag)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._watchdog_stop.wait(self.slow_callback_threshold / 4):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.lag_interval
+            if blocked < self.slow_callback_threshold:
+                continue
+            with self._lock:
+                if beat == reported_beat:
+                    # Still the same stall: extend the record instead of adding another
+                    self._slow_callbacks[-1]["blocked_seconds"] = round(blocked, 4)
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                reported_beat = beat
+                self._slow_callbacks.append({
+                    "detected_at": time.time(),
+                    "blocked_seconds": round(blocked, 4),
+                    "stack": traceback.format_stack(frame),
+                })
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time the enclosed block as one occurrence of a crawl stage."""
+        if not self.spans:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                series = self._spans.get(stage)
+                if series is None:
+                    series = self._spans[stage] = _Series()
+                series.add(elapsed)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._lag = _Series()
+            self._spans.clear()
+            self._slow_callbacks.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "settings": {
+                    "loop_lag": self.loop_lag,
+                    "slow_callbacks": self.slow_callbacks,
+                    "spans": self.spans,
+                    "lag_interval": self.lag_interval,
+                    "slow_callback_threshold": self.slow_callback_threshold,
+                },
+                "loop_lag_seconds": self._lag.stats(),
+                "spans_seconds": {stage: series.stats() for stage, series in self._spans.items()},
+                "slow_callbacks": list(self._slow_callbacks),
+            }
+
+
+class ProfileInProgress(Exception):
+    """Raised when a CPU profile is requested while another one is running."""
+
+
+class CpuProfiler:
+    """Time-boxed CPU profiles of the running process, one at a time.
+
+    - sample() walks every thread's stack at a fixed interval from a separate
+      thread and aggregates them as collapsed stacks ("a;b;c count"), the input
+      format of flame graph tools. Overhead is bounded by the interval and does
+      not depend on how much code runs.
+    - profile_loop() enables cProfile on the event loop thread and returns
+      pstats output. It is exact but slows down the profiled code.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = False
+
+    def _begin(self) -> None:
+        with self._lock:
+            if self.running:
+                raise ProfileInProgress("A CPU profile is already running")
+            self.running = True
+
+    def _end(self) -> None:
+        with self._lock:
+            self.running = False
+
+    def sample(self, seconds: float, interval: float) -> str:
+        """Sample all threads for `seconds`; blocks, so run it in an executor."""
+        self._begin()
+        try:
+            own_thread = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            counts: Dict[str, int] = {}
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    key = ";".join(reversed(stack))
+                    counts[key] = counts.get(key, 0) + 1
+                time.sleep(interval)
+            return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+        finally:
+            self._end()
+
+    async def profile_loop(self, seconds: float, top: int) -> str:
+        """Run cProfile on the event loop thread for `seconds` and return the top functions."""
+        self._begin()
+        try:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+            output = io.StringIO()
+            pstats.Stats(profile, stream=output).sort_stats("cumulative").print_stats(top)
+            return output.getvalue()
+        finally:
+            self._end()
+
+
+class MemoryTracker:
+    """tracemalloc snapshots with top allocation sites and diffs against the previous snapshot."""
+
+    # Frames of the tracing machinery itself are not interesting
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    def start(self, nframes: int) -> None:
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            tracemalloc.start(nframes)
+            self._previous = None
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    @staticmethod
+    def _describe(stat, key_type: str) -> dict:
+        entry = {"size_bytes": stat.size, "count": stat.count}
+        if isinstance(stat, tracemalloc.StatisticDiff):
+            entry["size_diff_bytes"] = stat.size_diff
+            entry["count_diff"] = stat.count_diff
+        frames = stat.traceback if key_type == "traceback" else stat.traceback[:1]
+        entry["traceback"] = [f"{frame.filename}:{frame.lineno}" for frame in frames]
+        return entry
+
+    def snapshot(self, top: int, key_type: str = "lineno", diff: bool = False) -> dict:
+        """Take a snapshot and return its top allocation sites, or with diff=True the
+        sites that grew most since the previous snapshot. The snapshot becomes the
+        baseline of the next diff."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running")
+            snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+            current, peak = tracemalloc.get_traced_memory()
+            diff = diff and self._previous is not None
+            if diff:
+                stats = snapshot.compare_to(self._previous, key_type)
+            else:
+                stats = snapshot.statistics(key_type)
+            self._previous = snapshot
+        return {
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "diff": diff,
+            "top": [self._describe(stat, key_type) for stat in stats[:top]],
+        }
+
+
+profiler = LoopProfiler(
+    PROFILE_LOOP_LAG,
+    PROFILE_SLOW_CALLBACKS,
+    PROFILE_SPANS,
+    PROFILE_LOOP_LAG_INTERVAL,
+    PROFILE_SLOW_CALLBACK_THRESHOLD,
+)
+
+
+cpu_profiler = CpuProfiler()
+memory_tracker = MemoryTracker()
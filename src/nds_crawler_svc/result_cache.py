@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from nds_crawler_svc.config import RESULT_CACHE_MAX_BYTES
+
+# Generations kept for jobs that have no cached pages, most recently stored first
+MAX_IDLE_GENERATIONS = 1024
+
+
+class ResultPageCache:
+    """Byte-bounded LRU cache of serialized /results pages.
+
+    Each job has a generation counter that storage bumps whenever a record is
+    stored for it. Cache keys include the generation, and bumping it drops the
+    job's cached pages, so readers never see a page from before a write.
+    A job's generation is forgotten once its last cached page is evicted, and
+    only the MAX_IDLE_GENERATIONS most recently stored jobs without cached pages
+    keep theirs, so the counters of jobs nobody reads do not pile up. Cache keys
+    also hold the job directory's mtime, which tells a restarted counter apart.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (job_id, etag, body)
+        self._job_keys = {}  # job_id -> set of keys
+        self._generations = OrderedDict()  # job_id -> generation, least recently stored first
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generation(self, job_id: str) -> int:
+        with self._lock:
+            return self._generations.get(job_id, 0)
+
+    def bump_generation(self, job_id: str) -> None:
+        """Invalidate every cached page of job_id."""
+        with self._lock:
+            self._generations[job_id] = self._generations.get(job_id, 0) + 1
+            self._generations.move_to_end(job_id)
+            for key in self._job_keys.pop(job_id, ()):
+                _, _, body = self._entries.pop(key)
+                self._size -= len(body)
+            excess = len(self._generations) - len(self._job_keys) - MAX_IDLE_GENERATIONS
+            if excess > 0:
+                idle = [old_job_id for old_job_id in self._generations if old_job_id not in self._job_keys]
+                for old_job_id in idle[:excess]:
+                    del self._generations[old_job_id]
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, job_id: str, key: Hashable, etag: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[2])
+            self._entries[key] = (job_id, etag, body)
+            self._job_keys.setdefault(job_id, set()).add(key)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                old_key, (old_job_id, _, old_body) = self._entries.popitem(last=False)
+                self._size -= len(old_body)
+                self._job_keys[old_job_id].discard(old_key)
+                if not self._job_keys[old_job_id]:
+                    del self._job_keys[old_job_id]
+                    self._generations.pop(old_job_id, None)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._job_keys.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+result_cache = ResultPageCache(RESULT_CACHE_MAX_BYTES)
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+import asyncio
+import hmac
+import logging
+from typing import Optional
+
+from nds_crawler_svc import config
+from nds_crawler_svc.profiling import ProfileInProgress, cpu_profiler, memory_tracker, profiler
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without the configured admin token; the endpoints do not exist when ADMIN_TOKEN is unset."""
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token or "", config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/debug", dependencies=[Depends(require_admin_token)])
+
+
+class ProfileSettings(BaseModel):
+    # Omitted settings keep their current value.
+    loop_lag: Optional[bool] = None
+    slow_callbacks: Optional[bool] = None
+    spans: Optional[bool] = None
+    slow_callback_threshold: Optional[float] = Field(None, gt=0)
+    reset: bool = False
+
+
+@router.get("/profile")
+def get_profile() -> dict:
+    """
+    Endpoint returning event-loop lag, slow callback stacks and per-stage crawl timings.
+    """
+    return profiler.stats()
+
+
+@router.post("/profile")
+async def update_profile(settings: ProfileSettings) -> dict:
+    """
+    Endpoint switching profilers on or off at runtime; `reset` discards collected data.
+    Runs on the event loop so that the lag sampler is started there.
+    """
+    if settings.reset:
+        profiler.reset()
+    profiler.configure(
+        loop_lag=settings.loop_lag,
+        slow_callbacks=settings.slow_callbacks,
+        spans=settings.spans,
+        slow_callback_threshold=settings.slow_callback_threshold,
+    )
+    return profiler.stats()
+
+
+@router.post("/cpu-profile", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0),
+    format: str = Query("collapsed", pattern="^(collapsed|pstats)$"),
+    interval: float = Query(0.01, ge=0.001, le=1),
+    top: int = Query(50, gt=0),
+) -> str:
+    """
+    Endpoint running a CPU profile of this worker and returning it when done.
+
+    `collapsed` samples the stacks of all threads every `interval` seconds and
+    returns collapsed stacks for flame graphs; `pstats` runs cProfile on the event
+    loop thread and returns the `top` functions by cumulative time. Only one
+    profile runs at a time.
+    """
+    if seconds > config.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must not exceed {config.PROFILE_MAX_SECONDS}")
+    try:
+        if format == "pstats":
+            return await cpu_profiler.profile_loop(seconds, top)
+        return await asyncio.get_running_loop().run_in_executor(None, cpu_profiler.sample, seconds, interval)
+    except ProfileInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="CPU profile failed")
+
+
+@router.post("/memory/start")
+def start_memory_tracing(nframes: int = Query(10, gt=0, le=100)) -> dict:
+    """
+    Endpoint starting tracemalloc, keeping `nframes` frames per allocation.
+    """
+    memory_tracker.start(nframes)
+    return {"tracing": True, "nframes": nframes}
+
+
+@router.post("/memory/stop")
+def stop_memory_tracing() -> dict:
+    """
+    Endpoint stopping tracemalloc and freeing its traces.
+    """
+    memory_tracker.stop()
+    return {"tracing": False}
+
+
+@router.get("/memory/snapshot")
+async def memory_snapshot(
+    top: int = Query(25, gt=0),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    diff: bool = False,
+) -> dict:
+    """
+    Endpoint returning the top allocation sites, or with `diff=true` the sites that
+    grew most since the previous snapshot, plus the number of pending asyncio tasks.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        snapshot = await loop.run_in_executor(None, memory_tracker.snapshot, top, key_type, diff)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    snapshot["pending_tasks"] = len(asyncio.all_tasks(loop))
+    return snapshot
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request
+import logging
+from sqlalchemy import text
+
+from nds_crawler_svc.models.base import get_engine
+
+router = APIRouter()
+
+
+def _ping_database() -> None:
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@router.get("/ready")
+def ready(request: Request) -> dict:
+    """
+    Readiness endpoint: 503 until start-up has finished or while the database is unreachable.
+    """
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Starting up.")
+    try:
+        _ping_database()
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=503, detail="Database unavailable.")
+    return {"status": "ready"}
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+import logging
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.models.base import get_db
+from nds_crawler_svc.models.crawl_jobs import CrawlJob
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, session: Session = Depends(get_db)) -> dict:
+    """
+    Endpoint returning a crawl job's status from the shared job registry,
+    whichever worker process runs it.
+    """
+    try:
+        job = session.get(CrawlJob, job_id)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "priority": job.priority,
+        "worker": job.worker,
+        "pages_processed": job.pages_processed,
+        "started_at": job.started_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
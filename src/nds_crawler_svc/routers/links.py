@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.models.base import get_db
+from nds_crawler_svc.service.link_graph import get_inlinks, get_outlinks
+
+router = APIRouter(prefix="/links")
+
+
+@router.get("/outlinks")
+def outlinks(url: str, session: Session = Depends(get_db)) -> dict:
+    """
+    Endpoint returning the links found on a crawled page.
+    """
+    try:
+        links = get_outlinks(url, session)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    if links is None:
+        raise HTTPException(status_code=404, detail="No links recorded for this URL.")
+    return {"url": url, "outlinks": links}
+
+
+@router.get("/inlinks")
+def inlinks(url: str, limit: int = Query(100, gt=0, le=1000), session: Session = Depends(get_db)) -> dict:
+    """
+    Endpoint returning crawled pages that link to the given URL.
+    """
+    try:
+        links = get_inlinks(url, session, limit)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    if links is None:
+        raise HTTPException(status_code=404, detail="URL is not in the link graph.")
+    return {"url": url, "inlinks": links}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+
+from nds_crawler_svc.maintenance import maintenance
+from nds_crawler_svc.result_cache import result_cache
+from nds_crawler_svc.service.crawl_scheduler import crawl_scheduler
+from nds_crawler_svc.service.dns_cache import dns_cache
+from nds_crawler_svc.service.fetch_strategy import fetch_strategy
+from nds_crawler_svc.service.frontier import frontiers
+from nds_crawler_svc.service.redirects import redirect_cache
+from nds_crawler_svc.service.retry_policy import host_breakers
+from nds_crawler_svc.write_queue import write_queue
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics() -> dict:
+    """
+    Endpoint exposing in-process crawler metrics as JSON.
+    """
+    return {
+        "dns": dns_cache.stats(),
+        "result_cache": result_cache.stats(),
+        "open_circuits": host_breakers.open_hosts(),
+        "fetch": fetch_strategy.stats(),
+        "redirects": redirect_cache.stats(),
+        "scheduler": crawl_scheduler.stats(),
+        "maintenance": maintenance.stats(),
+        "frontiers": {job_id: frontier.stats() for job_id, frontier in list(frontiers.items())},
+        "write_queue": write_queue.stats() if write_queue is not None else None,
+    }
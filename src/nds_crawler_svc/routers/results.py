@@ -1,59 +1,190 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from pydantic import BaseModel
 import os
-import json
+import stat
+import hashlib
 import logging
-from typing import List, Any
+from typing import List, Any, Optional
+
+from nds_crawler_svc import serialization, storage
+from nds_crawler_svc.result_cache import result_cache
 
 router = APIRouter()
 
+# Fields a stored record must contain to be listed, in response order.
+RESULT_FIELDS = ("url", "title", "metadata", "content")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
 class CrawlResult(BaseModel):
-    url: str
-    title: str
-    metadata: Any
-    content: str
+    # Fields are optional so that a `fields=` projection can omit them.
+    url: Optional[str] = None
+    title: Optional[str] = None
+    metadata: Any = None
+    content: Optional[str] = None
+
 
 class PaginatedResults(BaseModel):
     results: List[CrawlResult]
-    current_page: int
-    total_pages: int
+    current_page: Optional[int] = None
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
-@router.get("/results/{job_id}", response_model=PaginatedResults)
-def get_crawl_results(job_id: str, page: int = Query(1, gt=0)) -> PaginatedResults:
-    if not job_id:
-        raise HTTPException(status_code=400, detail="job_id must be a non-empty string")
-    directory = os.path.join("data", job_id)
-    if not os.path.exists(directory) or not os.path.isdir(directory):
-        raise HTTPException(status_code=404, detail="Job results not found")
+
+def _parse_fields(fields: Optional[str]) -> tuple:
+    """Parse a comma separated `fields=` projection into an ordered tuple of field names."""
+    if fields is None:
+        return RESULT_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(RESULT_FIELDS)
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a comma separated subset of: {', '.join(RESULT_FIELDS)}",
+        )
+    return tuple(f for f in RESULT_FIELDS if f in requested)
+
+
+def _load_record(file_path: str, fields: tuple) -> Optional[dict]:
+    """Load a stored record and project it onto `fields`; returns None for malformed records.
+
+    Projections without `content` are served from the record's header when it has
+    one, so the compressed record is not read.
+
+    Stored records are trusted, so a required-key check replaces model validation.
+    """
     try:
-        files = [f for f in os.listdir(directory) if f.endswith('.json')]
+        if "content" not in fields:
+            header = storage.read_record_header(file_path)
+            if header is not None and all(k in header for k in fields):
+                return {k: header[k] for k in fields}
+        data = storage.read_crawled_data(file_path)
+        if all(k in data for k in RESULT_FIELDS):
+            return {k: data[k] for k in fields}
+    except Exception as e:
+        logging.error(e, exc_info=True)
+    # Skip malformed files and continue processing
+    return None
+
+
+def _build_page(directory: str, page: int, cursor: Optional[str], limit: int, projection: tuple) -> dict:
+    """Read the records of one result page from a job directory and return the response body."""
+    try:
+        # Map each record key to its file; compressed and plain records can coexist
+        files = {}
+        for file_name in os.listdir(directory):
+            key = storage.record_key(file_name)
+            if key is not None:
+                files[key] = os.path.join(directory, file_name)
+        keys = list(files)
     except Exception as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error reading job directory")
     try:
-        # Sort files in descending order based on the timestamp part of the filename
-        files.sort(key=lambda x: x.rstrip('.json'), reverse=True)
+        # Sort record keys in descending order (newest first)
+        keys.sort(reverse=True)
     except Exception as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error sorting files")
-    results = []
-    for file_name in files:
-        file_path = os.path.join(directory, file_name)
-        try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-            if all(k in data for k in ("url", "title", "metadata", "content")):
-                results.append(data)
-        except Exception as e:
-            logging.error(e, exc_info=True)
-            # Skip malformed files and continue processing
-            continue
-    total_items = len(results)
-    page_size = 100
-    total_pages = (total_items + page_size - 1) // page_size if total_items > 0 else 1
+
+    if cursor is not None:
+        # Keyset pagination: read only records older than the cursor, stopping
+        # as soon as one record beyond the page proves there is a next page.
+        page_results = []
+        page_keys = []
+        has_more = False
+        for key in keys:
+            if key >= cursor:
+                continue
+            record = _load_record(files[key], projection)
+            if record is None:
+                continue
+            if len(page_results) == limit:
+                has_more = True
+                break
+            page_results.append(record)
+            page_keys.append(key)
+        next_cursor = page_keys[-1] if has_more else None
+        return {"results": page_results, "next_cursor": next_cursor}
+
+    # Offset pagination: totals come from the record keys, so only the records
+    # of the requested page are read. Malformed records are skipped, which can
+    # leave a page short.
+    total_items = len(keys)
+    total_pages = (total_items + limit - 1) // limit if total_items > 0 else 1
     if page > total_pages:
         raise HTTPException(status_code=400, detail="Page number out of range")
-    start_index = (page - 1) * page_size
-    end_index = start_index + page_size
-    paginated_results = results[start_index:end_index]
-    return PaginatedResults(results=paginated_results, current_page=page, total_pages=total_pages)
+    start_index = (page - 1) * limit
+    end_index = start_index + limit
+    paginated_results = []
+    for key in keys[start_index:end_index]:
+        record = _load_record(files[key], projection)
+        if record is not None:
+            paginated_results.append(record)
+    next_cursor = keys[end_index - 1] if page < total_pages else None
+    return {
+        "results": paginated_results,
+        "current_page": page,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/results/{job_id}", response_model=PaginatedResults)
+def get_crawl_results(
+    job_id: str,
+    page: int = Query(1, gt=0),
+    cursor: Optional[str] = Query(None, min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """Return stored crawl results for a job, newest first.
+
+    Records are keyed by their storage sequence (the timestamp part of the filename).
+    Passing `cursor` (the `next_cursor` of a previous response) switches to keyset
+    pagination, which only reads the records of the requested page. Without a cursor,
+    offset pagination by `page` is used and `total_pages` is reported.
+
+    Serialized pages are cached and carry an ETag; a matching If-None-Match
+    returns 304 without reading the job directory.
+
+    A `fields=` projection without `content` is read from the records' uncompressed
+    headers; records stored without a header are decoded in full.
+    """
+    if not job_id:
+        raise HTTPException(status_code=400, detail="job_id must be a non-empty string")
+    projection = _parse_fields(fields)
+    directory = os.path.join(storage.STORAGE_DIR, job_id)
+    try:
+        dir_stat = os.stat(directory)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Job results not found")
+    if not stat.S_ISDIR(dir_stat.st_mode):
+        raise HTTPException(status_code=404, detail="Job results not found")
+
+    # The generation covers records stored by this process; the directory's inode
+    # and mtime cover records written by other processes.
+    cache_key = (
+        job_id,
+        result_cache.generation(job_id),
+        dir_stat.st_ino,
+        dir_stat.st_mtime_ns,
+        page if cursor is None else None,
+        cursor,
+        limit,
+        projection,
+    )
+    etag = '"' + hashlib.sha1(repr(cache_key).encode("utf-8")).hexdigest() + '"'
+    if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        body = cached[1]
+    else:
+        # Serialize directly; PaginatedResults only documents the response shape.
+        body = serialization.dumps(_build_page(directory, page, cursor, limit, projection))
+        result_cache.put(job_id, cache_key, etag, body)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
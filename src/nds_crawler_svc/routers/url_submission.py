@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from nds_crawler_svc.models.base import get_db
 from nds_crawler_svc.service.deduplication import is_recently_crawled
 from nds_crawler_svc.crawling_job import start_crawling_job
+from nds_crawler_svc.service.job_registry import new_job_id
 
 router = APIRouter()
 
@@ -29,9 +30,11 @@ async def submit_url(payload: dict, session: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error.")
     
     # Trigger the crawling job asynchronously without affecting the immediate HTTP response.
+    # Single URL submissions are interactive and are served ahead of batch jobs.
+    job_id = new_job_id()
     try:
-        asyncio.create_task(start_crawling_job(url, depth=0))
+        asyncio.create_task(start_crawling_job(url, depth=0, job_id=job_id, priority="interactive"))
     except Exception as e:
         logging.error(e, exc_info=True)
     
-    return {"message": "URL submitted for crawling."}
+    return {"message": "URL submitted for crawling.", "job_id": job_id}
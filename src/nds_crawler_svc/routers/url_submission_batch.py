@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Request, HTTPException
 import asyncio
-import datetime
 import logging
 
 from nds_crawler_svc.crawling_job import start_crawling_job
+from nds_crawler_svc.service.job_registry import new_job_id
+from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+from nds_crawler_svc.service.crawl_scheduler import PRIORITY_CLASSES
 
 router = APIRouter()
 
@@ -36,11 +38,35 @@ async def submit_batch_urls(request: Request):
     if not valid_urls:
         raise HTTPException(status_code=400, detail="No valid URLs provided")
 
-    job_id = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    # Optional crawl policy shared by every URL of this job
+    policy = None
+    if payload.get("policy") is not None:
+        try:
+            policy = CrawlPolicy.from_dict(payload["policy"], seeds=valid_urls)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid crawl policy: {e}")
+
+    # Scheduling class and fair-share weight of this job relative to other jobs
+    priority = payload.get("priority", "normal")
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f"'priority' must be one of: {', '.join(PRIORITY_CLASSES)}.")
+    weight = payload.get("weight", 1.0)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+        raise HTTPException(status_code=400, detail="'weight' must be a positive number.")
+
+    # Also queue the pages listed in each seed site's sitemaps
+    use_sitemaps = payload.get("use_sitemaps", False)
+    if not isinstance(use_sitemaps, bool):
+        raise HTTPException(status_code=400, detail="'use_sitemaps' must be a boolean.")
+
+    job_id = new_job_id()
 
     for url in valid_urls:
         try:
-            asyncio.create_task(start_crawling_job(url))
+            asyncio.create_task(
+                start_crawling_job(url, policy=policy, job_id=job_id, priority=priority, weight=float(weight),
+                                   use_sitemaps=use_sitemaps)
+            )
         except Exception as e:
             logging.error(e, exc_info=True)
 
@@ -0,0 +1,68 @@
+import json
+import logging
+from typing import Any, Callable, Dict, Tuple, Union
+
+from nds_crawler_svc.config import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # orjson support is optional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec support is optional
+    msgspec = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    # Non-string keys are coerced like the stdlib encoder does
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _build_backends() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[Union[bytes, str]], Any]]]:
+    backends = {}
+    if orjson is not None:
+        backends["orjson"] = (_orjson_dumps, orjson.loads)
+    if msgspec is not None:
+        encoder = msgspec.json.Encoder()
+        decoder = msgspec.json.Decoder()
+        backends["msgspec"] = (encoder.encode, decoder.decode)
+    backends["json"] = (_json_dumps, _json_loads)
+    return backends
+
+
+# Installed backends in order of preference. Every backend raises TypeError for
+# unserializable objects and ValueError for malformed input, like the stdlib json module.
+BACKENDS = _build_backends()
+
+
+def _select_backend(name: str) -> str:
+    if name == "auto":
+        return next(iter(BACKENDS))
+    if name not in BACKENDS:
+        logging.warning(f"JSON backend {name!r} is not available; falling back to stdlib json")
+        return "json"
+    return name
+
+
+BACKEND = _select_backend(JSON_BACKEND)
+_dumps, _loads = BACKENDS[BACKEND]
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON with the configured backend."""
+    return _dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize JSON bytes or text with the configured backend."""
+    return _loads(data)
@@ -0,0 +1,224 @@
+import csv
+import datetime
+import io
+import itertools
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence
+
+from sqlalchemy import Table, bindparam, select
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.config import BULK_LOAD_BATCH_SIZE
+from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
+from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+from nds_crawler_svc.service.recrawl import SCHEDULE_STATE, schedule_after_crawl
+
+# PostgreSQL drivers whose cursors can stream rows to COPY ... FROM STDIN
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+# URLs per IN (...) lookup of existing rows
+_LOOKUP_CHUNK = 500
+
+
+class CrawlRecord(NamedTuple):
+    """A crawled page waiting to be recorded by bulk_record_crawls."""
+    url: str
+    # Every URL the page was reached through, ending with its final URL
+    chain: Sequence[str]
+    content_hash: str
+    crawled_at: datetime.datetime
+    # Whether the page was fetched by a scheduled re-crawl
+    recrawl: bool = False
+
+
+def _chunks(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _copy_upsert(table: Table, rows: List[dict], key_columns: Sequence[str], session: Session) -> None:
+    """Stream rows into a temporary staging table with COPY and merge them into table."""
+    connection = session.connection()
+    quote = connection.dialect.identifier_preparer.quote
+    columns = list(rows[0])
+    column_list = ", ".join(quote(column) for column in columns)
+    staging = quote(f"staging_{table.name}")
+    target = quote(table.name)
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {column_list} FROM {target} WITH NO DATA"
+    )
+    cursor = connection.connection.cursor()
+    try:
+        for batch in _chunks(rows, BULK_LOAD_BATCH_SIZE):
+            values = ([row[column] for column in columns] for row in batch)
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2 reads a CSV file object; unquoted empty fields are NULL
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(values)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                # psycopg 3 adapts each value itself
+                with cursor.copy(f"COPY {staging} ({column_list}) FROM STDIN") as copy:
+                    for value in values:
+                        copy.write_row(value)
+    finally:
+        cursor.close()
+    updates = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}" for column in columns if column not in key_columns
+    )
+    connection.exec_driver_sql(
+        f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT ({', '.join(quote(column) for column in key_columns)}) DO UPDATE SET {updates}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {staging}")
+
+
+def _executemany_upsert(table: Table, rows: List[dict], key_columns: Sequence[str], session: Session) -> None:
+    """Upsert rows with batched executemany statements."""
+    dialect = session.get_bind().dialect.name
+    update_columns = [column for column in rows[0] if column not in key_columns]
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c[column] for column in key_columns],
+            set_={column: statement.excluded[column] for column in update_columns},
+        )
+        for batch in _chunks(rows, BULK_LOAD_BATCH_SIZE):
+            session.execute(statement, batch)
+        return
+
+    # Without an upsert statement, update the rows that exist and insert the rest
+    key = key_columns[0]
+    update = table.update().where(table.c[key] == bindparam(f"b_{key}")).values(
+        {column: bindparam(f"b_{column}") for column in update_columns}
+    )
+    for batch in _chunks(rows, BULK_LOAD_BATCH_SIZE):
+        existing = set()
+        for chunk in _chunks([row[key] for row in batch], _LOOKUP_CHUNK):
+            existing.update(session.execute(select(table.c[key]).where(table.c[key].in_(chunk))).scalars())
+        updates = [{f"b_{column}": value for column, value in row.items()} for row in batch if row[key] in existing]
+        inserts = [row for row in batch if row[key] not in existing]
+        if updates:
+            session.execute(update, updates)
+        if inserts:
+            session.execute(table.insert(), inserts)
+
+
+def bulk_upsert(table: Table, rows: List[dict], key_columns: Sequence[str], session: Session) -> int:
+    """
+    Insert rows into table, overwriting the rows whose key columns already exist.
+
+    On PostgreSQL with psycopg2 or psycopg 3 the rows are streamed with COPY into
+    a temporary staging table and merged with one INSERT ... ON CONFLICT; other
+    databases get batched executemany upserts. All rows must have the same
+    columns and distinct keys. The caller commits.
+
+    Parameters:
+    - table: The target table.
+    - rows: Column values of each row.
+    - key_columns: Columns of the table's unique key.
+    - session: SQLAlchemy Session instance.
+
+    Returns:
+    - The number of rows written.
+    """
+    if not rows:
+        return 0
+    bind = session.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver in COPY_DRIVERS:
+        _copy_upsert(table, rows, key_columns, session)
+    else:
+        _executemany_upsert(table, rows, key_columns, session)
+    return len(rows)
+
+
+def _load_schedules(urls: Iterable[str], session: Session) -> Dict[str, dict]:
+    table = UrlRevisitSchedule.__table__
+    columns = [table.c.url, *(table.c[column] for column in SCHEDULE_STATE)]
+    entries = {}
+    for chunk in _chunks(list(urls), _LOOKUP_CHUNK):
+        for row in session.execute(select(*columns).where(table.c.url.in_(chunk))):
+            entries[row.url] = dict(row._mapping)
+    return entries
+
+
+def bulk_record_crawls(records: Sequence[CrawlRecord], session: Session) -> int:
+    """
+    Record many crawled pages at once: the bulk counterpart of mark_crawled and record_crawl.
+
+    Every URL of each page's chain is marked as crawled, and each page's revisit
+    schedule is updated, with one bulk upsert per table.
+
+    Parameters:
+    - records: The crawled pages, oldest first.
+    - session: SQLAlchemy Session instance; the change is committed.
+
+    Returns:
+    - The number of records written.
+    """
+    if not records:
+        return 0
+    crawled = {}
+    for record in records:
+        for url in record.chain:
+            crawled[url] = max(crawled.get(url, record.crawled_at), record.crawled_at)
+    # A page crawled twice in the batch builds on its own earlier entry
+    schedules = _load_schedules({record.url for record in records}, session)
+    for record in records:
+        schedules[record.url] = schedule_after_crawl(
+            record.url, record.content_hash, record.crawled_at, schedules.get(record.url), record.recrawl
+        )
+    bulk_upsert(
+        RecentlyCrawledUrl.__table__,
+        [{"url": url, "crawl_timestamp": crawled_at} for url, crawled_at in crawled.items()],
+        ["url"],
+        session,
+    )
+    bulk_upsert(UrlRevisitSchedule.__table__, list(schedules.values()), ["url"], session)
+    session.commit()
+    return len(records)
+
+
+class CrawlRecordBuffer:
+    """
+    Crawled pages waiting to be written by bulk_record_crawls.
+
+    The URLs of buffered pages stay visible through `in` until their write has
+    finished, so that the crawl can treat them as crawled in the meantime.
+    """
+
+    def __init__(self, max_records: int):
+        self.max_records = max(1, max_records)
+        self._records: List[CrawlRecord] = []
+        self._urls: Dict[str, int] = {}
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: CrawlRecord) -> bool:
+        """Buffer a record; returns True once the buffer is full and should be written."""
+        self._records.append(record)
+        for url in record.chain:
+            self._urls[url] = self._urls.get(url, 0) + 1
+        return len(self._records) >= self.max_records
+
+    def take(self) -> List[CrawlRecord]:
+        """Remove and return the buffered records; their URLs stay visible until done() is called."""
+        records, self._records = self._records, []
+        return records
+
+    def done(self, records: Iterable[CrawlRecord]) -> None:
+        """Forget the URLs of records that have been written (or given up on)."""
+        for url in itertools.chain.from_iterable(record.chain for record in records):
+            count = self._urls.get(url, 0) - 1
+            if count > 0:
+                self._urls[url] = count
+            else:
+                self._urls.pop(url, None)
@@ -0,0 +1,135 @@
+import os
+import re
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+# Hard limit on recursion depth; a policy may only lower it
+MAX_CRAWL_DEPTH = 5
+
+SCOPES = ("same_host", "same_domain", "any")
+
+# Public suffixes made of two labels, so that e.g. "example.co.uk" is treated as a
+# registrable domain instead of "co.uk". This is a heuristic, not the full public suffix list.
+MULTI_LABEL_SUFFIXES = frozenset({
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.jp", "ne.jp", "or.jp", "ac.jp",
+    "co.kr", "or.kr", "ac.kr",
+    "co.nz", "org.nz",
+    "com.br", "com.cn", "com.mx", "com.tr", "com.tw", "com.sg", "com.hk",
+    "co.in", "co.za", "co.il",
+})
+
+
+def registrable_domain(host: str) -> str:
+    """Return the registrable domain of host, e.g. "news.example.co.uk" -> "example.co.uk"."""
+    labels = host.lower().rstrip(".").split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _compile_patterns(patterns, name: str) -> Optional[re.Pattern]:
+    """Compile a list of regular expressions into a single alternation."""
+    if patterns is None:
+        return None
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        raise ValueError(f"'{name}' must be a list of regular expressions.")
+    if not patterns:
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p})" for p in patterns))
+    except re.error as e:
+        raise ValueError(f"Invalid pattern in '{name}': {e}")
+
+
+class CrawlPolicy:
+    """Per-job crawl scope and budget, evaluated for every link before it is enqueued."""
+
+    def __init__(
+        self,
+        seeds: Iterable[str] = (),
+        scope: str = "any",
+        allow: Optional[list] = None,
+        deny: Optional[list] = None,
+        exclude_extensions: Optional[list] = None,
+        max_depth: int = MAX_CRAWL_DEPTH,
+        max_pages: Optional[int] = None,
+    ):
+        if scope not in SCOPES:
+            raise ValueError(f"'scope' must be one of: {', '.join(SCOPES)}.")
+        if isinstance(max_depth, bool) or not isinstance(max_depth, int) or not 0 <= max_depth <= MAX_CRAWL_DEPTH:
+            raise ValueError(f"'max_depth' must be an integer between 0 and {MAX_CRAWL_DEPTH}.")
+        if max_pages is not None and (isinstance(max_pages, bool) or not isinstance(max_pages, int) or max_pages < 1):
+            raise ValueError("'max_pages' must be a positive integer.")
+        if exclude_extensions is None:
+            exclude_extensions = []
+        if not isinstance(exclude_extensions, list) or not all(isinstance(e, str) for e in exclude_extensions):
+            raise ValueError("'exclude_extensions' must be a list of file extensions.")
+
+        self.scope = scope
+        self.allow = _compile_patterns(allow, "allow")
+        self.deny = _compile_patterns(deny, "deny")
+        self.exclude_extensions = frozenset(
+            ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in exclude_extensions
+        )
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.pages_crawled = 0
+        self.seed_hosts = set()
+        self.seed_domains = set()
+        for seed in seeds:
+            self.add_seed(seed)
+
+    @classmethod
+    def from_dict(cls, data: dict, seeds: Iterable[str] = ()) -> "CrawlPolicy":
+        """Build a policy from a request payload, raising ValueError for invalid settings."""
+        if not isinstance(data, dict):
+            raise ValueError("'policy' must be a JSON object.")
+        allowed_keys = {"scope", "allow", "deny", "exclude_extensions", "max_depth", "max_pages"}
+        unknown = set(data) - allowed_keys
+        if unknown:
+            raise ValueError(f"Unknown policy settings: {', '.join(sorted(unknown))}.")
+        return cls(seeds=seeds, **data)
+
+    def add_seed(self, url: str) -> None:
+        host = (urlparse(url).hostname or "").lower()
+        if host:
+            self.seed_hosts.add(host)
+            self.seed_domains.add(registrable_domain(host))
+
+    def allows(self, url: str, depth: int) -> bool:
+        """Return True if url, discovered at the given depth, is in scope for this job."""
+        if depth > self.max_depth:
+            return False
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return False
+        host = (parsed.hostname or "").lower()
+        if self.scope == "same_host" and host not in self.seed_hosts:
+            return False
+        if self.scope == "same_domain" and registrable_domain(host) not in self.seed_domains:
+            return False
+        if self.exclude_extensions and os.path.splitext(parsed.path)[1].lower() in self.exclude_extensions:
+            return False
+        if self.deny is not None and self.deny.search(url):
+            return False
+        if self.allow is not None and not self.allow.search(url):
+            return False
+        return True
+
+    def exhausted(self) -> bool:
+        """Return True once every page of the job's budget is reserved."""
+        return self.max_pages is not None and self.pages_crawled >= self.max_pages
+
+    def acquire_page(self) -> bool:
+        """Reserve one page of the job's budget; returns False once max_pages is used up."""
+        if self.exhausted():
+            return False
+        self.pages_crawled += 1
+        return True
+
+    def release_page(self) -> None:
+        """Give back a page reserved by acquire_page() that was not stored, such as a failed fetch."""
+        if self.pages_crawled > 0:
+            self.pages_crawled -= 1
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Tuple
+
+from nds_crawler_svc.config import CRAWL_CONCURRENCY
+from nds_crawler_svc.stats import percentile
+
+# Priority classes, served strictly in this order
+PRIORITY_CLASSES = ("interactive", "normal", "bulk")
+
+# Wait-time samples kept per class for percentile estimates
+WAIT_SAMPLES = 1024
+
+
+class FairShareScheduler:
+    """Grants a bounded number of concurrent fetch slots across crawl jobs.
+
+    Waiting requests are served strictly by priority class. Within a class, jobs
+    share slots by weighted fair queuing: each grant advances the job's virtual
+    time by 1/weight and the backlogged job with the lowest virtual time goes
+    next. A job that starts waiting joins at the class's current virtual time,
+    so a huge batch cannot build up credit that starves newcomers.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        # class -> job_id -> waiting futures in arrival order
+        self._waiting: Dict[str, Dict[str, Deque[asyncio.Future]]] = {c: {} for c in PRIORITY_CLASSES}
+        # class -> job_id -> (virtual time, weight)
+        self._jobs: Dict[str, Dict[str, Tuple[float, float]]] = {c: {} for c in PRIORITY_CLASSES}
+        self._class_vtime: Dict[str, float] = {c: 0.0 for c in PRIORITY_CLASSES}
+        self._wait_count = {c: 0 for c in PRIORITY_CLASSES}
+        self._wait_total = {c: 0.0 for c in PRIORITY_CLASSES}
+        self._wait_max = {c: 0.0 for c in PRIORITY_CLASSES}
+        self._wait_samples = {c: deque(maxlen=WAIT_SAMPLES) for c in PRIORITY_CLASSES}
+
+    def _has_waiters(self) -> bool:
+        return any(self._waiting[c] for c in PRIORITY_CLASSES)
+
+    def _charge(self, priority: str, job_id: str, weight: float) -> None:
+        """Advance a job's virtual time for one granted slot."""
+        vtime, _ = self._jobs[priority].get(job_id, (0.0, weight))
+        start = max(vtime, self._class_vtime[priority])
+        self._class_vtime[priority] = start
+        self._jobs[priority][job_id] = (start + 1.0 / weight, weight)
+
+    def _dispatch(self) -> None:
+        while self.active < self.capacity:
+            priority = next((c for c in PRIORITY_CLASSES if self._waiting[c]), None)
+            if priority is None:
+                return
+            waiting = self._waiting[priority]
+            jobs = self._jobs[priority]
+            job_id = min(waiting, key=lambda j: max(jobs[j][0], self._class_vtime[priority]))
+            queue = waiting[job_id]
+            future = queue.popleft()
+            if not queue:
+                del waiting[job_id]
+            self._charge(priority, job_id, jobs[job_id][1])
+            self.active += 1
+            future.set_result(None)
+        # Forget idle jobs that hold no credit beyond the class's virtual time
+        for priority in PRIORITY_CLASSES:
+            jobs = self._jobs[priority]
+            for job_id in [j for j, (v, _) in jobs.items()
+                           if j not in self._waiting[priority] and v <= self._class_vtime[priority]]:
+                del jobs[job_id]
+
+    def _record_wait(self, priority: str, waited: float) -> None:
+        self._wait_count[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+        self._wait_samples[priority].append(waited)
+
+    async def acquire(self, job_id: str, priority: str = "normal", weight: float = 1.0) -> None:
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        start = time.monotonic()
+        if self.active < self.capacity and not self._has_waiters():
+            self._charge(priority, job_id, weight)
+            self.active += 1
+            self._record_wait(priority, 0.0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        jobs = self._jobs[priority]
+        if job_id not in jobs:
+            jobs[job_id] = (self._class_vtime[priority], weight)
+        self._waiting[priority].setdefault(job_id, deque()).append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before cancellation; hand it on
+                self.release()
+            else:
+                queue = self._waiting[priority].get(job_id)
+                if queue is not None and future in queue:
+                    queue.remove(future)
+                    if not queue:
+                        del self._waiting[priority][job_id]
+            raise
+        self._record_wait(priority, time.monotonic() - start)
+
+    def release(self) -> None:
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, job_id: str, priority: str = "normal", weight: float = 1.0):
+        """Hold one fetch slot for the duration of the block."""
+        await self.acquire(job_id, priority, weight)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "queued": {c: sum(len(q) for q in self._waiting[c].values()) for c in PRIORITY_CLASSES},
+            "wait_seconds": {
+                c: {
+                    "count": self._wait_count[c],
+                    "avg": self._wait_total[c] / self._wait_count[c] if self._wait_count[c] else 0.0,
+                    "p50": percentile(self._wait_samples[c], 0.5),
+                    "p99": percentile(self._wait_samples[c], 0.99),
+                    "max": self._wait_max[c],
+                }
+                for c in PRIORITY_CLASSES
+            },
+        }
+
+
+crawl_scheduler = FairShareScheduler(CRAWL_CONCURRENCY)
@@ -0,0 +1,99 @@
+import codecs
+import re
+from typing import Optional, Tuple
+
+try:
+    from charset_normalizer import from_bytes as detect_encodings
+except ImportError:  # charset detection is optional
+    detect_encodings = None
+
+from nds_crawler_svc.config import CHARSET_DETECT_SAMPLE, CHARSET_SNIFF_BYTES
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+# <meta charset="..."> and <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+
+
+def _normalize(name: Optional[str]) -> Optional[str]:
+    """Return Python's codec name for a charset label, or None if it is unknown."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def charset_from_header(content_type: str) -> Optional[str]:
+    match = HEADER_CHARSET.search(content_type or "")
+    return _normalize(match.group(1)) if match else None
+
+
+def sniff_meta_charset(body: bytes) -> Optional[str]:
+    """Find a charset declared by a <meta> tag in the first CHARSET_SNIFF_BYTES of the body."""
+    match = META_CHARSET.search(body[:CHARSET_SNIFF_BYTES])
+    if not match:
+        return None
+    return _normalize(match.group(1).decode("ascii", "ignore"))
+
+
+def detect_charset(body: bytes) -> Tuple[str, str]:
+    """
+    Pick the charset of an undeclared body from its byte order mark or content.
+
+    Parameters:
+    - body: The raw body.
+
+    Returns:
+    - (charset, source) where source is "bom", "utf-8" or "detected".
+    """
+    for bom, name in BOMS:
+        if body.startswith(bom):
+            return name, "bom"
+    sample = body[:CHARSET_DETECT_SAMPLE]
+    try:
+        sample.decode("utf-8")
+        return "utf-8", "utf-8"
+    except UnicodeDecodeError as e:
+        # The sample may end inside a multibyte character
+        if e.reason == "unexpected end of data" and len(sample) < len(body):
+            return "utf-8", "utf-8"
+    if detect_encodings is not None:
+        match = detect_encodings(sample).best()
+        name = _normalize(match.encoding) if match is not None else None
+        if name:
+            return name, "detected"
+    # The encoding browsers assume for undeclared legacy pages
+    return "cp1252", "detected"
+
+
+def resolve_charset(body: bytes, content_type: str) -> Tuple[str, str]:
+    """
+    Determine how to decode an HTML body without decoding it.
+
+    Follows the order browsers use: the Content-Type header charset, then a
+    <meta> charset near the start of the document, then a byte order mark, UTF-8
+    validity or a detector run on a bounded sample.
+
+    Parameters:
+    - body: The raw body.
+    - content_type: The response's Content-Type header.
+
+    Returns:
+    - (charset, source) where source is "header", "meta", "bom", "utf-8" or "detected".
+    """
+    charset = charset_from_header(content_type)
+    if charset:
+        return charset, "header"
+    charset = sniff_meta_charset(body)
+    if charset:
+        return charset, "meta"
+    return detect_charset(body)
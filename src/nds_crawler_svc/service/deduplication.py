@@ -1,10 +1,16 @@
 import datetime
 import logging
+from typing import Iterable, NamedTuple, Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
 
 
+# How long a crawled URL counts as a duplicate
+DEDUP_WINDOW = datetime.timedelta(days=7)
+
+
 def is_recently_crawled(url: str, session: Session) -> bool:
     """
     Check if the given URL was crawled within the last 7 days.
@@ -17,7 +23,7 @@ def is_recently_crawled(url: str, session: Session) -> bool:
     - True if a record for the URL exists with crawl_timestamp within the last 7 days, else False.
     """
     try:
-        seven_days_ago = datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        seven_days_ago = datetime.datetime.utcnow() - DEDUP_WINDOW
         record = session.query(RecentlyCrawledUrl).filter(
             RecentlyCrawledUrl.url == url,
             RecentlyCrawledUrl.crawl_timestamp >= seven_days_ago
@@ -26,3 +32,126 @@ def is_recently_crawled(url: str, session: Session) -> bool:
     except Exception as e:
         logging.error(e, exc_info=True)
         return False
+
+
+class UrlClaim(NamedTuple):
+    """A worker's claim on a URL, as returned by claim_url."""
+    url: str
+    claimed_at: datetime.datetime
+    # Timestamp of the expired entry the claim took over, None if it created the entry
+    previous: Optional[datetime.datetime]
+
+
+def claim_url(url: str, session: Session, now: Optional[datetime.datetime] = None) -> Optional[UrlClaim]:
+    """
+    Atomically claim a URL for crawling, so that only one worker process crawls it.
+
+    The claim marks the URL as crawled: an entry older than the dedup window is
+    taken over with a compare-and-set UPDATE of its timestamp and a missing one
+    is INSERTed, and the database lets only one of several concurrent claims succeed.
+
+    Parameters:
+    - url: The URL about to be crawled.
+    - session: SQLAlchemy Session instance; the claim is committed.
+    - now: Claim time; defaults to the current UTC time.
+
+    Returns:
+    - The claim, to be passed to release_claim if the URL is not crawled after all,
+      or None if the URL was crawled recently or is being crawled. Database errors
+      are logged and treated as a successful claim.
+    """
+    now = now or datetime.datetime.utcnow()
+    previous = None
+    try:
+        previous = session.query(RecentlyCrawledUrl.crawl_timestamp).filter(
+            RecentlyCrawledUrl.url == url
+        ).scalar()
+        if previous is None:
+            session.add(RecentlyCrawledUrl(url=url, crawl_timestamp=now))
+        elif previous >= now - DEDUP_WINDOW:
+            session.rollback()
+            return None
+        else:
+            updated = session.query(RecentlyCrawledUrl).filter(
+                RecentlyCrawledUrl.url == url,
+                RecentlyCrawledUrl.crawl_timestamp == previous
+            ).update({RecentlyCrawledUrl.crawl_timestamp: now}, synchronize_session=False)
+            if not updated:
+                # Another worker took the entry over first
+                session.rollback()
+                return None
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return None
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        session.rollback()
+    return UrlClaim(url, now, previous)
+
+
+def release_claim(claim: UrlClaim, session: Session) -> None:
+    """
+    Give up a claim on a URL that could not be crawled, so that it can be crawled again.
+
+    An entry the claim created is deleted, and an expired entry it took over gets
+    its previous timestamp back. Entries changed since the claim are left alone.
+    """
+    try:
+        entry = session.query(RecentlyCrawledUrl).filter(
+            RecentlyCrawledUrl.url == claim.url,
+            RecentlyCrawledUrl.crawl_timestamp == claim.claimed_at
+        )
+        if claim.previous is None:
+            entry.delete(synchronize_session=False)
+        else:
+            entry.update({RecentlyCrawledUrl.crawl_timestamp: claim.previous}, synchronize_session=False)
+        session.commit()
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        session.rollback()
+
+
+def mark_crawled(urls: Iterable[str], session: Session, now: Optional[datetime.datetime] = None) -> int:
+    """
+    Record the URLs as crawled in one statement, refreshing the timestamp of known ones.
+
+    A redirected page passes every URL of its redirect chain, so that links to any
+    of them are recognized as duplicates.
+
+    Parameters:
+    - urls: The URLs to mark.
+    - session: SQLAlchemy Session instance; the change is committed.
+    - now: Crawl time; defaults to the current UTC time.
+
+    Returns:
+    - The number of distinct URLs marked.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return 0
+    now = now or datetime.datetime.utcnow()
+    rows = [{"url": url, "crawl_timestamp": now} for url in urls]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(RecentlyCrawledUrl).values(rows)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[RecentlyCrawledUrl.url],
+            set_={"crawl_timestamp": statement.excluded.crawl_timestamp},
+        ))
+    else:
+        known = {
+            record.url: record
+            for record in session.query(RecentlyCrawledUrl).filter(RecentlyCrawledUrl.url.in_(urls))
+        }
+        for url in urls:
+            if url in known:
+                known[url].crawl_timestamp = now
+            else:
+                session.add(RecentlyCrawledUrl(url=url, crawl_timestamp=now))
+    session.commit()
+    return len(urls)
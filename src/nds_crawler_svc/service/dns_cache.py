@@ -0,0 +1,283 @@
+import asyncio
+import ipaddress
+import socket
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from nds_crawler_svc.config import (
+    DNS_CACHE_MAX_ENTRIES,
+    DNS_CACHE_TTL,
+    DNS_MAX_CONCURRENT_LOOKUPS,
+    DNS_NEGATIVE_TTL,
+)
+
+
+class DNSCache:
+    """Asynchronous resolver with a positive/negative cache shared by all crawl clients.
+
+    Concurrent lookups of the same name are coalesced into one getaddrinfo call and
+    the number of lookups in flight is bounded. getaddrinfo does not expose record
+    TTLs, so cached answers expire after the configured TTLs.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float, max_concurrency: int, max_entries: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_concurrency = max_concurrency
+        self.max_entries = max_entries
+        # host -> (expires_at, addresses, error); exactly one of addresses/error is set
+        self._cache: Dict[str, Tuple[float, Optional[List[str]], Optional[socket.gaierror]]] = {}
+        # Semaphores and in-flight lookups belong to the event loop that created them
+        self._loop_state = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.lookup_seconds_total = 0.0
+        self.lookup_seconds_max = 0.0
+
+    def _state(self) -> Tuple[asyncio.Semaphore, Dict[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            state = self._loop_state[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+        return state
+
+    async def resolve(self, host: str) -> List[str]:
+        """Return the addresses of host, raising socket.gaierror if it does not resolve."""
+        entry = self._cache.get(host)
+        if entry is not None and entry[0] > time.monotonic():
+            if entry[2] is not None:
+                self.negative_hits += 1
+                raise socket.gaierror(*entry[2].args)
+            self.hits += 1
+            return entry[1]
+
+        semaphore, in_flight = self._state()
+        future = in_flight.get(host)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = in_flight[host] = asyncio.get_running_loop().create_future()
+        try:
+            addresses = await self._lookup(semaphore, host)
+        except socket.gaierror as e:
+            self._store(host, None, e)
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no other lookup was waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled or failed unexpectedly; waiters see the lookup as cancelled
+            future.cancel()
+            raise
+        else:
+            self._store(host, addresses, None)
+            future.set_result(addresses)
+            return addresses
+        finally:
+            del in_flight[host]
+
+    async def _lookup(self, semaphore: asyncio.Semaphore, host: str) -> List[str]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+            except socket.gaierror:
+                self.errors += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.lookup_seconds_total += elapsed
+                self.lookup_seconds_max = max(self.lookup_seconds_max, elapsed)
+        # Keep resolver order, dropping duplicates
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    def _store(self, host: str, addresses: Optional[List[str]], error: Optional[socket.gaierror]) -> None:
+        if len(self._cache) >= self.max_entries:
+            now = time.monotonic()
+            for key in [k for k, v in self._cache.items() if v[0] <= now]:
+                del self._cache[key]
+            if len(self._cache) >= self.max_entries:
+                # Still full of live entries: drop the oldest insertion
+                del self._cache[next(iter(self._cache))]
+        ttl = self.ttl if error is None else self.negative_ttl
+        self._cache[host] = (time.monotonic() + ttl, addresses, error)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.negative_hits + self.coalesced) / lookups if lookups else 0.0,
+            "avg_lookup_seconds": self.lookup_seconds_total / self.misses if self.misses else 0.0,
+            "max_lookup_seconds": self.lookup_seconds_max,
+        }
+
+
+class CachingNetworkBackend:
+    """httpcore network backend that resolves host names through a DNSCache.
+
+    TLS still uses the request's host name for SNI and certificate checks, since
+    httpcore passes it to start_tls separately from the connect address.
+    httpcore (and trio, when installed) are imported on first use rather than at
+    service start-up, so the backend implements httpcore's interface by duck typing.
+    """
+
+    def __init__(self, resolver: DNSCache):
+        import httpcore
+
+        self.resolver = resolver
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        import httpcore
+
+        try:
+            ipaddress.ip_address(host)
+            addresses = [host]
+        except ValueError:
+            try:
+                addresses = await self.resolver.resolve(host)
+            except socket.gaierror as e:
+                raise httpcore.ConnectError(str(e)) from e
+        last_error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as e:
+                last_error = e
+        raise last_error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _map_httpcore_error(error: Exception) -> Exception:
+    """Return the httpx exception matching an httpcore one; httpx mirrors httpcore's exception names."""
+    mapped = getattr(httpx, type(error).__name__, None)
+    if type(error).__module__.startswith("httpcore") and isinstance(mapped, type) \
+            and issubclass(mapped, httpx.TransportError):
+        return mapped(str(error))
+    return error
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        try:
+            async for part in self._stream:
+                yield part
+        except Exception as e:
+            mapped = _map_httpcore_error(e)
+            if mapped is e:
+                raise
+            raise mapped from e
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport over one connection pool whose connections resolve names through a DNSCache.
+
+    It is meant to be shared by every client of the crawl, so that keep-alive
+    connections and TLS sessions are reused across pages: clients closing it
+    leave the pool open, and close() shuts it down.
+    """
+
+    def __init__(self, resolver: DNSCache, ssl_context, limits: httpx.Limits = httpx.Limits()):
+        import httpcore
+
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=CachingNetworkBackend(resolver),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        import httpcore
+
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        try:
+            response = await self._pool.handle_async_request(core_request)
+        except Exception as e:
+            mapped = _map_httpcore_error(e)
+            if mapped is e:
+                raise
+            raise mapped from e
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        # Shared: a client going out of scope must not close the pool
+        pass
+
+    async def close(self) -> None:
+        await self._pool.aclose()
+
+
+_ssl_context = None
+# Connection pools belong to the event loop that opened them
+_transports = weakref.WeakKeyDictionary()
+
+
+def shared_transport() -> CachingTransport:
+    """Return the running event loop's transport, shared by all crawl and sitemap clients."""
+    global _ssl_context
+    loop = asyncio.get_running_loop()
+    transport = _transports.get(loop)
+    if transport is None:
+        if _ssl_context is None:
+            # Loading the CA bundle is costly, so it is done once
+            _ssl_context = httpx.create_ssl_context()
+        transport = _transports[loop] = CachingTransport(dns_cache, _ssl_context)
+    return transport
+
+
+async def close_shared_transport() -> None:
+    """Close the running event loop's shared transport and its connections."""
+    transport = _transports.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport.close()
+
+
+dns_cache = DNSCache(DNS_CACHE_TTL, DNS_NEGATIVE_TTL, DNS_MAX_CONCURRENT_LOOKUPS, DNS_CACHE_MAX_ENTRIES)
@@ -0,0 +1,94 @@
+import logging
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from nds_crawler_svc.config import (
+    FETCH_FALLBACK_STATUSES,
+    FETCH_FALLBACK_USER_AGENT,
+    FETCH_LEARNED_HOSTS,
+    FETCH_MAX_REDIRECTS,
+)
+from nds_crawler_svc.service.retry_policy import host_key, retry_policy
+
+
+class FetchStrategy:
+    """Chain of request header variants tried in turn for sites that reject the default client.
+
+    Each variant is fetched through the retry policy. The next variant is only
+    tried when a response has one of the `fallback_statuses` (such as a 403 from
+    a site that blocks unknown User-Agents); other failures, redirects and
+    not-found pages are returned as-is rather than requested again. The variant
+    that worked for a host is remembered and tried first for its next pages, so
+    a host that needs the fallback costs one extra request rather than one per page.
+    """
+
+    def __init__(self, variants: List[Optional[dict]], fallback_statuses, max_learned_hosts: int):
+        self.variants = variants
+        self.fallback_statuses = frozenset(fallback_statuses)
+        self.max_learned_hosts = max_learned_hosts
+        # host -> index of the variant that last worked, least recently used first
+        self._learned: "OrderedDict[str, int]" = OrderedDict()
+        self.requests = 0
+        self.fallbacks = 0
+        self.redirected = 0
+
+    def _order(self, host: str) -> List[int]:
+        learned = self._learned.get(host)
+        if learned is None:
+            return list(range(len(self.variants)))
+        self._learned.move_to_end(host)
+        return [learned] + [index for index in range(len(self.variants)) if index != learned]
+
+    def _learn(self, host: str, index: int) -> None:
+        if index == 0 and host not in self._learned:
+            return
+        self._learned[host] = index
+        self._learned.move_to_end(host)
+        while len(self._learned) > self.max_learned_hosts:
+            self._learned.popitem(last=False)
+
+    async def fetch(self, client, url: str, slot: Optional[Callable] = None):
+        """
+        GET url with the first header variant the host accepts.
+
+        Parameters:
+        - client: HTTP client, expected to follow redirects.
+        - url: The URL to fetch.
+        - slot: Passed to RetryPolicy.fetch, to be held around each request.
+
+        Returns:
+        - The last response. Raises like RetryPolicy.fetch when a request fails outright.
+        """
+        host = host_key(url)
+        response = None
+        for attempt, index in enumerate(self._order(host)):
+            if attempt > 0:
+                self.fallbacks += 1
+                logging.info(f"Retrying {url} with header variant {index} after status {response.status_code}")
+            self.requests += 1
+            response = await retry_policy.fetch(client, url, headers=self.variants[index], slot=slot)
+            if response.status_code not in self.fallback_statuses:
+                self._learn(host, index)
+                break
+        if response.history:
+            self.redirected += 1
+        return response
+
+    def learned_variant(self, host: str) -> Optional[int]:
+        return self._learned.get(host)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "redirected": self.redirected,
+            "learned_hosts": len(self._learned),
+            "max_redirects": FETCH_MAX_REDIRECTS,
+        }
+
+
+# The client's own User-Agent first, then a desktop browser's
+_variants = [None]
+if FETCH_FALLBACK_USER_AGENT:
+    _variants.append({"User-Agent": FETCH_FALLBACK_USER_AGENT})
+fetch_strategy = FetchStrategy(_variants, FETCH_FALLBACK_STATUSES, FETCH_LEARNED_HOSTS)
@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+
+# Cash each seed page starts with (OPIC)
+SEED_CASH = 1.0
+# Score multiplier per level of depth, so that shallow pages win ties
+DEPTH_DECAY = 0.8
+
+# URLs that rarely hold content worth a page of the budget
+LOW_VALUE_URL = re.compile(
+    r"/(login|logout|signin|signup|register|cart|checkout|print|share|search)\b"
+    r"|[?&](sort|order|filter|sessionid|sid|utm_[a-z]+)=|calendar|/page/\d{2,}",
+    re.IGNORECASE,
+)
+# Anchor texts of navigation links rather than content links
+NAVIGATION_ANCHORS = frozenset({
+    "next", "prev", "previous", "more", "click here", "here", "read more", "home", "top", "back",
+    "»", "«", ">", "<", "...",
+})
+
+
+def url_factor(url: str, anchor_text: str = "") -> float:
+    """
+    Score multiplier from URL and anchor text heuristics.
+
+    Parameters:
+    - url: The link target.
+    - anchor_text: Text of the <a> element, if any.
+
+    Returns:
+    - A multiplier around 1.0; below for likely low-value links, above for descriptive anchors.
+    """
+    factor = 1.0
+    parsed = urlparse(url)
+    if LOW_VALUE_URL.search(url):
+        factor *= 0.3
+    elif parsed.query:
+        factor *= 0.7
+    if len([segment for segment in parsed.path.split("/") if segment]) > 4:
+        factor *= 0.8
+    text = " ".join(anchor_text.split()).lower()
+    if text in NAVIGATION_ANCHORS:
+        factor *= 0.8
+    elif len(text.split()) >= 3:
+        factor *= 1.2
+    return factor
+
+
+class CrawlFrontier:
+    """Per-job priority queue of discovered URLs, scored by OPIC link importance.
+
+    OPIC (On-line Page Importance Computation): every seed starts with cash;
+    crawling a page hands its cash out in equal parts to its outlinks, so a URL's
+    accumulated cash estimates its importance from the links seen so far. The
+    frontier orders URLs by cash times URL/anchor heuristics times a depth decay
+    and launches at most `workers` crawls at once, so that pages discovered later
+    can still overtake queued ones and a page budget is spent on the best pages.
+    Once the job's policy has no page budget left, no more links are queued or
+    launched, and the run ends as soon as the pages in flight are done.
+    """
+
+    def __init__(self, workers: int, policy: Optional[CrawlPolicy] = None):
+        self.workers = workers
+        self.policy = policy
+        self.active = 0
+        self.finished = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        # url -> (score, depth, heuristic factor) of its live heap entry
+        self._queued: Dict[str, Tuple[float, int, float]] = {}
+        # Undistributed cash of queued and in-flight URLs
+        self._cash: Dict[str, float] = {}
+        self._seen = set()
+        self._sources = set()
+        self._changed = asyncio.Event()
+
+    def enter(self, url: str) -> float:
+        """Register the start of a page crawl and return the cash the page holds."""
+        self.active += 1
+        self._seen.add(url)
+        return self._cash.pop(url, SEED_CASH)
+
+    def leave(self) -> None:
+        self.active -= 1
+        self.finished += 1
+        self._changed.set()
+
+    def add_source(self, coro: Awaitable) -> asyncio.Future:
+        """Run a coroutine that queues URLs, such as sitemap ingestion, as part of the job.
+
+        The frontier is not considered drained while it runs.
+        """
+        self.active += 1
+        future = asyncio.ensure_future(coro)
+        self._sources.add(future)
+
+        def done(future: asyncio.Future) -> None:
+            self.active -= 1
+            self._sources.discard(future)
+            self._changed.set()
+            if not future.cancelled() and future.exception() is not None:
+                logging.error(future.exception(), exc_info=future.exception())
+
+        future.add_done_callback(done)
+        return future
+
+    def add_links(self, cash: float, depth: int, links: Iterable[Tuple[str, str]]) -> int:
+        """
+        Distribute a crawled page's cash over its outlinks and queue the new ones.
+
+        Parameters:
+        - cash: Cash of the crawled page, as returned by enter().
+        - depth: Depth of the outlinks.
+        - links: (url, anchor text) pairs of links to follow.
+
+        Returns:
+        - The number of newly queued URLs.
+        """
+        if self.budget_spent():
+            return 0
+        unique = {}
+        for url, anchor_text in links:
+            unique.setdefault(url, anchor_text)
+        links = list(unique.items())
+        if not links:
+            return 0
+        share = cash / len(links)
+        queued = 0
+        for url, anchor_text in links:
+            entry = self._queued.get(url)
+            if entry is not None:
+                # Linked again before being crawled: its importance grows
+                self._cash[url] = self._cash.get(url, 0.0) + share
+                _, queued_depth, factor = entry
+                self._push(url, queued_depth, factor)
+                continue
+            if url in self._seen:
+                continue
+            self._seen.add(url)
+            self._cash[url] = share
+            self._push(url, depth, url_factor(url, anchor_text))
+            queued += 1
+        self._changed.set()
+        return queued
+
+    def budget_spent(self) -> bool:
+        """Return True once the job's page budget is used up, so that queued URLs cannot be crawled."""
+        return self.policy is not None and self.policy.exhausted()
+
+    def _push(self, url: str, depth: int, factor: float) -> None:
+        score = self._cash[url] * factor * DEPTH_DECAY ** depth
+        self._queued[url] = (score, depth, factor)
+        # Earlier entries of the URL become stale and are skipped by pop()
+        heapq.heappush(self._heap, (-score, next(self._sequence), url))
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Return the highest scored (url, depth), or None if nothing is queued."""
+        while self._heap:
+            neg_score, _, url = heapq.heappop(self._heap)
+            entry = self._queued.get(url)
+            if entry is None or entry[0] != -neg_score:
+                continue
+            del self._queued[url]
+            return url, entry[1]
+        return None
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    async def run(self, crawl: Callable[[str, int], Awaitable[None]]) -> None:
+        """
+        Crawl queued URLs in score order until the queue is empty and no page of the
+        job is in flight, or until the page budget is spent and the pages in flight
+        are done; sources still queueing URLs are then cancelled.
+        """
+        tasks = set()
+        while True:
+            spent = self.budget_spent()
+            while not spent and len(tasks) < self.workers:
+                item = self.pop()
+                if item is None:
+                    break
+                tasks.add(asyncio.ensure_future(crawl(*item)))
+            if not tasks and not self._queued and self.active == 0:
+                return
+            if spent and not tasks and self.active == len(self._sources):
+                for source in list(self._sources):
+                    source.cancel()
+                return
+            self._changed.clear()
+            changed = asyncio.ensure_future(self._changed.wait())
+            done, _ = await asyncio.wait(tasks | {changed}, return_when=asyncio.FIRST_COMPLETED)
+            if changed not in done:
+                changed.cancel()
+            for task in done - {changed}:
+                tasks.discard(task)
+                if not task.cancelled() and task.exception() is not None:
+                    logging.error(task.exception(), exc_info=task.exception())
+
+    def stats(self) -> dict:
+        return {"queued": len(self._queued), "active": self.active, "finished": self.finished}
+
+
+# Frontiers of running jobs, keyed by job_id
+frontiers: Dict[str, CrawlFrontier] = {}
@@ -0,0 +1,61 @@
+import datetime
+import os
+import socket
+import uuid
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.models.crawl_jobs import CrawlJob
+
+
+def new_job_id() -> str:
+    """Return a job id that sorts by creation time and is unique across worker processes."""
+    return f"{datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+
+
+def worker_id() -> str:
+    """Identify the current worker process as host:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def register_job(job_id: str, priority: str, session: Session,
+                 now: Optional[datetime.datetime] = None) -> CrawlJob:
+    """
+    Record that a crawl job started in this worker.
+
+    A job that is already registered, such as one whose parked URLs are crawled
+    after its frontier finished, is marked running again but keeps its start time.
+
+    Parameters:
+    - job_id: The job's id.
+    - priority: The job's scheduling class.
+    - session: SQLAlchemy Session instance.
+    - now: Start time; defaults to the current UTC time.
+
+    Returns:
+    - The job's registry entry.
+    """
+    job = session.get(CrawlJob, job_id)
+    if job is None:
+        job = CrawlJob(job_id=job_id, pages_processed=0, started_at=now or datetime.datetime.utcnow())
+        session.add(job)
+    job.status = "running"
+    job.priority = priority
+    job.worker = worker_id()
+    job.finished_at = None
+    session.commit()
+    return job
+
+
+def finish_job(job_id: str, pages_processed: int, session: Session,
+               now: Optional[datetime.datetime] = None) -> Optional[CrawlJob]:
+    """Mark a registered job as finished, adding the pages its frontier processed since it was last registered."""
+    job = session.get(CrawlJob, job_id)
+    if job is None:
+        return None
+    job.status = "finished"
+    job.pages_processed += pages_processed
+    job.finished_at = now or datetime.datetime.utcnow()
+    session.commit()
+    return job
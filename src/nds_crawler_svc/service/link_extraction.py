@@ -0,0 +1,135 @@
+import codecs
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Characters of markup handed to the parser at a time, so parsing can stop early
+FEED_CHUNK = 64 * 1024
+
+
+def canonicalize_url(href: str, base_url: str) -> Optional[str]:
+    """
+    Resolve a link against its page and normalize it for deduplication.
+
+    The scheme and host are lowercased, default ports, credentials and the
+    fragment are dropped, and an empty path becomes "/".
+
+    Parameters:
+    - href: The link as written in the page.
+    - base_url: URL the link is relative to.
+
+    Returns:
+    - The canonical absolute URL, or None for non-HTTP(S) or malformed links.
+    """
+    try:
+        parts = urlsplit(urljoin(base_url, href.strip()))
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = parts.hostname
+    if scheme not in DEFAULT_PORTS or not host:
+        return None
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port is None or port == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class _LinkParser(HTMLParser):
+    """Collects the distinct links of a page in order, until `max_links` are found."""
+
+    def __init__(self, page_url: str, max_links: int):
+        super().__init__(convert_charrefs=True)
+        self.base_url = page_url
+        self.max_links = max_links
+        self.links: List[Tuple[str, str]] = []
+        self._seen = set()
+        self._base_seen = False
+        # Text pieces of the <a> element being read, if its link is kept
+        self._text: Optional[List[str]] = None
+
+    @property
+    def done(self) -> bool:
+        return len(self.links) >= self.max_links and self._text is None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "base" and not self._base_seen:
+            href = dict(attrs).get("href")
+            if href is not None:
+                self._base_seen = True
+                self.base_url = urljoin(self.base_url, href)
+        elif tag == "a":
+            # <a> elements do not nest; a new one ends the previous one
+            self._end_anchor()
+            href = dict(attrs).get("href")
+            if href is None or len(self.links) >= self.max_links:
+                return
+            link = canonicalize_url(href, self.base_url)
+            if link is None or link in self._seen:
+                return
+            self._seen.add(link)
+            self.links.append((link, ""))
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._end_anchor()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def _end_anchor(self) -> None:
+        if self._text is None:
+            return
+        text = " ".join(piece.strip() for piece in self._text if piece.strip())
+        self.links[-1] = (self.links[-1][0], text)
+        self._text = None
+
+    def close(self):
+        super().close()
+        self._end_anchor()
+
+
+def extract_links(markup, page_url: str, max_links: int,
+                  encoding: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Parse the links of an HTML page, keeping at most `max_links` distinct ones.
+
+    The page is decoded and parsed incrementally, and parsing stops once
+    `max_links` distinct links have been read, so work and memory per page stay
+    bounded on link farms. No tree is built: only <a> and <base> elements are
+    looked at. A <base> element applies to the links after it, which is where
+    it is allowed to be.
+
+    Links repeated on the page, such as navigation menus, are kept once, with
+    the anchor text of their first occurrence.
+
+    Parameters:
+    - markup: The page's HTML, as text or bytes.
+    - page_url: URL of the page, for resolving relative links.
+    - max_links: Maximum number of distinct links returned.
+    - encoding: Charset of bytes markup; defaults to UTF-8.
+
+    Returns:
+    - (canonical url, anchor text) pairs in page order.
+    """
+    parser = _LinkParser(page_url, max_links)
+    decoder = None
+    if isinstance(markup, bytes):
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for start in range(0, len(markup), FEED_CHUNK):
+        chunk = markup[start:start + FEED_CHUNK]
+        parser.feed(decoder.decode(chunk) if decoder is not None else chunk)
+        if parser.done:
+            return parser.links
+    if decoder is not None:
+        parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser.links
@@ -0,0 +1,196 @@
+import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.models.page_inlinks import PageInlink
+from nds_crawler_svc.models.page_outlinks import PageOutlinks
+from nds_crawler_svc.models.url_ids import UrlId
+
+# URLs looked up per IN (...) query, below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def encode_ids(ids: Iterable[int]) -> bytes:
+    """
+    Encode a set of url ids as the varint-encoded gaps between their sorted values.
+
+    Links of a page tend to be interned close together, so most gaps fit in one
+    or two bytes instead of a full URL string.
+
+    Parameters:
+    - ids: Non-negative integer ids; duplicates are dropped.
+
+    Returns:
+    - The encoded bytes.
+    """
+    out = bytearray()
+    previous = 0
+    for value in sorted(set(ids)):
+        gap = value - previous
+        previous = value
+        while gap >= 0x80:
+            out.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        out.append(gap)
+    return bytes(out)
+
+
+def iter_ids(blob: bytes):
+    """Yield the ids of an encode_ids() blob in ascending order."""
+    value = 0
+    gap = 0
+    shift = 0
+    for byte in blob:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        value += gap
+        yield value
+        gap = 0
+        shift = 0
+
+
+def decode_ids(blob: bytes) -> List[int]:
+    """Decode an encode_ids() blob into its sorted list of ids."""
+    return list(iter_ids(blob))
+
+
+def contains_id(blob: bytes, target: int) -> bool:
+    """Return True if the encoded id set contains target, decoding only up to it."""
+    for value in iter_ids(blob):
+        if value >= target:
+            return value == target
+    return False
+
+
+def lookup_url_ids(urls: Iterable[str], session: Session) -> Dict[str, int]:
+    """Return the ids of the given URLs that are already interned."""
+    urls = list(dict.fromkeys(urls))
+    ids = {}
+    for start in range(0, len(urls), LOOKUP_CHUNK_SIZE):
+        chunk = urls[start:start + LOOKUP_CHUNK_SIZE]
+        for url_id, url in session.query(UrlId.id, UrlId.url).filter(UrlId.url.in_(chunk)):
+            ids[url] = url_id
+    return ids
+
+
+def intern_urls(urls: Iterable[str], session: Session) -> Dict[str, int]:
+    """
+    Map URLs to integer ids, assigning new ids to URLs seen for the first time.
+
+    On PostgreSQL and SQLite new URLs are inserted with ON CONFLICT DO NOTHING,
+    so that workers interning the same URL concurrently both get its id.
+
+    Parameters:
+    - urls: URLs to intern.
+    - session: SQLAlchemy Session instance; new ids are flushed but not committed.
+
+    Returns:
+    - A dict mapping every given URL to its id.
+    """
+    urls = list(dict.fromkeys(urls))
+    ids = lookup_url_ids(urls, session)
+    new_urls = [url for url in urls if url not in ids]
+    if not new_urls:
+        return ids
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        session.execute(
+            insert(UrlId).on_conflict_do_nothing(index_elements=[UrlId.url]),
+            [{"url": url} for url in new_urls],
+        )
+        ids.update(lookup_url_ids(new_urls, session))
+    else:
+        new_entries = [UrlId(url=url) for url in new_urls]
+        session.add_all(new_entries)
+        session.flush()
+        ids.update((entry.url, entry.id) for entry in new_entries)
+    return ids
+
+
+def store_outlinks(url: str, links: Iterable[str], session: Session) -> int:
+    """
+    Record the outlinks of a crawled page, replacing those of a previous crawl.
+
+    The page_inlinks reverse index is updated with the links added and removed
+    since the previous crawl.
+
+    Parameters:
+    - url: The crawled page.
+    - links: URLs the page links to.
+    - session: SQLAlchemy Session instance.
+
+    Returns:
+    - The number of distinct outlinks stored.
+    """
+    links = [link for link in dict.fromkeys(links) if link != url]
+    ids = intern_urls([url, *links], session)
+    outlink_ids = {ids[link] for link in links}
+    page_id = ids[url]
+    entry = session.get(PageOutlinks, page_id)
+    previous_ids = set() if entry is None else set(iter_ids(entry.outlinks))
+    removed = sorted(previous_ids - outlink_ids)
+    for start in range(0, len(removed), LOOKUP_CHUNK_SIZE):
+        chunk = removed[start:start + LOOKUP_CHUNK_SIZE]
+        session.query(PageInlink).filter(
+            PageInlink.source_id == page_id, PageInlink.target_id.in_(chunk)
+        ).delete(synchronize_session=False)
+    added = outlink_ids - previous_ids
+    if added:
+        session.execute(PageInlink.__table__.insert(), [{"target_id": target, "source_id": page_id} for target in added])
+    if entry is None:
+        entry = PageOutlinks(page_id=page_id)
+        session.add(entry)
+    entry.outlinks = encode_ids(outlink_ids)
+    entry.link_count = len(outlink_ids)
+    entry.updated_at = datetime.datetime.utcnow()
+    session.commit()
+    return len(outlink_ids)
+
+
+def _urls_by_id(ids: List[int], session: Session) -> Dict[int, str]:
+    urls = {}
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        chunk = ids[start:start + LOOKUP_CHUNK_SIZE]
+        for url_id, url in session.query(UrlId.id, UrlId.url).filter(UrlId.id.in_(chunk)):
+            urls[url_id] = url
+    return urls
+
+
+def get_outlinks(url: str, session: Session) -> Optional[List[str]]:
+    """
+    Return the URLs a crawled page links to, or None if the page's links were never stored.
+    """
+    page_id = lookup_url_ids([url], session).get(url)
+    if page_id is None:
+        return None
+    entry = session.get(PageOutlinks, page_id)
+    if entry is None:
+        return None
+    ids = decode_ids(entry.outlinks)
+    urls = _urls_by_id(ids, session)
+    return [urls[i] for i in ids if i in urls]
+
+
+def get_inlinks(url: str, session: Session, limit: int = 100) -> Optional[List[str]]:
+    """
+    Return up to `limit` crawled pages that link to url, or None if url was never seen.
+
+    Inlinks are read from the page_inlinks reverse index.
+    """
+    target = lookup_url_ids([url], session).get(url)
+    if target is None:
+        return None
+    page_ids = [
+        page_id for page_id, in session.query(PageInlink.source_id).filter(
+            PageInlink.target_id == target
+        ).order_by(PageInlink.source_id).limit(limit)
+    ]
+    urls = _urls_by_id(page_ids, session)
+    return [urls[i] for i in page_ids if i in urls]
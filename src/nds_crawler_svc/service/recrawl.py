@@ -0,0 +1,142 @@
+import datetime
+import math
+from typing import List, Mapping, Optional
+
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.config import (
+    RECRAWL_EXPIRY, RECRAWL_INITIAL_INTERVAL, RECRAWL_MAX_INTERVAL, RECRAWL_MIN_INTERVAL,
+)
+from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+
+
+def estimate_revisit_interval(crawl_count: int, change_count: int, observed_seconds: float) -> int:
+    """
+    Estimate how often a URL should be revisited from its change history.
+
+    Uses the Cho & Garcia-Molina estimator of a Poisson change rate from n regular
+    visits of which X detected a change: rate = -ln((n - X + 0.5) / (n + 0.5)) / I,
+    where I is the mean time between visits. The revisit interval is 1 / rate,
+    clamped to [RECRAWL_MIN_INTERVAL, RECRAWL_MAX_INTERVAL].
+
+    Parameters:
+    - crawl_count: Number of times the URL has been crawled.
+    - change_count: Number of re-crawls that found changed content.
+    - observed_seconds: Time between the first and the latest crawl.
+
+    Returns:
+    - The revisit interval in seconds.
+    """
+    visits = crawl_count - 1
+    if visits <= 0 or observed_seconds <= 0:
+        return RECRAWL_INITIAL_INTERVAL
+    mean_interval = observed_seconds / visits
+    rate = -math.log((visits - change_count + 0.5) / (visits + 0.5)) / mean_interval
+    if rate <= 0:
+        return RECRAWL_MAX_INTERVAL
+    return int(min(RECRAWL_MAX_INTERVAL, max(RECRAWL_MIN_INTERVAL, 1.0 / rate)))
+
+
+# Columns of a schedule entry that the next crawl's entry is derived from
+SCHEDULE_STATE = ("content_hash", "first_crawled_at", "last_linked_at", "crawl_count", "change_count")
+
+
+def schedule_after_crawl(url: str, content_hash: str, now: datetime.datetime,
+                         previous: Optional[Mapping] = None, recrawl: bool = False) -> dict:
+    """
+    Compute a URL's schedule entry after a crawl.
+
+    Parameters:
+    - url: The crawled URL.
+    - content_hash: Hash of the fetched content.
+    - now: Crawl time.
+    - previous: The SCHEDULE_STATE columns of the current entry, or None for a first crawl.
+    - recrawl: Whether this was a scheduled re-crawl, which does not count as being linked.
+
+    Returns:
+    - The column values of the new entry.
+    """
+    last_linked_at = now
+    if previous is None:
+        first_crawled_at, crawl_count, change_count = now, 1, 0
+    else:
+        first_crawled_at = previous["first_crawled_at"]
+        if recrawl:
+            last_linked_at = previous["last_linked_at"]
+        crawl_count = previous["crawl_count"] + 1
+        change_count = previous["change_count"] + (previous["content_hash"] != content_hash)
+    revisit_interval = estimate_revisit_interval(
+        crawl_count, change_count, (now - first_crawled_at).total_seconds()
+    )
+    return {
+        "url": url,
+        "content_hash": content_hash,
+        "first_crawled_at": first_crawled_at,
+        "last_crawled_at": now,
+        "last_linked_at": last_linked_at,
+        "crawl_count": crawl_count,
+        "change_count": change_count,
+        "revisit_interval": revisit_interval,
+        "next_crawl_at": now + datetime.timedelta(seconds=revisit_interval),
+    }
+
+
+def record_crawl(url: str, content_hash: str, session: Session,
+                 now: Optional[datetime.datetime] = None, recrawl: bool = False) -> UrlRevisitSchedule:
+    """
+    Record a crawl of the URL and schedule its next visit.
+
+    Parameters:
+    - url: The crawled URL.
+    - content_hash: Hash of the fetched content, compared with the previous crawl to detect changes.
+    - session: SQLAlchemy Session instance.
+    - now: Crawl time; defaults to the current UTC time.
+    - recrawl: Whether this was a scheduled re-crawl.
+
+    Returns:
+    - The updated schedule entry.
+    """
+    now = now or datetime.datetime.utcnow()
+    entry = session.query(UrlRevisitSchedule).filter(UrlRevisitSchedule.url == url).first()
+    previous = None if entry is None else {column: getattr(entry, column) for column in SCHEDULE_STATE}
+    row = schedule_after_crawl(url, content_hash, now, previous, recrawl)
+    if entry is None:
+        entry = UrlRevisitSchedule(**row)
+        session.add(entry)
+    else:
+        for column, value in row.items():
+            setattr(entry, column, value)
+    session.commit()
+    return entry
+
+
+def claim_due_recrawls(session: Session, limit: int, now: Optional[datetime.datetime] = None) -> List[str]:
+    """
+    Return up to `limit` URLs whose next visit is due, earliest first.
+
+    The claimed URLs are pushed back by their revisit interval so that the next
+    poll does not enqueue them again while they are being crawled; the crawl
+    itself reschedules them through record_crawl. Due entries of URLs that no
+    link or submission has reached for RECRAWL_EXPIRY seconds are deleted
+    instead, so pages that dropped out of the web graph are not re-crawled forever.
+
+    Parameters:
+    - session: SQLAlchemy Session instance.
+    - limit: Maximum number of URLs to claim.
+    - now: Reference time; defaults to the current UTC time.
+
+    Returns:
+    - The due URLs.
+    """
+    now = now or datetime.datetime.utcnow()
+    session.query(UrlRevisitSchedule).filter(
+        UrlRevisitSchedule.next_crawl_at <= now,
+        UrlRevisitSchedule.last_linked_at < now - datetime.timedelta(seconds=RECRAWL_EXPIRY),
+    ).delete(synchronize_session=False)
+    entries = session.query(UrlRevisitSchedule).filter(
+        UrlRevisitSchedule.next_crawl_at <= now
+    ).order_by(UrlRevisitSchedule.next_crawl_at).limit(limit).all()
+    for entry in entries:
+        entry.next_crawl_at = now + datetime.timedelta(seconds=entry.revisit_interval)
+    session.commit()
+    return [entry.url for entry in entries]
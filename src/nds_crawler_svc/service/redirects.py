@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+
+from nds_crawler_svc.config import REDIRECT_CACHE_MAX_ENTRIES, REDIRECT_CACHE_TTL
+
+# Redirects that may be assumed to hold for later requests
+PERMANENT_REDIRECT_CODES = frozenset({301, 308})
+
+
+def redirect_chain(url: str, response) -> List[str]:
+    """Return the distinct URLs a fetch of url went through, from url to the final URL."""
+    if not response.history:
+        return [url]
+    chain = [url]
+    chain.extend(str(hop.url) for hop in response.history)
+    chain.append(str(response.url))
+    return list(dict.fromkeys(chain))
+
+
+class RedirectCache:
+    """Bounded map of URLs to the final URL of their permanent redirect chains.
+
+    Only URLs whose every remaining hop is permanent are remembered; temporary
+    redirects are followed anew each time. Entries expire after `ttl` seconds and
+    the least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # url -> (expires_at, final url)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, url: str) -> str:
+        """Return the known final URL of url, or url itself."""
+        entry = self._entries.get(url)
+        if entry is None:
+            self.misses += 1
+            return url
+        if entry[0] <= time.monotonic():
+            del self._entries[url]
+            self.misses += 1
+            return url
+        self._entries.move_to_end(url)
+        self.hits += 1
+        return entry[1]
+
+    def record(self, response) -> None:
+        """Remember the permanent redirects followed to get a response."""
+        if not response.history:
+            return
+        final_url = str(response.url)
+        expires_at = time.monotonic() + self.ttl
+        hops = [(hop.status_code, str(hop.url)) for hop in response.history]
+        # Walk back from the final URL while every hop after the source is permanent
+        for status_code, source in reversed(hops):
+            if status_code not in PERMANENT_REDIRECT_CODES:
+                break
+            if source != final_url:
+                self._entries[source] = (expires_at, final_url)
+                self._entries.move_to_end(source)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+redirect_cache = RedirectCache(REDIRECT_CACHE_MAX_ENTRIES, REDIRECT_CACHE_TTL)
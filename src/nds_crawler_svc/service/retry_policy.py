@@ -0,0 +1,213 @@
+import asyncio
+import datetime
+import email.utils
+import logging
+import random
+import socket
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from nds_crawler_svc.config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    PARKED_URLS_PER_HOST,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+
+# Status codes that signal a transient server-side condition worth retrying
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a fetch is refused because the host's circuit breaker is open."""
+
+    def __init__(self, host: str):
+        super().__init__(f"Circuit open for host {host}")
+        self.host = host
+
+
+def host_key(url: str) -> str:
+    """Host name that breakers and parked URLs are keyed by."""
+    return httpx.URL(url).host
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Classify a transport error as transient (timeouts, dropped connections) or permanent."""
+    if isinstance(exc, httpx.TimeoutException):
+        return True
+    if isinstance(exc, httpx.ConnectError):
+        # Name resolution failures will not fix themselves between attempts
+        cause = exc.__cause__ or exc.__context__
+        while cause is not None:
+            if isinstance(cause, socket.gaierror):
+                return False
+            cause = cause.__cause__ or cause.__context__
+        return True
+    return isinstance(exc, (httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as delta-seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff: a random delay up to base * 2**attempt, capped."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after consecutive failures, then lets one probe through after a cool-down."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Let a single probe request through
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon_probe(self) -> None:
+        """Give the probe back when it was cancelled, so that the next request can probe instead."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+
+class HostCircuitBreakers:
+    """Registry of circuit breakers by host, holding URLs parked while a host is tripped."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, parked_per_host: int):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.parked_per_host = parked_per_host
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._parked: Dict[str, Deque[Tuple[str, int, dict]]] = {}
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def park(self, host: str, url: str, depth: int, **crawl_kwargs) -> bool:
+        """Hold a URL until the host recovers; returns False if the host's parking queue is full.
+
+        crawl_kwargs are the job settings the URL should be crawled with once released.
+        """
+        parked = self._parked.setdefault(host, deque())
+        if len(parked) >= self.parked_per_host:
+            return False
+        parked.append((url, depth, crawl_kwargs))
+        return True
+
+    def parked(self, host: str) -> int:
+        """Number of URLs parked for the host."""
+        return len(self._parked.get(host, ()))
+
+    def drain_parked(self, host: str) -> List[Tuple[str, int, dict]]:
+        return list(self._parked.pop(host, ()))
+
+    def open_hosts(self) -> List[str]:
+        return [host for host, breaker in self._breakers.items() if breaker.state != CircuitBreaker.CLOSED]
+
+
+class RetryPolicy:
+    """Fetches a URL with classified retries, jittered backoff and a per-host circuit breaker."""
+
+    def __init__(self, breakers: HostCircuitBreakers, max_attempts: int, base_delay: float, max_delay: float):
+        self.breakers = breakers
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    async def fetch(self, client, url: str, headers: Optional[dict] = None, slot: Optional[Callable] = None):
+        """GET url with the given headers, retrying transient failures.
+
+        Returns the last response, which may be unsuccessful, and re-raises the last
+        transport error if every attempt failed. Raises CircuitOpenError without
+        sending anything if the host is tripped. If given, slot() is an async context
+        manager held around each request but not while waiting to retry, such as a
+        fetch slot of the crawl scheduler.
+        """
+        host = host_key(url)
+        breaker = self.breakers.get(host)
+        for attempt in range(self.max_attempts):
+            if not breaker.allow_request():
+                raise CircuitOpenError(host)
+            try:
+                async with slot() if slot is not None else nullcontext():
+                    response = await client.get(url, headers=headers)
+            except asyncio.CancelledError:
+                breaker.abandon_probe()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                if not is_retryable_error(e) or attempt + 1 >= self.max_attempts:
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                logging.info(f"Retrying {url} in {delay:.2f}s after error: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            if not is_retryable_status(response.status_code):
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt + 1 >= self.max_attempts:
+                return response
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            if retry_after is not None:
+                if retry_after > self.max_delay:
+                    logging.info(f"Not retrying {url}: Retry-After of {retry_after:.0f}s exceeds the maximum delay")
+                    return response
+                delay = max(delay, retry_after)
+            logging.info(f"Retrying {url} in {delay:.2f}s after status {response.status_code}")
+            await asyncio.sleep(delay)
+
+
+host_breakers = HostCircuitBreakers(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, PARKED_URLS_PER_HOST)
+retry_policy = RetryPolicy(host_breakers, RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
@@ -0,0 +1,248 @@
+import asyncio
+import datetime
+import logging
+import zlib
+from collections import deque
+from contextlib import nullcontext
+from typing import AsyncContextManager, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import httpx
+
+from nds_crawler_svc.config import SITEMAP_MAX_BYTES, SITEMAP_MAX_FILES, SITEMAP_MAX_URLS
+from nds_crawler_svc.models.base import SessionLocal
+from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+from nds_crawler_svc.service.crawl_scheduler import crawl_scheduler
+from nds_crawler_svc.service.dns_cache import shared_transport
+from nds_crawler_svc.service.frontier import CrawlFrontier
+from nds_crawler_svc.service.retry_policy import CircuitOpenError, retry_policy
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Decompressed bytes produced per step, so a small compressed chunk cannot expand unbounded at once
+DECOMPRESS_STEP = 1024 * 1024
+# Sitemap URLs checked against the crawl history per query
+ENQUEUE_BATCH_SIZE = 500
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime.datetime]:
+    """Parse a W3C datetime from a sitemap into naive UTC; returns None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+async def discover_sitemaps(client: httpx.AsyncClient, seed_url: str,
+                            slot: Optional[Callable[[], AsyncContextManager]] = None) -> List[str]:
+    """
+    Find the sitemaps of the seed's site.
+
+    robots.txt is fetched like crawled pages: with retries, through the host's
+    circuit breaker and, if given, holding the slot for each request.
+
+    Parameters:
+    - client: HTTP client used for robots.txt.
+    - seed_url: Any URL of the site.
+    - slot: Optional fetch slot factory, such as one of the crawl scheduler.
+
+    Returns:
+    - The sitemaps declared in robots.txt, or /sitemap.xml if it declares none.
+    """
+    sitemaps = []
+    try:
+        response = await retry_policy.fetch(client, urljoin(seed_url, "/robots.txt"), slot=slot)
+        if response.status_code == 200:
+            for line in response.text.splitlines():
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "sitemap" and value.strip():
+                    sitemaps.append(value.strip())
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        logging.info(f"Could not read robots.txt for {seed_url}: {e}")
+    return sitemaps or [urljoin(seed_url, "/sitemap.xml")]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+async def iter_sitemap(client: httpx.AsyncClient, sitemap_url: str,
+                       slot: Optional[Callable[[], AsyncContextManager]] = None,
+                       ) -> AsyncIterator[Tuple[str, str, Optional[datetime.datetime]]]:
+    """
+    Stream the entries of a sitemap or sitemap index.
+
+    The body is parsed incrementally as it arrives, gunzipping it on the fly when
+    it is a .gz file, and each entry's element is dropped once read, so memory
+    stays bounded regardless of the sitemap's size. Reading stops after
+    SITEMAP_MAX_BYTES decompressed bytes or SITEMAP_MAX_URLS entries, the limits
+    of the sitemap protocol. The optional slot is held while the request is sent
+    and its headers arrive, not while the body streams.
+
+    Yields:
+    - ("url", loc, lastmod) for pages and ("sitemap", loc, lastmod) for child sitemaps of an index.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    # Nesting level of the open element: 0 for the root, 1 for entries, 2 for their fields
+    level = -1
+    loc = None
+    lastmod = None
+    entries = 0
+    total = 0
+    decompressor = None
+    first_chunk = True
+    request = client.build_request("GET", sitemap_url)
+    async with slot() if slot is not None else nullcontext():
+        response = await client.send(request, stream=True)
+    try:
+        if response.status_code != 200:
+            logging.info(f"Sitemap {sitemap_url} returned status {response.status_code}")
+            return
+        async for chunk in response.aiter_bytes():
+            if first_chunk:
+                first_chunk = False
+                # .xml.gz files are served as-is rather than with a Content-Encoding
+                if chunk.startswith(GZIP_MAGIC):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            pieces = [chunk]
+            if decompressor is not None:
+                pieces = []
+                while chunk:
+                    pieces.append(decompressor.decompress(chunk, DECOMPRESS_STEP))
+                    chunk = decompressor.unconsumed_tail
+            for data in pieces:
+                total += len(data)
+                if total > SITEMAP_MAX_BYTES:
+                    logging.warning(f"Sitemap {sitemap_url} exceeds {SITEMAP_MAX_BYTES} bytes; truncated")
+                    return
+                try:
+                    parser.feed(data)
+                    events = list(parser.read_events())
+                except ParseError as e:
+                    logging.warning(f"Malformed sitemap {sitemap_url}: {e}")
+                    return
+                for event, element in events:
+                    if event == "start":
+                        if root is None:
+                            root = element
+                        level += 1
+                        continue
+                    name = _local_name(element.tag)
+                    level -= 1
+                    # Only the entry's own <loc>/<lastmod>, not those of extensions such as <image:loc>
+                    if level == 1 and name == "loc":
+                        loc = (element.text or "").strip()
+                    elif level == 1 and name == "lastmod":
+                        lastmod = parse_lastmod(element.text)
+                    elif level == 0 and name in ("url", "sitemap"):
+                        if loc:
+                            yield name, loc, lastmod
+                            entries += 1
+                        loc = lastmod = None
+                        # The entry is complete; drop it and its siblings from the tree
+                        root.clear()
+                        if entries >= SITEMAP_MAX_URLS:
+                            return
+    finally:
+        await response.aclose()
+
+
+def _changed_since_crawl(entries: List[Tuple[str, Optional[datetime.datetime]]]) -> List[str]:
+    """Drop sitemap entries whose lastmod is not newer than the page's last crawl."""
+    last_crawled: Dict[str, datetime.datetime] = {}
+    session = SessionLocal()
+    try:
+        rows = session.query(UrlRevisitSchedule.url, UrlRevisitSchedule.last_crawled_at).filter(
+            UrlRevisitSchedule.url.in_([url for url, _ in entries])
+        )
+        last_crawled = dict(rows)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+    finally:
+        session.close()
+    return [
+        url for url, lastmod in entries
+        if lastmod is None or url not in last_crawled or lastmod > last_crawled[url]
+    ]
+
+
+async def ingest_sitemaps(seed_url: str, frontier: CrawlFrontier, job_kwargs: dict, cash: float,
+                          transport: Optional[httpx.AsyncBaseTransport] = None) -> int:
+    """
+    Queue the pages listed in the seed site's sitemaps on the job's frontier.
+
+    Pages are queued at depth 1 if the job's policy allows them and, when the
+    sitemap gives a lastmod, only if they changed since they were last crawled.
+    The given cash flows through the sitemaps like through links: the sitemaps
+    of the site share it, and each sitemap splits its share evenly over the
+    pages and child sitemaps it lists. A sitemap's pages are queued once it has
+    been read.
+
+    Parameters:
+    - seed_url: URL whose site's sitemaps are read.
+    - frontier: The job's frontier.
+    - job_kwargs: The job's policy, job_id, priority and weight.
+    - cash: The part of the seed's cash given to the sitemaps' pages.
+    - transport: HTTP transport; defaults to the crawl's shared transport.
+
+    Returns:
+    - The number of URLs queued.
+    """
+    policy = job_kwargs.get("policy")
+    host = urlparse(seed_url).hostname
+    queued = 0
+    skipped = 0
+    transport = transport or shared_transport()
+    loop = asyncio.get_running_loop()
+
+    def slot():
+        return crawl_scheduler.slot(job_kwargs["job_id"], job_kwargs["priority"], job_kwargs["weight"])
+
+    async with httpx.AsyncClient(timeout=30, transport=transport, follow_redirects=True) as client:
+        sitemaps = await discover_sitemaps(client, seed_url, slot)
+        pending = deque((sitemap_url, cash / len(sitemaps)) for sitemap_url in sitemaps)
+        visited = set()
+        while pending and len(visited) < SITEMAP_MAX_FILES:
+            sitemap_url, sitemap_cash = pending.popleft()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            children = []
+            listed = 0
+            changed = []
+            batch = []
+            try:
+                async for kind, loc, lastmod in iter_sitemap(client, sitemap_url, slot):
+                    if kind == "sitemap":
+                        children.append(loc)
+                        continue
+                    # The sitemap protocol only allows URLs of the sitemap's own host
+                    if urlparse(loc).hostname != host:
+                        continue
+                    if policy is not None and not policy.allows(loc, 1):
+                        continue
+                    listed += 1
+                    batch.append((loc, lastmod))
+                    if len(batch) >= ENQUEUE_BATCH_SIZE:
+                        changed += await loop.run_in_executor(None, _changed_since_crawl, batch)
+                        batch = []
+            except httpx.HTTPError as e:
+                logging.warning(f"Failed to read sitemap {sitemap_url}: {e}")
+            if batch:
+                changed += await loop.run_in_executor(None, _changed_since_crawl, batch)
+            skipped += listed - len(changed)
+            if not listed and not children:
+                continue
+            # Unchanged pages keep their share unspent, like pages crawled recently
+            share = sitemap_cash / (listed + len(children))
+            pending.extend((child, share) for child in children)
+            if changed:
+                queued += frontier.add_links(share * len(changed), 1, [(url, "") for url in changed])
+    logging.info(f"Queued {queued} URLs from sitemaps of {seed_url}; {skipped} unchanged since their last crawl")
+    return queued
@@ -0,0 +1,10 @@
+# Kept free of nds_crawler_svc.config imports, so benchmarks can use it before
+# configuring the service's environment.
+
+
+def percentile(samples, fraction: float) -> float:
+    """Nearest-rank percentile of samples, or 0.0 when there are none."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -1,16 +1,181 @@
 import os
-import json
+import gzip
 import datetime
 import logging
 from datetime import timedelta
+from typing import Iterable, Optional
+
+from nds_crawler_svc import serialization
+from nds_crawler_svc.result_cache import result_cache
+from nds_crawler_svc.config import (
+    STORAGE_COMPRESSION,
+    STORAGE_COMPRESSION_LEVEL,
+    STORAGE_ZSTD_DICT_PATH,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
 
 # Base directory for storing JSON files. This can be overridden for tests.
 STORAGE_DIR = "data"
 
+# Compression settings for newly written records. These can be overridden for tests.
+COMPRESSION = STORAGE_COMPRESSION
+COMPRESSION_LEVEL = STORAGE_COMPRESSION_LEVEL
+ZSTD_DICT_PATH = STORAGE_ZSTD_DICT_PATH
+
+# Record file extensions and the compression each one implies.
+RECORD_EXTENSIONS = {
+    ".json": "none",
+    ".json.gz": "gzip",
+    ".json.zst": "zstd",
+}
+
+# Record fields also written to an uncompressed header file next to the record,
+# so listings that only need them do not decompress the content.
+HEADER_FIELDS = ("url", "title", "metadata")
+HEADER_EXTENSION = ".head.json"
+
+# Suffixed keys tried when another record was stored in the same microsecond
+MAX_KEY_ATTEMPTS = 1000
+
+# Loaded zstd dictionaries keyed by path, so each dictionary is read from disk once.
+_zstd_dicts = {}
+
+
+def _load_zstd_dict(path: str):
+    if not path:
+        return None
+    if path not in _zstd_dicts:
+        with open(path, "rb") as f:
+            _zstd_dicts[path] = zstandard.ZstdCompressionDict(f.read())
+    return _zstd_dicts[path]
+
+
+# Configured compressions whose fallback has been logged, so it is not logged for every record
+_fallbacks_logged = set()
+
+
+def _resolve_compression() -> str:
+    """Return the effective compression for new records, falling back when zstd is unavailable."""
+    if COMPRESSION == "zstd" and zstandard is None:
+        if COMPRESSION not in _fallbacks_logged:
+            _fallbacks_logged.add(COMPRESSION)
+            logging.warning("zstandard is not installed; falling back to gzip compression")
+        return "gzip"
+    if COMPRESSION not in ("none", "gzip", "zstd"):
+        if COMPRESSION not in _fallbacks_logged:
+            _fallbacks_logged.add(COMPRESSION)
+            logging.warning(f"Unknown storage compression {COMPRESSION!r}; storing records uncompressed")
+        return "none"
+    return COMPRESSION
+
+
+def _compress(payload: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(payload, compresslevel=COMPRESSION_LEVEL)
+    if compression == "zstd":
+        compressor = zstandard.ZstdCompressor(
+            level=COMPRESSION_LEVEL, dict_data=_load_zstd_dict(ZSTD_DICT_PATH)
+        )
+        return compressor.compress(payload)
+    return payload
+
+
+def _decompress(payload: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(payload)
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd compressed records")
+        decompressor = zstandard.ZstdDecompressor(dict_data=_load_zstd_dict(ZSTD_DICT_PATH))
+        return decompressor.decompress(payload)
+    return payload
+
+
+def record_key(filename: str) -> Optional[str]:
+    """Return the sequence key of a record filename, or None if it is not a record file."""
+    if filename.endswith(HEADER_EXTENSION):
+        return None
+    for extension in RECORD_EXTENSIONS:
+        if filename.endswith(extension):
+            return filename[:-len(extension)]
+    return None
+
+
+def read_crawled_data(file_path: str) -> dict:
+    """Read a stored record, transparently decompressing it based on its file extension.
+
+    Args:
+        file_path (str): Path of a record written by store_crawled_data.
+
+    Returns:
+        dict: The decoded record.
+    """
+    compression = "none"
+    for extension, kind in RECORD_EXTENSIONS.items():
+        if file_path.endswith(extension):
+            compression = kind
+    with open(file_path, "rb") as f:
+        payload = f.read()
+    return serialization.loads(_decompress(payload, compression))
+
+
+def read_record_header(file_path: str) -> Optional[dict]:
+    """Read the header written next to a stored record.
+
+    Args:
+        file_path (str): Path of a record written by store_crawled_data.
+
+    Returns:
+        Optional[dict]: The record's HEADER_FIELDS, or None if the record has no header.
+    """
+    directory, file_name = os.path.split(file_path)
+    key = record_key(file_name)
+    if key is None:
+        return None
+    try:
+        with open(os.path.join(directory, key + HEADER_EXTENSION), "rb") as f:
+            payload = f.read()
+    except FileNotFoundError:
+        return None
+    return serialization.loads(payload)
+
+
+def train_compression_dictionary(samples: Iterable[dict], output_path: str, dict_size: int = 112640) -> str:
+    """Train a zstd dictionary from sample records and write it to output_path.
+
+    Small records compress poorly on their own; a shared dictionary captures the
+    structure common to all records. Point STORAGE_ZSTD_DICT_PATH at the result.
+    Records written with a dictionary can only be read with the same dictionary.
+
+    Args:
+        samples (Iterable[dict]): Representative records to train on.
+        output_path (str): Where to write the trained dictionary.
+        dict_size (int): Maximum dictionary size in bytes.
+
+    Returns:
+        str: The output path.
+    """
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to train a compression dictionary")
+    encoded = [serialization.dumps(sample) for sample in samples]
+    dictionary = zstandard.train_dictionary(dict_size, encoded)
+    with open(output_path, "wb") as f:
+        f.write(dictionary.as_bytes())
+    _zstd_dicts.pop(output_path, None)
+    return output_path
+
 
 def store_crawled_data(job_id: str, data: dict) -> str:
     """Stores crawled data as a JSON file in a job-specific directory.
 
+    The file is compressed according to COMPRESSION; its extension (.json, .json.gz
+    or .json.zst) records how it was encoded so readers can decompress it. The
+    record's HEADER_FIELDS are also written uncompressed to <key>.head.json.
+
     Args:
         job_id (str): A non-empty string identifier for the job.
         data (dict): A dictionary containing the data to store; must be JSON serializable.
@@ -24,14 +189,16 @@ def store_crawled_data(job_id: str, data: dict) -> str:
 
     # Validate that data is JSON serializable
     try:
-        json_str = json.dumps(data)
+        json_bytes = serialization.dumps(data)
     except (TypeError, ValueError) as e:
         logging.error(e, exc_info=True)
         return f"Error: data is not JSON serializable: {e}"
 
-    # Generate a timestamp-based filename (format: YYYYMMDDHHMMSS.json)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-    filename = f"{timestamp}.json"
+    # Generate a timestamp-based filename (format: YYYYMMDDHHMMSSffffff.json).
+    # The timestamp doubles as the record sequence key used for result pagination.
+    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
+    compression = _resolve_compression()
+    extension = next(ext for ext, kind in RECORD_EXTENSIONS.items() if kind == compression)
 
     # Create the directory structure STORAGE_DIR/<job_id>/
     directory = os.path.join(STORAGE_DIR, job_id)
@@ -41,16 +208,42 @@ def store_crawled_data(job_id: str, data: dict) -> str:
         logging.error(e, exc_info=True)
         return f"Error: failed to create directory {directory}: {e}"
 
-    file_path = os.path.join(directory, filename)
-
-    # Write JSON data to the file with proper exception handling
+    # Write JSON data to the file with proper exception handling. Files are created
+    # exclusively: if another worker or process stored a record in the same
+    # microsecond, the key gets a suffix (YYYYMMDDHHMMSSffffff-001.json), which
+    # still sorts after the unsuffixed key and before the next microsecond's
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(json_str)
+        payload = _compress(json_bytes, compression)
     except Exception as e:
         logging.error(e, exc_info=True)
-        return f"Error: failed to write data to file {file_path}: {e}"
+        return f"Error: failed to compress data: {e}"
+    for attempt in range(MAX_KEY_ATTEMPTS):
+        key = timestamp if attempt == 0 else f"{timestamp}-{attempt:03d}"
+        file_path = os.path.join(directory, f"{key}{extension}")
+        try:
+            with open(file_path, "xb") as f:
+                f.write(payload)
+            break
+        except FileExistsError:
+            continue
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            return f"Error: failed to write data to file {file_path}: {e}"
+    else:
+        logging.error(f"No free record key for {timestamp} in {directory}")
+        return f"Error: failed to write data to file {file_path}: too many records stored at once"
+
+    # The header is an optimization; readers fall back to the record without it
+    header = {k: data[k] for k in HEADER_FIELDS if k in data}
+    if header:
+        try:
+            with open(os.path.join(directory, key + HEADER_EXTENSION), "wb") as f:
+                f.write(serialization.dumps(header))
+        except Exception as e:
+            logging.error(e, exc_info=True)
 
+    # Invalidate cached /results pages of this job
+    result_cache.bump_generation(job_id)
     return file_path
 
 
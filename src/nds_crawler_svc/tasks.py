@@ -1,8 +1,15 @@
+import asyncio
 import logging
 from datetime import datetime, timedelta
+from typing import List
 
+from nds_crawler_svc.config import RECRAWL_BATCH_SIZE
+from nds_crawler_svc.crawling_job import start_crawling_job
 from nds_crawler_svc.models.base import SessionLocal
 from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
+from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+from nds_crawler_svc.service.job_registry import new_job_id
+from nds_crawler_svc.service.recrawl import claim_due_recrawls
 
 
 def cleanup_old_urls() -> None:
@@ -18,3 +25,30 @@ def cleanup_old_urls() -> None:
         session.rollback()
     finally:
         session.close()
+
+
+async def _recrawl(urls: List[str]) -> None:
+    """Re-crawl the pages as one job, so that their results share one directory."""
+    # Refresh only the pages themselves; their links are discovered by regular crawls
+    policy = CrawlPolicy(seeds=urls, max_depth=0)
+    job_id = new_job_id()
+    # All pages join the job's frontier before the first one finishes and drains it
+    await asyncio.gather(*(
+        start_crawling_job(url, policy=policy, job_id=job_id, priority="bulk", recrawl=True) for url in urls
+    ))
+
+
+def enqueue_due_recrawls(loop: asyncio.AbstractEventLoop) -> None:
+    """Submit re-crawls of URLs whose adaptive revisit time has come to the app's event loop."""
+    session = SessionLocal()
+    try:
+        urls = claim_due_recrawls(session, RECRAWL_BATCH_SIZE)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        session.rollback()
+        return
+    finally:
+        session.close()
+    if urls:
+        asyncio.run_coroutine_threadsafe(_recrawl(urls), loop)
+        logging.info(f"Enqueued {len(urls)} due re-crawls.")
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from nds_crawler_svc.config import (
+    DATABASE_URL,
+    SQLITE_TUNING,
+    SQLITE_WRITE_BATCH_SIZE,
+    SQLITE_WRITE_BATCH_WAIT,
+    SQLITE_WRITE_QUEUE,
+)
+from nds_crawler_svc.models.base import SessionLocal, get_engine, is_process_local_database
+
+
+class WriteQueue:
+    """Single writer thread that commits queued database writes in batches.
+
+    SQLite allows one writer at a time, and every commit costs a WAL append and
+    possibly an fsync. Writes submitted from any thread are executed by one
+    thread, which holds the write lock (BEGIN IMMEDIATE) for a batch of up to
+    `batch_size` writes and commits them together. Each write runs in its own
+    SAVEPOINT, so a failing write is rolled back alone and the rest of its batch
+    still commits; the functions may call session.commit() and session.rollback()
+    as usual. Requires an engine configured with models.base.configure_sqlite.
+    """
+
+    def __init__(self, engine_factory: Callable[[], Engine], batch_size: int, max_wait: float):
+        self.engine_factory = engine_factory
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[Callable, tuple, Future]]]" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.failures = 0
+        self.batches = 0
+        self.commit_seconds_total = 0.0
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Queue func(*args, session); the returned future completes once its batch is committed."""
+        future = Future()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+            self._queue.put((func, args, future))
+        return future
+
+    def _next_batch(self) -> Optional[List[Tuple[Callable, tuple, Future]]]:
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Tuple[Callable, tuple, Future]]) -> None:
+        results = []
+        start = time.perf_counter()
+        try:
+            with self.engine_factory().connect().execution_options(sqlite_begin="IMMEDIATE") as connection:
+                transaction = connection.begin()
+                session = Session(bind=connection, join_transaction_mode="create_savepoint")
+                try:
+                    for func, args, future in batch:
+                        try:
+                            result = func(*args, session)
+                            session.commit()
+                            results.append((future, result, None))
+                        except Exception as e:
+                            session.rollback()
+                            results.append((future, None, e))
+                finally:
+                    session.close()
+                transaction.commit()
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            results = [(future, None, e) for _, _, future in batch]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.batches += 1
+            self.writes += len(batch)
+            self.failures += sum(1 for _, _, error in results if error is not None)
+            self.commit_seconds_total += elapsed
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Commit the writes already queued and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "writes": self.writes,
+                "failures": self.failures,
+                "batches": self.batches,
+                "avg_batch_size": self.writes / self.batches if self.batches else 0.0,
+                "avg_batch_seconds": self.commit_seconds_total / self.batches if self.batches else 0.0,
+                "pending": self._queue.qsize(),
+            }
+
+
+def _queue_enabled() -> bool:
+    # An in-memory database exists per connection, so a writer thread would not see it
+    return (SQLITE_WRITE_QUEUE and SQLITE_TUNING and DATABASE_URL.startswith("sqlite")
+            and not is_process_local_database(DATABASE_URL))
+
+
+async def run_write(func: Callable, *args):
+    """
+    Run func(*args, session) as a database write and return its result.
+
+    On a file SQLite database the write goes through the shared WriteQueue and is
+    committed with the other writes of its batch; otherwise it runs directly in a
+    new session, which func is expected to commit.
+    """
+    if write_queue is not None:
+        return await asyncio.wrap_future(write_queue.submit(func, *args))
+    session = SessionLocal()
+    try:
+        return func(*args, session)
+    finally:
+        session.close()
+
+
+write_queue = WriteQueue(get_engine, SQLITE_WRITE_BATCH_SIZE, SQLITE_WRITE_BATCH_WAIT) if _queue_enabled() else None
@@ -29,3 +29,39 @@ def test_crawl_timestamp_default(db_session):
     col = table.c.crawl_timestamp
     default_expr = col.server_default.arg.text if col.server_default is not None else None
     assert default_expr == 'CURRENT_TIMESTAMP', "Default CURRENT_TIMESTAMP is not set for crawl_timestamp"
+
+
+# Test to check if the url_revisit_schedule table exists with an index on next_crawl_at
+
+def test_url_revisit_schedule_table_exists(db_session):
+    engine = db_session.get_bind() or db_session.bind
+    inspector = sa.inspect(engine)
+    assert 'url_revisit_schedule' in inspector.get_table_names(), "Table 'url_revisit_schedule' does not exist"
+    indexes = inspector.get_indexes('url_revisit_schedule')
+    assert any('next_crawl_at' in idx.get('column_names', []) for idx in indexes), "next_crawl_at should be indexed"
+
+
+# Test to check that the link graph tables exist
+
+def test_link_graph_tables_exist(db_session):
+    engine = db_session.get_bind() or db_session.bind
+    inspector = sa.inspect(engine)
+    tables = inspector.get_table_names()
+    assert 'url_ids' in tables, "Table 'url_ids' does not exist"
+    assert 'page_outlinks' in tables, "Table 'page_outlinks' does not exist"
+
+
+# Test to check that the crawl_jobs registry table exists
+
+def test_crawl_jobs_table_exists(db_session):
+    engine = db_session.get_bind() or db_session.bind
+    inspector = sa.inspect(engine)
+    assert 'crawl_jobs' in inspector.get_table_names(), "Table 'crawl_jobs' does not exist"
+
+
+# Test to check that the page_inlinks reverse index exists
+
+def test_page_inlinks_table_exists(db_session):
+    engine = db_session.get_bind() or db_session.bind
+    inspector = sa.inspect(engine)
+    assert 'page_inlinks' in inspector.get_table_names(), "Table 'page_inlinks' does not exist"
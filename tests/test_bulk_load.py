@@ -0,0 +1,140 @@
+import datetime
+
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from nds_crawler_svc.models.base import Base
+from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
+from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+from nds_crawler_svc.service import bulk_load
+from nds_crawler_svc.service.bulk_load import CrawlRecord, CrawlRecordBuffer, bulk_record_crawls, bulk_upsert
+from nds_crawler_svc.service.recrawl import record_crawl
+
+START = datetime.datetime(2026, 1, 1)
+
+
+def test_bulk_record_matches_record_crawl(db_session):
+    records = [
+        CrawlRecord("http://a.com/", ["http://a.com/"], "hash-a", START),
+        CrawlRecord("http://b.com/", ["http://b.com/", "http://b.com/home"], "hash-b", START),
+        CrawlRecord("http://a.com/", ["http://a.com/"], "hash-c", START + datetime.timedelta(days=1)),
+    ]
+    assert bulk_record_crawls(records, db_session) == 3
+
+    crawled = {row.url: row.crawl_timestamp for row in db_session.query(RecentlyCrawledUrl)}
+    assert crawled == {
+        "http://a.com/": START + datetime.timedelta(days=1),
+        "http://b.com/": START,
+        "http://b.com/home": START,
+    }
+    entry = db_session.query(UrlRevisitSchedule).filter_by(url="http://a.com/").one()
+    assert (entry.crawl_count, entry.change_count) == (2, 1)
+
+    # A third crawl builds on the bulk-written entry exactly like record_crawl does
+    record_crawl("http://reference.com/", "hash-a", db_session, now=START)
+    record_crawl("http://reference.com/", "hash-c", db_session, now=START + datetime.timedelta(days=1))
+    expected = record_crawl("http://reference.com/", "hash-c", db_session, now=START + datetime.timedelta(days=3))
+    bulk_record_crawls([CrawlRecord("http://a.com/", ["http://a.com/"], "hash-c", START + datetime.timedelta(days=3))],
+                       db_session)
+    db_session.expire_all()
+    entry = db_session.query(UrlRevisitSchedule).filter_by(url="http://a.com/").one()
+    assert (entry.crawl_count, entry.change_count, entry.revisit_interval, entry.next_crawl_at) == (
+        expected.crawl_count, expected.change_count, expected.revisit_interval, expected.next_crawl_at
+    )
+
+
+def test_executemany_fallback_without_upsert_support():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    # Pretend to be a database without INSERT ... ON CONFLICT
+    engine.dialect.name = "generic"
+    session = sessionmaker(bind=engine)()
+    try:
+        table = RecentlyCrawledUrl.__table__
+        bulk_upsert(table, [{"url": "http://a.com/", "crawl_timestamp": START}], ["url"], session)
+        later = START + datetime.timedelta(days=1)
+        bulk_upsert(table, [{"url": "http://a.com/", "crawl_timestamp": later},
+                            {"url": "http://b.com/", "crawl_timestamp": later}], ["url"], session)
+        session.commit()
+        assert {row.url: row.crawl_timestamp for row in session.query(RecentlyCrawledUrl)} == {
+            "http://a.com/": later, "http://b.com/": later,
+        }
+    finally:
+        session.close()
+
+
+class FakeCopyCursor:
+    """psycopg2-style cursor that keeps what COPY reads."""
+
+    def __init__(self):
+        self.copies = []
+
+    def copy_expert(self, sql, file):
+        self.copies.append((sql, file.read()))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.statements = []
+        self.copy_cursor = FakeCopyCursor()
+        self.connection = self
+
+    def cursor(self):
+        return self.copy_cursor
+
+    def exec_driver_sql(self, sql):
+        self.statements.append(sql)
+
+
+class FakeSession:
+    def __init__(self):
+        self.bind = FakeConnection()
+        self.bind.dialect.driver = "psycopg2"
+
+    def get_bind(self):
+        return self.bind
+
+    def connection(self):
+        return self.bind
+
+
+def test_postgresql_rows_are_copied_into_staging_and_merged(monkeypatch):
+    monkeypatch.setattr(bulk_load, "BULK_LOAD_BATCH_SIZE", 2)
+    session = FakeSession()
+    rows = [{"url": f"http://example.com/{i}", "crawl_timestamp": START} for i in range(3)]
+
+    assert bulk_upsert(RecentlyCrawledUrl.__table__, rows, ["url"], session) == 3
+
+    create, merge, drop = session.bind.statements
+    assert create.startswith("CREATE TEMP TABLE staging_recently_crawled_urls ON COMMIT DROP")
+    assert merge == (
+        "INSERT INTO recently_crawled_urls (url, crawl_timestamp) "
+        "SELECT url, crawl_timestamp FROM staging_recently_crawled_urls "
+        "ON CONFLICT (url) DO UPDATE SET crawl_timestamp = EXCLUDED.crawl_timestamp"
+    )
+    assert drop == "DROP TABLE staging_recently_crawled_urls"
+    # Streamed in batches of BULK_LOAD_BATCH_SIZE rows
+    copies = session.bind.copy_cursor.copies
+    assert [sql for sql, _ in copies] == [
+        "COPY staging_recently_crawled_urls (url, crawl_timestamp) FROM STDIN WITH (FORMAT csv)"
+    ] * 2
+    assert copies[1][1] == "http://example.com/2,2026-01-01 00:00:00\r\n"
+
+
+def test_buffer_keeps_urls_visible_until_written():
+    buffer = CrawlRecordBuffer(max_records=2)
+    first = CrawlRecord("http://a.com/", ["http://a.com/", "http://a.com/home"], "hash", START)
+    assert not buffer.add(first)
+    assert buffer.add(CrawlRecord("http://b.com/", ["http://b.com/"], "hash", START))
+
+    records = buffer.take()
+    assert len(buffer) == 0
+    assert "http://a.com/home" in buffer
+    buffer.done(records)
+    assert "http://a.com/home" not in buffer
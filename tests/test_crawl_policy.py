@@ -0,0 +1,85 @@
+import pytest
+
+from nds_crawler_svc.service.crawl_policy import CrawlPolicy, registrable_domain
+
+
+def test_registrable_domain():
+    assert registrable_domain("www.example.com") == "example.com"
+    assert registrable_domain("news.example.co.uk") == "example.co.uk"
+    assert registrable_domain("example.com") == "example.com"
+
+
+def test_same_host_scope():
+    policy = CrawlPolicy(seeds=["http://www.example.com/"], scope="same_host")
+
+    assert policy.allows("http://www.example.com/about", 1)
+    assert not policy.allows("http://blog.example.com/", 1)
+    assert not policy.allows("http://twitter.com/example", 1)
+
+
+def test_same_domain_scope():
+    policy = CrawlPolicy(seeds=["http://www.example.com/"], scope="same_domain")
+
+    assert policy.allows("https://blog.example.com/post", 1)
+    assert not policy.allows("http://cdn.example.net/app.js", 1)
+
+
+def test_any_scope_rejects_non_http_links():
+    policy = CrawlPolicy(seeds=["http://example.com/"])
+
+    assert policy.allows("http://other.org/", 1)
+    assert not policy.allows("mailto:info@example.com", 1)
+    assert not policy.allows("/relative/path", 1)
+
+
+def test_allow_and_deny_patterns():
+    policy = CrawlPolicy(allow=[r"/news/", r"/blog/"], deny=[r"\?page=\d+"])
+
+    assert policy.allows("http://example.com/news/1", 1)
+    assert policy.allows("http://example.com/blog/2", 1)
+    assert not policy.allows("http://example.com/shop/3", 1)
+    assert not policy.allows("http://example.com/news/?page=2", 1)
+
+
+def test_excluded_extensions():
+    policy = CrawlPolicy(exclude_extensions=["pdf", ".ZIP"])
+
+    assert not policy.allows("http://example.com/report.PDF", 1)
+    assert not policy.allows("http://example.com/archive.zip", 1)
+    assert policy.allows("http://example.com/index.html", 1)
+
+
+def test_max_depth():
+    policy = CrawlPolicy(max_depth=2)
+
+    assert policy.allows("http://example.com/", 2)
+    assert not policy.allows("http://example.com/", 3)
+
+
+def test_page_budget():
+    policy = CrawlPolicy(max_pages=2)
+
+    assert policy.acquire_page()
+    assert policy.acquire_page()
+    assert policy.exhausted()
+    assert not policy.acquire_page()
+
+    # A page that was not stored gives its reservation back
+    policy.release_page()
+    assert not policy.exhausted()
+    assert policy.acquire_page()
+
+
+@pytest.mark.parametrize("settings", [
+    {"scope": "planet"},
+    {"allow": "not a list"},
+    {"deny": ["("]},
+    {"max_depth": 6},
+    {"max_depth": -1},
+    {"max_pages": 0},
+    {"exclude_extensions": "pdf"},
+    {"unknown": True},
+])
+def test_invalid_settings(settings):
+    with pytest.raises(ValueError):
+        CrawlPolicy.from_dict(settings)
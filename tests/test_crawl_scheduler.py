@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from nds_crawler_svc.service.crawl_scheduler import FairShareScheduler
+
+
+async def run_order(scheduler, requests):
+    """Queue requests behind a held slot, release it, and return the order slots were granted in."""
+    order = []
+
+    async def worker(name, job_id, priority, weight):
+        async with scheduler.slot(job_id, priority, weight):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    await scheduler.acquire("blocker")
+    tasks = [asyncio.create_task(worker(*request)) for request in requests]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_grants_immediately_under_capacity():
+    scheduler = FairShareScheduler(capacity=2)
+
+    await scheduler.acquire("job")
+    await scheduler.acquire("job")
+
+    assert scheduler.active == 2
+    assert scheduler.stats()["wait_seconds"]["normal"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_interactive_served_before_bulk():
+    scheduler = FairShareScheduler(capacity=1)
+    requests = [(f"bulk{i}", "batch", "bulk", 1.0) for i in range(3)]
+    requests.append(("interactive", "single", "interactive", 1.0))
+
+    order = await run_order(scheduler, requests)
+
+    assert order[0] == "interactive"
+
+
+@pytest.mark.asyncio
+async def test_fair_share_between_jobs():
+    scheduler = FairShareScheduler(capacity=1)
+    requests = [(f"a{i}", "job-a", "normal", 1.0) for i in range(4)]
+    requests += [(f"b{i}", "job-b", "normal", 1.0) for i in range(4)]
+
+    order = await run_order(scheduler, requests)
+
+    # Job B is not starved behind job A's earlier backlog; the jobs alternate
+    assert order == ["a0", "b0", "a1", "b1", "a2", "b2", "a3", "b3"]
+
+
+@pytest.mark.asyncio
+async def test_weights_skew_share():
+    scheduler = FairShareScheduler(capacity=1)
+    requests = [(f"heavy{i}", "heavy", "normal", 3.0) for i in range(6)]
+    requests += [(f"light{i}", "light", "normal", 1.0) for i in range(6)]
+
+    order = await run_order(scheduler, requests)
+
+    # The heavy job gets about three slots for every slot of the light job
+    first_eight = order[:8]
+    assert sum(name.startswith("heavy") for name in first_eight) == 6
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    scheduler = FairShareScheduler(capacity=1)
+    await scheduler.acquire("job")
+    waiter = asyncio.create_task(scheduler.acquire("job"))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release()
+
+    assert scheduler.active == 0
+    assert scheduler.stats()["queued"]["normal"] == 0
+    await asyncio.wait_for(scheduler.acquire("job"), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_unknown_priority():
+    scheduler = FairShareScheduler(capacity=1)
+    with pytest.raises(ValueError):
+        await scheduler.acquire("job", "urgent")
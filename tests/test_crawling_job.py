@@ -7,11 +7,20 @@ from bs4 import BeautifulSoup
 from nds_crawler_svc.crawling_job import start_crawling_job
 
 
+@pytest.fixture(autouse=True)
+def unclaimed_urls(monkeypatch):
+    # URL claims would otherwise persist in the process-wide database between tests
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.claim_url", lambda url, session: True)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.release_claim", lambda claim, session: None)
+
+
 class FakeResponse:
     def __init__(self, status_code, headers, text):
         self.status_code = status_code
         self.headers = headers
         self.text = text
+        self.content = text.encode("utf-8")
+        self.history = []
 
 
 class FakeAsyncClient:
@@ -41,7 +50,7 @@ async def test_max_depth(monkeypatch):
         return FakeResponse(200, {"content-type": "text/html"}, "<html></html>")
 
     # Setup FakeAsyncClient without any responses
-    monkeypatch.setattr(httpx, "AsyncClient", lambda timeout: FakeAsyncClient({}))
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
     monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
     monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
     monkeypatch.setattr(FakeAsyncClient, "get", fake_client_get)
@@ -62,7 +71,7 @@ async def test_deduplication(monkeypatch):
 
     monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", fake_is_recently_crawled)
     # Use a FakeAsyncClient that would raise error if called
-    monkeypatch.setattr(httpx, "AsyncClient", lambda timeout: FakeAsyncClient({}))
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
 
     await start_crawling_job("http://example.com", depth=0)
     # Since deduplication returns True, HTTP get should never be called
@@ -77,7 +86,7 @@ async def test_successful_fetch(monkeypatch):
 
     # Create a FakeAsyncClient that returns the fake_response
     client_instance = FakeAsyncClient({"http://example.com": fake_response})
-    monkeypatch.setattr(httpx, "AsyncClient", lambda timeout: client_instance)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: client_instance)
     monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
 
     store_calls = []
@@ -88,7 +97,7 @@ async def test_successful_fetch(monkeypatch):
 
     # To prevent actual recursion in test, override start_crawling_job for recursive calls
     original_start = start_crawling_job
-    async def fake_recursive_start(url, depth):
+    async def fake_recursive_start(url, depth, **kwargs):
         return
     monkeypatch.setattr("nds_crawler_svc.crawling_job.start_crawling_job", fake_recursive_start)
 
@@ -96,7 +105,8 @@ async def test_successful_fetch(monkeypatch):
     assert len(store_calls) == 1
     job_id, data = store_calls[0]
     assert data.get("url") == "http://example.com"
-    assert "http://example.com/page1" in data.get("links", [])
+    # The links are kept in the link graph rather than in the record
+    assert "links" not in data
 
 
 @pytest.mark.asyncio
@@ -119,7 +129,7 @@ async def test_http_failure(monkeypatch):
         async def get(self, url, **kwargs):
             raise httpx.RequestError("HTTP request failure for testing")
 
-    monkeypatch.setattr(httpx, "AsyncClient", lambda timeout: FakeErrorClient())
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeErrorClient())
 
     await start_crawling_job("http://example.com", depth=0)
     # Since both fetch attempts fail, store_crawled_data should not be called
@@ -147,8 +157,353 @@ async def test_non_html_response(monkeypatch):
         return "fake_path"
     monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", fake_store)
     monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
-    monkeypatch.setattr(httpx, "AsyncClient", lambda timeout: FakeNonHTMLClient())
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeNonHTMLClient())
 
     await start_crawling_job("http://example.com", depth=0)
     # Since the response is not HTML, store_crawled_data should not be called
     assert len(store_calls) == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_parks_url(monkeypatch):
+    from nds_crawler_svc.service.retry_policy import CircuitOpenError, HostCircuitBreakers
+
+    breakers = HostCircuitBreakers(5, 60, 10)
+
+    async def fake_fetch(client, url, **kwargs):
+        raise CircuitOpenError("example.com")
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.host_breakers", breakers)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    await start_crawling_job("http://example.com/page", depth=2)
+    parked = breakers.drain_parked("example.com")
+    assert [(url, depth) for url, depth, _ in parked] == [("http://example.com/page", 2)]
+    # The job settings are kept for when the URL is released
+    assert parked[0][2]["priority"] == "normal"
+
+
+@pytest.mark.asyncio
+async def test_parked_urls_are_released_after_reset_timeout(monkeypatch):
+    from nds_crawler_svc.service.retry_policy import CircuitOpenError, HostCircuitBreakers
+
+    breakers = HostCircuitBreakers(5, 0.01, 10)
+    released = []
+
+    async def fake_fetch(client, url, **kwargs):
+        raise CircuitOpenError("example.com")
+
+    async def fake_crawl(url, depth, **kwargs):
+        released.append((url, depth))
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.host_breakers", breakers)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    await start_crawling_job("http://example.com/page", depth=2)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.start_crawling_job", fake_crawl)
+    await asyncio.sleep(0.05)
+
+    # Nothing else fetched from the host, yet its parked URL is crawled (as a probe) again
+    assert released == [("http://example.com/page", 2)]
+    assert breakers.parked("example.com") == 0
+
+
+@pytest.mark.asyncio
+async def test_any_successful_response_releases_parked_urls(monkeypatch):
+    from nds_crawler_svc.service.retry_policy import HostCircuitBreakers
+
+    breakers = HostCircuitBreakers(5, 60, 10)
+    breakers.park("example.com", "http://example.com/parked", 1)
+    released = []
+
+    async def fake_fetch(client, url, **kwargs):
+        return FakeResponse(404, {"content-type": "text/html"}, "not found")
+
+    async def fake_crawl(url, depth, **kwargs):
+        released.append(url)
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.host_breakers", breakers)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    # Released URLs are crawled through the module's start_crawling_job
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.start_crawling_job", fake_crawl)
+    await start_crawling_job("http://example.com/missing")
+    await asyncio.sleep(0)
+
+    assert released == ["http://example.com/parked"]
+
+
+@pytest.mark.asyncio
+async def test_policy_filters_links(monkeypatch):
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+
+    html_content = (
+        "<html><body><a href='http://example.com/page1'>In scope</a>"
+        "<a href='http://ads.example.net/banner'>Out of scope</a></body></html>"
+    )
+    client_instance = FakeAsyncClient({"http://example.com": FakeResponse(200, {"content-type": "text/html"}, html_content)})
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: client_instance)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
+
+    scheduled = []
+    original_start = start_crawling_job
+    async def fake_recursive_start(url, depth, **kwargs):
+        scheduled.append(url)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.start_crawling_job", fake_recursive_start)
+
+    policy = CrawlPolicy(seeds=["http://example.com"], scope="same_host")
+    await original_start("http://example.com", depth=0, policy=policy)
+    assert scheduled == ["http://example.com/page1"]
+
+
+@pytest.mark.asyncio
+async def test_policy_page_budget(monkeypatch):
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+
+    fetched = []
+    async def fake_fetch(client, url, **kwargs):
+        fetched.append(url)
+        return FakeResponse(200, {"content-type": "text/html"}, "<html></html>")
+
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    policy = CrawlPolicy(max_pages=1)
+    await start_crawling_job("http://example.com/a", policy=policy)
+    await start_crawling_job("http://example.com/b", policy=policy)
+    assert fetched == ["http://example.com/a"]
+
+
+@pytest.mark.asyncio
+async def test_pages_that_are_not_stored_give_their_budget_back(monkeypatch):
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+    from nds_crawler_svc.service.retry_policy import CircuitOpenError, HostCircuitBreakers
+
+    fetched = []
+    async def fake_fetch(client, url, **kwargs):
+        fetched.append(url)
+        if "down.example.com" in url:
+            raise CircuitOpenError("down.example.com")
+        if url.endswith("/missing"):
+            return FakeResponse(404, {"content-type": "text/html"}, "not found")
+        return FakeResponse(200, {"content-type": "text/html"}, "<html></html>")
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.host_breakers", HostCircuitBreakers(5, 60, 10))
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    policy = CrawlPolicy(max_pages=1)
+    await start_crawling_job("http://example.com/missing", policy=policy)
+    # A parked URL is charged when it is crawled after its release, not when parked
+    await start_crawling_job("http://down.example.com/", policy=policy)
+    assert policy.pages_crawled == 0
+    await start_crawling_job("http://example.com/found", policy=policy)
+    await start_crawling_job("http://example.com/over-budget", policy=policy)
+    assert fetched == ["http://example.com/missing", "http://down.example.com/", "http://example.com/found"]
+
+
+@pytest.mark.asyncio
+async def test_claim_is_released_when_the_crawl_is_interrupted(monkeypatch):
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+
+    released = []
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.claim_url", lambda url, session: url)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.release_claim", lambda claim, session: released.append(claim))
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    # An invalid IDNA host makes host_key raise after the URL was claimed
+    policy = CrawlPolicy(max_pages=5)
+    await start_crawling_job("http://xn--/", policy=policy)
+    assert released == ["http://xn--/"]
+    assert policy.pages_crawled == 0
+
+    started = asyncio.Event()
+    async def hanging_fetch(client, url, **kwargs):
+        started.set()
+        await asyncio.sleep(60)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", hanging_fetch)
+
+    task = asyncio.create_task(start_crawling_job("http://example.com/slow", policy=policy))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert released == ["http://xn--/", "http://example.com/slow"]
+    assert policy.pages_crawled == 0
+
+
+@pytest.mark.asyncio
+async def test_page_budget_goes_to_best_links(monkeypatch):
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+
+    html_content = (
+        "<html><body><a href='http://example.com/login'>Sign in</a>"
+        "<a href='http://example.com/cart'>Cart</a>"
+        "<a href='http://example.com/guide'>A guide to crawling</a></body></html>"
+    )
+    fetched = []
+    async def fake_fetch(client, url, **kwargs):
+        fetched.append(url)
+        return FakeResponse(200, {"content-type": "text/html"}, html_content if url == "http://example.com" else "<html></html>")
+
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    policy = CrawlPolicy(max_pages=2)
+    await start_crawling_job("http://example.com", policy=policy)
+    assert fetched == ["http://example.com", "http://example.com/guide"]
+
+
+@pytest.mark.asyncio
+async def test_spent_budget_stops_claiming_queued_links(monkeypatch):
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+    from nds_crawler_svc.service.frontier import frontiers
+
+    fetched = []
+    claims = []
+    async def fake_fetch(client, url, **kwargs):
+        fetched.append(url)
+        links = "".join(f"<a href='{url}/{i}'>child {i}</a>" for i in range(10))
+        return FakeResponse(200, {"content-type": "text/html"}, f"<html>{links}</html>")
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.FRONTIER_WORKERS", 2)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.claim_url", lambda url, session: claims.append(url) or url)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    policy = CrawlPolicy(max_pages=3)
+    await asyncio.wait_for(start_crawling_job("http://example.com", policy=policy, job_id="budget-job"), 5)
+
+    assert len(fetched) == 3
+    # Only the pages in flight when the budget ran out were claimed in vain
+    assert len(claims) <= 3 + 2
+    assert "budget-job" not in frontiers
+
+
+@pytest.mark.asyncio
+async def test_redirect_records_final_url(monkeypatch):
+    response = FakeResponse(200, {"content-type": "text/html"}, "<html><a href='next'>Next</a></html>")
+    response.url = "http://example.com/docs/"
+    hop = FakeResponse(301, {}, "")
+    hop.url = "http://example.com/docs"
+    response.history = [hop]
+    checked = []
+    stored = []
+
+    async def fake_fetch(client, url, **kwargs):
+        return response
+
+    def fake_is_recently_crawled(url, session):
+        checked.append(url)
+        return False
+
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", fake_is_recently_crawled)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: stored.append(data))
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.STORE_RECORD_LINKS", True)
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    await start_crawling_job("http://example.com/docs", policy=None, job_id="redirect-job")
+
+    assert checked[:2] == ["http://example.com/docs", "http://example.com/docs/"]
+    assert stored[0]["final_url"] == "http://example.com/docs/"
+    # Relative links resolve against the final URL
+    assert stored[0]["links"] == ["http://example.com/docs/next"]
+
+
+@pytest.mark.asyncio
+async def test_known_redirect_is_fetched_from_its_target(monkeypatch):
+    from nds_crawler_svc.service.redirects import RedirectCache
+
+    cache = RedirectCache(max_entries=10, ttl=60)
+    cache._entries["http://example.com/old"] = (float("inf"), "http://example.com/new")
+    fetched = []
+    marked = []
+
+    async def fake_fetch(client, url, **kwargs):
+        fetched.append(url)
+        return FakeResponse(200, {"content-type": "text/html"}, "<html></html>")
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.redirect_cache", cache)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.bulk_record_crawls",
+                        lambda records, session: marked.extend(url for record in records for url in record.chain))
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.store_crawled_data", lambda job_id, data: "fake_path")
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: FakeAsyncClient({}))
+
+    await start_crawling_job("http://example.com/old", job_id="known-redirect-job")
+
+    assert fetched == ["http://example.com/new"]
+    # Both the linked and the fetched URL count as crawled
+    assert marked == ["http://example.com/old", "http://example.com/new"]
+
+
+@pytest.mark.asyncio
+async def test_url_claimed_by_another_worker_is_skipped(monkeypatch):
+    fetched = []
+
+    async def fake_fetch(client, url, **kwargs):
+        fetched.append(url)
+
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.claim_url", lambda url, session: None)
+
+    await start_crawling_job("http://example.com/taken")
+    assert fetched == []
+
+
+@pytest.mark.asyncio
+async def test_claim_is_released_when_page_is_not_crawled(monkeypatch):
+    released = []
+
+    async def fake_fetch(client, url, **kwargs):
+        return FakeResponse(503, {"content-type": "text/html"}, "unavailable")
+
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch", fake_fetch)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.claim_url", lambda url, session: ("claim", url))
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.release_claim",
+                        lambda claim, session: released.append(claim))
+
+    await start_crawling_job("http://example.com/down")
+    assert released == [("claim", "http://example.com/down")]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_still_finishes_the_job(monkeypatch):
+    from nds_crawler_svc.service.frontier import frontiers
+
+    writes = []
+
+    async def failing_write(func, *args):
+        writes.append(func.__name__)
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.run_write", failing_write)
+    monkeypatch.setattr("nds_crawler_svc.crawling_job.is_recently_crawled", lambda url, session: False)
+    monkeypatch.setattr("nds_crawler_svc.service.retry_policy.retry_policy.fetch",
+                        lambda client, url, **kwargs: asyncio.sleep(0, FakeResponse(404, {}, "")))
+
+    await start_crawling_job("http://example.com/locked", job_id="locked-job")
+    assert "locked-job" not in frontiers
+    # Registry updates go through the write queue too, and their failure is survived
+    assert writes[0] == "register_job"
+    assert writes[-1] == "finish_job"
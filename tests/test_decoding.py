@@ -0,0 +1,49 @@
+import codecs
+
+from nds_crawler_svc.service import decoding
+from nds_crawler_svc.service.decoding import resolve_charset
+from nds_crawler_svc.service.link_extraction import extract_links
+
+
+def test_header_charset_wins():
+    body = b'<meta charset="shift_jis"><p>hi</p>'
+    assert resolve_charset(body, "text/html; charset=ISO-8859-2") == ("iso8859-2", "header")
+
+
+def test_meta_charset_is_sniffed():
+    body = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1251"></head>'
+    assert resolve_charset(body, "text/html") == ("cp1251", "meta")
+    assert resolve_charset(b"<meta charset='UTF-8'>", "") == ("utf-8", "meta")
+
+
+def test_meta_charset_beyond_sniff_window_is_ignored(monkeypatch):
+    monkeypatch.setattr(decoding, "CHARSET_SNIFF_BYTES", 16)
+    body = b" " * 32 + b'<meta charset="koi8-r">'
+    assert resolve_charset(body, "text/html")[1] != "meta"
+
+
+def test_unknown_charset_label_falls_through():
+    assert resolve_charset(b"<p>plain</p>", "text/html; charset=bogus") == ("utf-8", "utf-8")
+
+
+def test_bom_and_utf8_detection():
+    assert resolve_charset(codecs.BOM_UTF16_LE + "<p>x</p>".encode("utf-16-le"), "") == ("utf-16-le", "bom")
+    assert resolve_charset("<p>café</p>".encode("utf-8"), "") == ("utf-8", "utf-8")
+
+
+def test_sample_cut_inside_multibyte_character_is_utf8(monkeypatch):
+    monkeypatch.setattr(decoding, "CHARSET_DETECT_SAMPLE", 4)
+    assert resolve_charset("abcé".encode("utf-8"), "") == ("utf-8", "utf-8")
+
+
+def test_undeclared_legacy_bytes_fall_back(monkeypatch):
+    monkeypatch.setattr(decoding, "detect_encodings", None)
+    assert resolve_charset("<p>café</p>".encode("cp1252"), "") == ("cp1252", "detected")
+
+
+def test_links_are_parsed_from_bytes_with_the_resolved_charset():
+    body = '<a href="/café">Café menu</a>'.encode("cp1252")
+    charset, _ = resolve_charset(body, "text/html; charset=windows-1252")
+    assert extract_links(body, "http://example.com/", 10, encoding=charset) == [
+        ("http://example.com/café", "Café menu"),
+    ]
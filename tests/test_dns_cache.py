@@ -0,0 +1,146 @@
+import asyncio
+import socket
+import time
+import types
+
+import httpx
+import pytest
+
+from nds_crawler_svc.service import dns_cache as dns_module
+from nds_crawler_svc.service.dns_cache import DNSCache, shared_transport
+
+
+def fake_getaddrinfo(answers, calls):
+    async def getaddrinfo(host, port, **kwargs):
+        calls.append(host)
+        await asyncio.sleep(0.01)
+        if host not in answers:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (answers[host], 0))]
+    return getaddrinfo
+
+
+def patch_lookups(monkeypatch):
+    calls = []
+    loop = asyncio.get_running_loop()
+    monkeypatch.setattr(loop, "getaddrinfo", fake_getaddrinfo({"example.test": "127.0.0.1"}, calls))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_positive_answers_are_cached(monkeypatch):
+    lookups = patch_lookups(monkeypatch)
+    cache = DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=100)
+
+    assert await cache.resolve("example.test") == ["127.0.0.1"]
+    assert await cache.resolve("example.test") == ["127.0.0.1"]
+
+    assert lookups == ["example.test"]
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_negative_answers_are_cached(monkeypatch):
+    lookups = patch_lookups(monkeypatch)
+    cache = DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=100)
+
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            await cache.resolve("missing.test")
+
+    assert lookups == ["missing.test"]
+    assert cache.stats()["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced(monkeypatch):
+    lookups = patch_lookups(monkeypatch)
+    cache = DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=100)
+
+    results = await asyncio.gather(*(cache.resolve("example.test") for _ in range(5)))
+
+    assert results == [["127.0.0.1"]] * 5
+    assert lookups == ["example.test"]
+    assert cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(monkeypatch):
+    lookups = patch_lookups(monkeypatch)
+    now = [100.0]
+    # Replace the module's clock only; the event loop keeps the real one
+    monkeypatch.setattr(dns_module, "time", types.SimpleNamespace(monotonic=lambda: now[0], perf_counter=time.perf_counter))
+    cache = DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=100)
+
+    await cache.resolve("example.test")
+    now[0] += 61
+    await cache.resolve("example.test")
+
+    assert lookups == ["example.test", "example.test"]
+
+
+@pytest.mark.asyncio
+async def test_cache_size_is_bounded(monkeypatch):
+    lookups = patch_lookups(monkeypatch)
+    cache = DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=1)
+
+    await cache.resolve("example.test")
+    with pytest.raises(socket.gaierror):
+        await cache.resolve("missing.test")
+
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transport_connects_through_cache(monkeypatch):
+    lookups = patch_lookups(monkeypatch)
+    cache = DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=100)
+    monkeypatch.setattr(dns_module, "dns_cache", cache)
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        async with httpx.AsyncClient(transport=shared_transport()) as client:
+            response = await client.get(f"http://example.test:{port}/")
+            with pytest.raises(httpx.ConnectError):
+                await client.get(f"http://missing.test:{port}/")
+
+    assert response.text == "ok"
+    assert lookups == ["example.test", "missing.test"]
+
+
+@pytest.mark.asyncio
+async def test_clients_share_pooled_connections(monkeypatch):
+    patch_lookups(monkeypatch)
+    monkeypatch.setattr(dns_module, "dns_cache", DNSCache(ttl=60, negative_ttl=10, max_concurrency=4, max_entries=100))
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        # One client per page, as the crawl does
+        for _ in range(3):
+            async with httpx.AsyncClient(transport=shared_transport()) as client:
+                assert (await client.get(f"http://example.test:{port}/")).text == "ok"
+        await dns_module.close_shared_transport()
+
+    assert len(connections) == 1
@@ -0,0 +1,90 @@
+import httpx
+import pytest
+
+from nds_crawler_svc.service.fetch_strategy import FetchStrategy
+
+BROWSER = {"User-Agent": "browser"}
+
+
+def make_client(handler, max_redirects=5):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True,
+                             max_redirects=max_redirects)
+
+
+def browser_only(seen):
+    def handler(request):
+        seen.append((request.url.path, request.headers["user-agent"]))
+        if request.headers["user-agent"] != "browser":
+            return httpx.Response(403)
+        return httpx.Response(200, text="ok")
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_fallback_is_learned_per_host():
+    seen = []
+    strategy = FetchStrategy([None, BROWSER], {403}, max_learned_hosts=10)
+    async with make_client(browser_only(seen)) as client:
+        first = await strategy.fetch(client, "http://example.com/a")
+        second = await strategy.fetch(client, "http://example.com/b")
+
+    assert first.status_code == second.status_code == 200
+    # The second page goes straight to the User-Agent that worked
+    assert [agent == "browser" for _, agent in seen] == [False, True, True]
+    assert strategy.learned_variant("example.com") == 1
+    assert strategy.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_other_statuses_are_not_requested_again():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(404)
+
+    strategy = FetchStrategy([None, BROWSER], {403}, max_learned_hosts=10)
+    async with make_client(handler) as client:
+        response = await strategy.fetch(client, "http://example.com/missing")
+
+    assert response.status_code == 404
+    assert seen == ["/missing"]
+    assert strategy.learned_variant("example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_redirects_are_followed_to_the_final_url():
+    def handler(request):
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"Location": "http://example.com/new"})
+        return httpx.Response(200, text="ok")
+
+    strategy = FetchStrategy([None], {403}, max_learned_hosts=10)
+    async with make_client(handler) as client:
+        response = await strategy.fetch(client, "http://example.com/old")
+
+    assert str(response.url) == "http://example.com/new"
+    assert [str(r.url) for r in response.history] == ["http://example.com/old"]
+    assert strategy.stats()["redirected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redirect_loops_are_bounded():
+    def handler(request):
+        return httpx.Response(302, headers={"Location": "/loop"})
+
+    strategy = FetchStrategy([None], {403}, max_learned_hosts=10)
+    async with make_client(handler, max_redirects=3) as client:
+        with pytest.raises(httpx.TooManyRedirects):
+            await strategy.fetch(client, "http://example.com/loop")
+
+
+@pytest.mark.asyncio
+async def test_learned_hosts_are_bounded():
+    strategy = FetchStrategy([None, BROWSER], {403}, max_learned_hosts=1)
+    async with make_client(browser_only([])) as client:
+        await strategy.fetch(client, "http://a.example.com/")
+        await strategy.fetch(client, "http://b.example.com/")
+
+    assert strategy.learned_variant("a.example.com") is None
+    assert strategy.learned_variant("b.example.com") == 1
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+from nds_crawler_svc.service.frontier import CrawlFrontier, url_factor
+
+
+def test_url_factor_heuristics():
+    assert url_factor("http://example.com/login") < url_factor("http://example.com/list?id=1")
+    assert url_factor("http://example.com/list?id=1") < url_factor("http://example.com/article")
+    assert url_factor("http://example.com/a", "next") < url_factor("http://example.com/a")
+    assert url_factor("http://example.com/a", "How caching works") > url_factor("http://example.com/a")
+
+
+def test_frontier_pops_by_accumulated_cash():
+    frontier = CrawlFrontier(workers=4)
+    cash = frontier.enter("http://example.com")
+    frontier.add_links(cash, 1, [("http://example.com/a", ""), ("http://example.com/b", "")])
+    frontier.leave()
+
+    # A second page linking to /b hands it more cash
+    cash = frontier.enter("http://example.com/other")
+    frontier.add_links(cash, 1, [("http://example.com/b", ""), ("http://example.com/c", "")])
+    frontier.leave()
+
+    assert frontier.pop() == ("http://example.com/b", 1)
+    assert len(frontier) == 2
+
+
+def test_frontier_skips_seen_urls_and_prefers_shallow_pages():
+    frontier = CrawlFrontier(workers=4)
+    cash = frontier.enter("http://example.com")
+    frontier.add_links(cash, 1, [("http://example.com", ""), ("http://example.com/a", "")])
+    # Same cash as /a, but deeper
+    frontier.add_links(0.5, 3, [("http://example.com/deep", "")])
+
+    assert frontier.pop() == ("http://example.com/a", 1)
+    assert frontier.pop() == ("http://example.com/deep", 3)
+    assert frontier.pop() is None
+
+
+@pytest.mark.asyncio
+async def test_run_bounds_concurrency_and_waits_for_discoveries():
+    frontier = CrawlFrontier(workers=2)
+    running = []
+    peak = []
+    crawled = []
+
+    async def crawl(url, depth):
+        cash = frontier.enter(url)
+        running.append(url)
+        peak.append(len(running))
+        await asyncio.sleep(0)
+        if depth == 1:
+            frontier.add_links(cash, 2, [(f"{url}/child", "")])
+        running.remove(url)
+        crawled.append(url)
+        frontier.leave()
+
+    frontier.add_links(1.0, 1, [(f"http://example.com/{i}", "") for i in range(5)])
+    await asyncio.wait_for(frontier.run(crawl), 5)
+
+    assert max(peak) == 2
+    assert len(crawled) == 10
+    assert frontier.stats() == {"queued": 0, "active": 0, "finished": 10}
+
+
+@pytest.mark.asyncio
+async def test_run_stops_once_the_page_budget_is_spent():
+    policy = CrawlPolicy(max_pages=2)
+    frontier = CrawlFrontier(workers=1, policy=policy)
+    crawled = []
+
+    async def crawl(url, depth):
+        cash = frontier.enter(url)
+        policy.acquire_page()
+        crawled.append(url)
+        frontier.add_links(cash, depth + 1, [(f"{url}/child", "")])
+        frontier.leave()
+
+    async def endless_source():
+        await asyncio.Event().wait()
+
+    source = frontier.add_source(endless_source())
+    frontier.add_links(1.0, 1, [(f"http://example.com/{i}", "") for i in range(5)])
+    await asyncio.wait_for(frontier.run(crawl), 5)
+    await asyncio.sleep(0)
+
+    assert len(crawled) == 2
+    # No links are queued once the budget is spent, and sources are stopped
+    assert frontier.add_links(1.0, 1, [("http://example.com/late", "")]) == 0
+    assert source.cancelled()
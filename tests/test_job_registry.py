@@ -0,0 +1,57 @@
+import datetime
+
+from nds_crawler_svc.models.base import is_process_local_database
+from nds_crawler_svc.service.job_registry import finish_job, new_job_id, register_job, worker_id
+
+
+def test_job_ids_are_unique_and_time_ordered():
+    ids = [new_job_id() for _ in range(100)]
+    assert len(set(ids)) == 100
+    assert [job_id.split("-")[0] for job_id in ids] == sorted(job_id.split("-")[0] for job_id in ids)
+
+
+def test_job_lifecycle_is_visible_through_the_api(client, db_session):
+    start = datetime.datetime(2026, 1, 1)
+    register_job("job-1", "bulk", db_session, now=start)
+
+    response = client.get("/jobs/job-1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "running"
+    assert data["worker"] == worker_id()
+    assert data["finished_at"] is None
+
+    finish_job("job-1", 12, db_session, now=start + datetime.timedelta(minutes=5))
+    data = client.get("/jobs/job-1").json()
+    assert data["status"] == "finished"
+    assert data["pages_processed"] == 12
+    assert data["finished_at"] == "2026-01-01T00:05:00"
+
+
+def test_rerun_of_a_finished_job_adds_to_it(db_session):
+    start = datetime.datetime(2026, 1, 1)
+    register_job("job-2", "normal", db_session, now=start)
+    finish_job("job-2", 40, db_session, now=start + datetime.timedelta(minutes=5))
+
+    # Parked URLs released after the job's frontier finished run under the same job id
+    job = register_job("job-2", "normal", db_session, now=start + datetime.timedelta(minutes=10))
+    assert job.status == "running"
+    assert job.started_at == start
+    job = finish_job("job-2", 2, db_session, now=start + datetime.timedelta(minutes=11))
+    assert job.pages_processed == 42
+    assert job.finished_at == start + datetime.timedelta(minutes=11)
+
+
+def test_unknown_job(client):
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_finish_unregistered_job(db_session):
+    assert finish_job("never-registered", 0, db_session) is None
+
+
+def test_in_memory_sqlite_cannot_be_shared_by_workers():
+    assert is_process_local_database("sqlite:///:memory:")
+    assert is_process_local_database("sqlite://")
+    assert not is_process_local_database("sqlite:////var/lib/crawler.db")
+    assert not is_process_local_database("postgresql://user@db/crawler")
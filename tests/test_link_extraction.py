@@ -0,0 +1,52 @@
+from nds_crawler_svc.service import link_extraction
+from nds_crawler_svc.service.link_extraction import canonicalize_url, extract_links
+
+
+def test_canonicalize_url():
+    base = "http://Example.com/dir/page.html"
+    assert canonicalize_url("other.html#top", base) == "http://example.com/dir/other.html"
+    assert canonicalize_url("HTTPS://EXAMPLE.com:443", base) == "https://example.com/"
+    assert canonicalize_url("//cdn.example.com:8080/a?b=1", base) == "http://cdn.example.com:8080/a?b=1"
+    assert canonicalize_url("http://user:pw@example.com/x", base) == "http://example.com/x"
+    assert canonicalize_url("mailto:someone@example.com", base) is None
+    assert canonicalize_url("javascript:void(0)", base) is None
+    assert canonicalize_url("http://example.com:bad/", base) is None
+
+
+def test_extract_links_dedups_canonical_forms():
+    html = (
+        "<html><body><nav><a href='/'>Home</a><a href='/about'>About</a></nav>"
+        "<a href='http://example.com/about#team'>About us</a>"
+        "<a href='guide.html'>A guide</a><a>no href</a><a href='mailto:x@example.com'>Mail</a>"
+        "<nav><a href='/'>Home</a></nav></body></html>"
+    )
+    links = extract_links(html, "http://example.com/docs/", max_links=100)
+    assert links == [
+        ("http://example.com/", "Home"),
+        ("http://example.com/about", "About"),
+        ("http://example.com/docs/guide.html", "A guide"),
+    ]
+
+
+def test_extract_links_honours_base_and_cap():
+    anchors = "".join(f"<a href='p{i}'>{i}</a>" for i in range(50000))
+    html = f"<html><head><base href='http://mirror.example.com/root/'></head><body>{anchors}</body></html>"
+    links = extract_links(html, "http://example.com/", max_links=10)
+    assert len(links) == 10
+    assert links[0] == ("http://mirror.example.com/root/p0", "0")
+
+
+def test_extract_links_stops_parsing_at_the_cap(monkeypatch):
+    fed = []
+    original_feed = link_extraction._LinkParser.feed
+    monkeypatch.setattr(link_extraction, "FEED_CHUNK", 1024)
+    monkeypatch.setattr(link_extraction._LinkParser, "feed",
+                        lambda self, data: fed.append(len(data)) or original_feed(self, data))
+
+    anchors = "".join(f"<a href='p{i}'><b>Page</b> {i}</a>" for i in range(50000))
+    html = f"<html><body>{anchors}</body></html>".encode("utf-8")
+    links = extract_links(html, "http://example.com/", max_links=10, encoding="utf-8")
+
+    assert links[-1] == ("http://example.com/p9", "Page 9")
+    # Only the start of the page is decoded and parsed
+    assert sum(fed) <= 1024
@@ -0,0 +1,92 @@
+from nds_crawler_svc.service.link_graph import (
+    contains_id,
+    decode_ids,
+    encode_ids,
+    get_inlinks,
+    get_outlinks,
+    intern_urls,
+    store_outlinks,
+)
+
+
+def test_encode_roundtrip_sorts_and_dedupes():
+    ids = [5, 1, 300, 5, 2**40, 128]
+    blob = encode_ids(ids)
+    assert decode_ids(blob) == [1, 5, 128, 300, 2**40]
+    assert decode_ids(encode_ids([])) == []
+
+
+def test_encoding_is_compact_for_close_ids():
+    # Consecutive ids take one byte each
+    assert len(encode_ids(range(1000, 1100))) == 2 + 99
+
+
+def test_contains_id():
+    blob = encode_ids([3, 10, 200])
+    assert contains_id(blob, 10)
+    assert not contains_id(blob, 11)
+    assert not contains_id(blob, 500)
+
+
+def test_intern_urls_is_stable(db_session):
+    first = intern_urls(["http://a.com", "http://b.com"], db_session)
+    second = intern_urls(["http://b.com", "http://c.com"], db_session)
+    assert second["http://b.com"] == first["http://b.com"]
+    assert len({*first.values(), *second.values()}) == 3
+
+
+def test_interning_an_existing_url_concurrently(db_session, session_local):
+    # Another worker interns the URL between this worker's lookup and insert
+    from nds_crawler_svc.service import link_graph
+
+    other = session_local()
+    lookup = link_graph.lookup_url_ids
+
+    def racing_lookup(urls, session):
+        found = lookup(urls, session)
+        if session is db_session and not found:
+            intern_urls(["http://race.com"], other)
+            other.commit()
+        return found
+
+    link_graph.lookup_url_ids = racing_lookup
+    try:
+        ids = intern_urls(["http://race.com"], db_session)
+    finally:
+        link_graph.lookup_url_ids = lookup
+        other.close()
+    assert ids == intern_urls(["http://race.com"], db_session)
+
+
+def test_outlinks_and_inlinks(db_session):
+    store_outlinks("http://a.com", ["http://b.com", "http://c.com", "http://b.com", "http://a.com"], db_session)
+    store_outlinks("http://b.com", ["http://c.com"], db_session)
+
+    assert sorted(get_outlinks("http://a.com", db_session)) == ["http://b.com", "http://c.com"]
+    assert sorted(get_inlinks("http://c.com", db_session)) == ["http://a.com", "http://b.com"]
+    assert get_inlinks("http://a.com", db_session) == []
+    # Known as a link target only: no outlinks recorded
+    assert get_outlinks("http://c.com", db_session) is None
+    assert get_inlinks("http://unknown.com", db_session) is None
+
+    # A re-crawl replaces the page's outlinks
+    store_outlinks("http://a.com", ["http://d.com"], db_session)
+    assert get_outlinks("http://a.com", db_session) == ["http://d.com"]
+    assert get_inlinks("http://c.com", db_session) == ["http://b.com"]
+
+
+def test_links_endpoints(client, session_local):
+    session = session_local()
+    store_outlinks("http://a.com", ["http://b.com"], session)
+    session.close()
+
+    response = client.get("/links/outlinks", params={"url": "http://a.com"})
+    assert response.status_code == 200
+    assert response.json()["outlinks"] == ["http://b.com"]
+
+    response = client.get("/links/inlinks", params={"url": "http://b.com"})
+    assert response.status_code == 200
+    assert response.json()["inlinks"] == ["http://a.com"]
+
+    assert client.get("/links/outlinks", params={"url": "http://b.com"}).status_code == 404
+    assert client.get("/links/inlinks", params={"url": "http://x.com"}).status_code == 404
@@ -0,0 +1,115 @@
+import pytest
+
+from nds_crawler_svc.maintenance import LeaderElection, MaintenanceRunner, fcntl
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock is not available")
+def test_only_one_process_holds_the_lock_file(tmp_path):
+    lock_path = str(tmp_path / "maintenance.lock")
+    leader = LeaderElection("file", lock_path)
+    follower = LeaderElection("file", lock_path)
+
+    assert leader.try_acquire()
+    assert leader.try_acquire()
+    assert not follower.try_acquire()
+
+    leader.release()
+    assert follower.try_acquire()
+    follower.release()
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock is not available")
+def test_run_job_skips_on_followers(tmp_path):
+    lock_path = str(tmp_path / "maintenance.lock")
+    leader = MaintenanceRunner(LeaderElection("file", lock_path))
+    follower = MaintenanceRunner(LeaderElection("file", lock_path))
+    calls = []
+
+    assert leader.run_job("cleanup", calls.append, "leader") is True
+    assert follower.run_job("cleanup", calls.append, "follower") is None
+
+    assert calls == ["leader"]
+    assert follower.stats()["jobs"]["cleanup"]["skipped"] == 1
+    assert follower.stats()["leader"] is False
+    leader.election.release()
+
+
+def test_run_job_records_duration_and_failures(tmp_path):
+    runner = MaintenanceRunner(LeaderElection("file", str(tmp_path / "maintenance.lock")))
+
+    def failing():
+        raise RuntimeError("disk full")
+
+    assert runner.run_job("cleanup", lambda: None) is True
+    assert runner.run_job("cleanup", failing) is False
+
+    stats = runner.stats()["jobs"]["cleanup"]
+    assert stats["runs"] == 2
+    assert stats["failures"] == 1
+    assert stats["last_status"] == "failed"
+    assert stats["last_duration_seconds"] >= 0
+    runner.election.release()
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeLockConnection:
+    """Connection of a PostgreSQL session that can lose its advisory lock."""
+
+    def __init__(self):
+        self.options = {}
+        self.holds_lock = False
+        self.closed = False
+
+    def execution_options(self, **options):
+        self.options.update(options)
+        return self
+
+    def execute(self, statement, parameters=None):
+        if self.closed:
+            raise RuntimeError("connection closed")
+        sql = str(statement)
+        if "pg_try_advisory_lock" in sql:
+            self.holds_lock = True
+        elif "pg_advisory_unlock" in sql:
+            self.holds_lock = False
+        return FakeResult(self.holds_lock)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeEngine:
+    def __init__(self):
+        self.connections = []
+
+    def connect(self):
+        self.connections.append(FakeLockConnection())
+        return self.connections[-1]
+
+
+def test_advisory_lock_connection_autocommits_and_is_revalidated(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr("nds_crawler_svc.models.base.get_engine", lambda: engine)
+    election = LeaderElection("database", "unused")
+
+    assert election.try_acquire()
+    first = engine.connections[0]
+    assert first.options == {"isolation_level": "AUTOCOMMIT"}
+    assert election.is_leader()
+
+    # The database session is gone, e.g. terminated by an administrator
+    first.holds_lock = False
+    assert not election.is_leader()
+    assert first.closed
+
+    assert election.try_acquire()
+    assert len(engine.connections) == 2
+    election.release()
+    assert engine.connections[1].closed
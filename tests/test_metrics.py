@@ -0,0 +1,9 @@
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert "hit_rate" in data["dns"]
+    assert "bytes" in data["result_cache"]
+    assert isinstance(data["open_circuits"], list)
+    assert "interactive" in data["scheduler"]["wait_seconds"]
+    assert "jobs" in data["maintenance"]
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import pytest
+
+from nds_crawler_svc.profiling import LoopProfiler
+
+
+def make_profiler(**overrides):
+    settings = dict(loop_lag=True, slow_callbacks=False, spans=True, lag_interval=0.01, slow_callback_threshold=0.05)
+    settings.update(overrides)
+    return LoopProfiler(**settings)
+
+
+def block_the_loop():
+    time.sleep(0.2)
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_is_sampled():
+    profiler = make_profiler()
+    profiler.start()
+    await asyncio.sleep(0.05)
+    block_the_loop()
+    await asyncio.sleep(0.05)
+    profiler.stop()
+
+    lag = profiler.stats()["loop_lag_seconds"]
+    assert lag["count"] > 1
+    assert lag["max"] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_slow_callback_stack_names_blocking_code():
+    profiler = make_profiler(slow_callbacks=True)
+    profiler.start()
+    await asyncio.sleep(0.05)
+    block_the_loop()
+    await asyncio.sleep(0.05)
+    profiler.stop()
+
+    slow = profiler.stats()["slow_callbacks"]
+    assert len(slow) == 1
+    assert any("block_the_loop" in line for line in slow[0]["stack"])
+    assert slow[0]["blocked_seconds"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_configure_toggles_at_runtime():
+    profiler = make_profiler(loop_lag=False)
+    profiler.start()
+    assert profiler._sampler is None
+
+    profiler.configure(loop_lag=True)
+    assert profiler._sampler is not None
+
+    profiler.configure(loop_lag=False)
+    assert profiler._sampler is None
+
+
+def test_span_records_stage_timings():
+    profiler = make_profiler()
+    with profiler.span("parse"):
+        time.sleep(0.01)
+    with profiler.span("parse"):
+        pass
+
+    parse = profiler.stats()["spans_seconds"]["parse"]
+    assert parse["count"] == 2
+    assert parse["max"] >= 0.01
+
+    profiler.spans = False
+    with profiler.span("store"):
+        pass
+    assert "store" not in profiler.stats()["spans_seconds"]
+
+
+@pytest.fixture
+def admin_client(client, monkeypatch):
+    monkeypatch.setattr("nds_crawler_svc.config.ADMIN_TOKEN", "secret")
+    client.headers["X-Admin-Token"] = "secret"
+    return client
+
+
+def test_debug_profile_endpoint(admin_client):
+    response = admin_client.post("/debug/profile", json={"spans": False, "reset": True})
+    assert response.status_code == 200
+    assert response.json()["settings"]["spans"] is False
+
+    response = admin_client.get("/debug/profile")
+    assert response.status_code == 200
+    assert response.json()["spans_seconds"] == {}
+
+    response = admin_client.post("/debug/profile", json={"spans": True, "slow_callback_threshold": 0})
+    assert response.status_code == 422
+
+    admin_client.post("/debug/profile", json={"spans": True})
+
+
+def test_cpu_profile_collapsed_stacks(admin_client):
+    response = admin_client.post("/debug/cpu-profile", params={"seconds": 0.05, "interval": 0.005})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert ";" in stack
+
+
+def test_cpu_profile_pstats(admin_client):
+    response = admin_client.post("/debug/cpu-profile", params={"seconds": 0.05, "format": "pstats"})
+    assert response.status_code == 200
+    assert "function calls" in response.text
+
+
+def test_cpu_profile_runs_one_at_a_time(admin_client, monkeypatch):
+    from nds_crawler_svc.profiling import cpu_profiler
+    monkeypatch.setattr(cpu_profiler, "running", True)
+    response = admin_client.post("/debug/cpu-profile", params={"seconds": 0.05})
+    assert response.status_code == 409
+
+
+def test_memory_snapshot_and_diff(admin_client):
+    assert admin_client.get("/debug/memory/snapshot").status_code == 409
+
+    assert admin_client.post("/debug/memory/start", params={"nframes": 5}).status_code == 200
+    try:
+        first = admin_client.get("/debug/memory/snapshot", params={"top": 5}).json()
+        assert first["diff"] is False
+        assert len(first["top"]) <= 5
+        assert first["pending_tasks"] >= 1
+
+        retained = [bytearray(1024) for _ in range(1000)]
+        second = admin_client.get("/debug/memory/snapshot", params={"diff": True, "top": 5}).json()
+        assert second["diff"] is True
+        assert any(site["size_diff_bytes"] > 0 for site in second["top"])
+        del retained
+    finally:
+        admin_client.post("/debug/memory/stop")
+
+
+def test_debug_endpoints_require_admin_token(client, monkeypatch):
+    # Without a configured token the endpoints do not exist
+    monkeypatch.setattr("nds_crawler_svc.config.ADMIN_TOKEN", "")
+    assert client.get("/debug/profile").status_code == 404
+    assert client.post("/debug/cpu-profile", params={"seconds": 0.05}).status_code == 404
+
+    monkeypatch.setattr("nds_crawler_svc.config.ADMIN_TOKEN", "secret")
+    assert client.get("/debug/profile").status_code == 403
+    assert client.get("/debug/profile", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/debug/profile", headers={"X-Admin-Token": "secret"}).status_code == 200
@@ -0,0 +1,108 @@
+import asyncio
+import datetime
+
+from nds_crawler_svc.config import RECRAWL_INITIAL_INTERVAL, RECRAWL_MAX_INTERVAL, RECRAWL_MIN_INTERVAL
+from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+from nds_crawler_svc.service import recrawl
+from nds_crawler_svc.service.recrawl import claim_due_recrawls, estimate_revisit_interval, record_crawl
+from nds_crawler_svc import tasks
+
+DAY = 24 * 3600
+
+
+def test_estimate_without_history():
+    assert estimate_revisit_interval(1, 0, 0) == RECRAWL_INITIAL_INTERVAL
+
+
+def test_estimate_never_changing_page():
+    assert estimate_revisit_interval(10, 0, 9 * DAY) == RECRAWL_MAX_INTERVAL
+
+
+def test_estimate_frequently_changing_page():
+    # Changed on every daily visit: revisit more often than daily, within bounds
+    interval = estimate_revisit_interval(10, 9, 9 * DAY)
+    assert RECRAWL_MIN_INTERVAL <= interval < DAY
+
+
+def test_estimate_is_monotonic_in_change_count():
+    intervals = [estimate_revisit_interval(11, changes, 10 * DAY) for changes in range(0, 11)]
+    assert intervals == sorted(intervals, reverse=True)
+
+
+def test_record_crawl_tracks_changes(db_session):
+    start = datetime.datetime(2026, 1, 1)
+    url = "http://example.com/news"
+
+    entry = record_crawl(url, "hash-a", db_session, now=start)
+    assert entry.crawl_count == 1
+    assert entry.next_crawl_at == start + datetime.timedelta(seconds=RECRAWL_INITIAL_INTERVAL)
+
+    record_crawl(url, "hash-a", db_session, now=start + datetime.timedelta(days=1))
+    entry = record_crawl(url, "hash-b", db_session, now=start + datetime.timedelta(days=2))
+
+    assert entry.crawl_count == 3
+    assert entry.change_count == 1
+    assert entry.next_crawl_at == entry.last_crawled_at + datetime.timedelta(seconds=entry.revisit_interval)
+    assert db_session.query(UrlRevisitSchedule).count() == 1
+
+
+def test_claim_due_recrawls(db_session):
+    now = datetime.datetime(2026, 1, 10)
+    for i, offset in enumerate([-3, -1, -2, 5]):
+        record_crawl(f"http://example.com/{i}", "hash", db_session, now=now)
+        entry = db_session.query(UrlRevisitSchedule).filter_by(url=f"http://example.com/{i}").one()
+        entry.next_crawl_at = now + datetime.timedelta(hours=offset)
+    db_session.commit()
+
+    due = claim_due_recrawls(db_session, limit=2, now=now)
+
+    # Earliest due first, limited, and the future entry is not due
+    assert due == ["http://example.com/0", "http://example.com/2"]
+    # Claimed URLs are pushed back so the next poll skips them
+    assert claim_due_recrawls(db_session, limit=10, now=now) == ["http://example.com/1"]
+
+
+def test_enqueue_due_recrawls(session_local, monkeypatch):
+    session = session_local()
+    crawled_at = datetime.datetime.utcnow() - datetime.timedelta(days=2)
+    record_crawl("http://example.com/due", "hash", session, now=crawled_at)
+    record_crawl("http://example.com/also-due", "hash", session, now=crawled_at)
+    session.close()
+    monkeypatch.setattr(tasks, "SessionLocal", session_local)
+
+    crawls = []
+    async def fake_start_crawling_job(url, **kwargs):
+        crawls.append((url, kwargs))
+    submitted = []
+    monkeypatch.setattr(tasks, "start_crawling_job", fake_start_crawling_job)
+    monkeypatch.setattr(tasks.asyncio, "run_coroutine_threadsafe", lambda coro, loop: submitted.append((coro, loop)))
+
+    tasks.enqueue_due_recrawls(loop="loop")
+
+    assert len(submitted) == 1
+    coro, loop = submitted[0]
+    assert loop == "loop"
+    asyncio.run(coro)
+    assert sorted(url for url, _ in crawls) == ["http://example.com/also-due", "http://example.com/due"]
+    # One job per poll, refreshing only the pages themselves
+    assert len({kwargs["job_id"] for _, kwargs in crawls}) == 1
+    for _, kwargs in crawls:
+        assert kwargs["recrawl"] is True
+        assert kwargs["policy"].max_depth == 0
+
+
+def test_urls_not_linked_for_long_expire(db_session, monkeypatch):
+    monkeypatch.setattr(recrawl, "RECRAWL_EXPIRY", 50 * DAY)
+    start = datetime.datetime(2026, 1, 1)
+    record_crawl("http://example.com/linked", "hash", db_session, now=start)
+    record_crawl("http://example.com/orphan", "hash", db_session, now=start)
+    # Scheduled re-crawls keep the orphan alive for a while but do not count as links
+    entry = record_crawl("http://example.com/orphan", "hash", db_session, now=start + datetime.timedelta(days=20),
+                         recrawl=True)
+    assert entry.last_linked_at == start
+    record_crawl("http://example.com/linked", "hash", db_session, now=start + datetime.timedelta(days=20))
+
+    due = claim_due_recrawls(db_session, limit=10, now=start + datetime.timedelta(days=60))
+
+    assert due == ["http://example.com/linked"]
+    assert db_session.query(UrlRevisitSchedule).filter_by(url="http://example.com/orphan").count() == 0
@@ -0,0 +1,80 @@
+import datetime
+
+import httpx
+import pytest
+
+from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
+from nds_crawler_svc.service import redirects
+from nds_crawler_svc.service.deduplication import is_recently_crawled, mark_crawled
+from nds_crawler_svc.service.redirects import RedirectCache, redirect_chain
+
+
+async def fetch(url, routes):
+    def handler(request):
+        target = routes.get(str(request.url))
+        if target is None:
+            return httpx.Response(200, text="ok")
+        return httpx.Response(target[0], headers={"Location": target[1]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True) as client:
+        return await client.get(url)
+
+
+@pytest.mark.asyncio
+async def test_redirect_chain_and_permanent_hops_are_cached():
+    routes = {
+        "http://example.com/a": (301, "http://example.com/b"),
+        "http://example.com/b": (308, "http://example.com/final"),
+    }
+    response = await fetch("http://example.com/a", routes)
+    assert redirect_chain("http://example.com/a", response) == [
+        "http://example.com/a", "http://example.com/b", "http://example.com/final",
+    ]
+
+    cache = RedirectCache(max_entries=10, ttl=60)
+    cache.record(response)
+    assert cache.resolve("http://example.com/a") == "http://example.com/final"
+    assert cache.resolve("http://example.com/b") == "http://example.com/final"
+    assert cache.resolve("http://example.com/other") == "http://example.com/other"
+    assert cache.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_temporary_hops_are_not_cached():
+    routes = {
+        "http://example.com/a": (301, "http://example.com/b"),
+        "http://example.com/b": (302, "http://example.com/today"),
+    }
+    cache = RedirectCache(max_entries=10, ttl=60)
+    cache.record(await fetch("http://example.com/a", routes))
+
+    # /a only leads to /today through a temporary redirect
+    assert cache.resolve("http://example.com/a") == "http://example.com/a"
+    assert cache.resolve("http://example.com/b") == "http://example.com/b"
+
+
+@pytest.mark.asyncio
+async def test_cache_entries_expire_and_are_bounded(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(redirects.time, "monotonic", lambda: now[0])
+    cache = RedirectCache(max_entries=1, ttl=60)
+    cache.record(await fetch("http://example.com/a", {"http://example.com/a": (301, "http://example.com/x")}))
+    cache.record(await fetch("http://example.com/b", {"http://example.com/b": (301, "http://example.com/y")}))
+
+    assert cache.resolve("http://example.com/a") == "http://example.com/a"
+    assert cache.resolve("http://example.com/b") == "http://example.com/y"
+    now[0] += 60
+    assert cache.resolve("http://example.com/b") == "http://example.com/b"
+
+
+def test_mark_crawled_upserts_every_url(db_session):
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=10)
+    db_session.add(RecentlyCrawledUrl(url="http://example.com/a", crawl_timestamp=old))
+    db_session.commit()
+
+    marked = mark_crawled(["http://example.com/a", "http://example.com/final", "http://example.com/a"], db_session)
+
+    assert marked == 2
+    assert is_recently_crawled("http://example.com/a", db_session)
+    assert is_recently_crawled("http://example.com/final", db_session)
+    assert db_session.query(RecentlyCrawledUrl).count() == 2
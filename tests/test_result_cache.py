@@ -0,0 +1,71 @@
+from nds_crawler_svc import result_cache
+from nds_crawler_svc.result_cache import ResultPageCache
+
+
+def test_get_and_put():
+    cache = ResultPageCache(max_bytes=1024)
+    cache.put("job", ("job", 1), '"etag"', b"body")
+
+    assert cache.get(("job", 1)) == ('"etag"', b"body")
+    assert cache.get(("job", 2)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResultPageCache(max_bytes=10)
+    cache.put("job", "a", '"a"', b"aaaa")
+    cache.put("job", "b", '"b"', b"bbbb")
+    # Touch "a" so that "b" becomes the least recently used entry
+    cache.get("a")
+    cache.put("job", "c", '"c"', b"cccc")
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_entries_are_not_cached():
+    cache = ResultPageCache(max_bytes=4)
+    cache.put("job", "a", '"a"', b"too large")
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_bump_generation_invalidates_job():
+    cache = ResultPageCache(max_bytes=1024)
+    cache.put("job1", "a", '"a"', b"a")
+    cache.put("job2", "b", '"b"', b"b")
+
+    cache.bump_generation("job1")
+
+    assert cache.generation("job1") == 1
+    assert cache.generation("job2") == 0
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_generation_is_forgotten_with_the_last_cached_page():
+    cache = ResultPageCache(max_bytes=4)
+    cache.bump_generation("job1")
+    cache.put("job1", "a", '"a"', b"aaaa")
+    cache.put("job2", "b", '"b"', b"bbbb")
+
+    assert cache.generation("job1") == 0
+    assert cache._generations == {}
+
+
+def test_idle_generations_are_bounded(monkeypatch):
+    monkeypatch.setattr(result_cache, "MAX_IDLE_GENERATIONS", 2)
+    cache = ResultPageCache(max_bytes=1024)
+    cache.bump_generation("read")
+    cache.put("read", "a", '"a"', b"a")
+    for job_id in ("job1", "job2", "job3", "job4"):
+        cache.bump_generation(job_id)
+
+    # The oldest jobs without cached pages are forgotten; jobs with cached pages are kept
+    assert list(cache._generations) == ["read", "job3", "job4"]
+    assert cache.generation("read") == 1
@@ -1,7 +1,9 @@
 import os
+import gzip
 import json
 import pytest
 from nds_crawler_svc.app import app
+from nds_crawler_svc.result_cache import result_cache
 
 # The client fixture from conftest.py will be used in tests
 
@@ -34,6 +36,7 @@ def setup_data_dir(tmp_path):
     # Change the current working directory to tmp_path so that the API looks for the 'data' folder there
     original_cwd = os.getcwd()
     os.chdir(tmp_path)
+    result_cache.clear()
     yield
     os.chdir(original_cwd)
 
@@ -76,3 +79,145 @@ def test_malformed_json_handling(client):
     response = client.get("/results/testjob")
     data = response.json()
     assert len(data["results"]) == 3
+
+
+def test_limit_parameter(client):
+    response = client.get("/results/testjob?limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == 2
+    assert data["total_pages"] == 2
+    # The cursor points at the last record of the page
+    assert data["next_cursor"] == "20231010110000"
+
+
+def test_cursor_pagination(client):
+    first = client.get("/results/testjob?limit=2").json()
+    response = client.get(f"/results/testjob?limit=2&cursor={first['next_cursor']}")
+    assert response.status_code == 200
+    data = response.json()
+    # Only the oldest valid record remains; the malformed one is skipped
+    assert len(data["results"]) == 1
+    assert data["next_cursor"] is None
+    # Keyset pages do not report offset pagination fields
+    assert "total_pages" not in data
+
+
+def test_cursor_past_end(client):
+    response = client.get("/results/testjob?cursor=1")
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+
+def test_fields_projection(client):
+    response = client.get("/results/testjob?fields=url,title")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == 3
+    for result in data["results"]:
+        assert result == {"url": "http://example.com", "title": "Example"}
+
+
+def test_invalid_fields_projection(client):
+    response = client.get("/results/testjob?fields=url,links")
+    assert response.status_code == 400
+
+
+def test_limit_out_of_range(client):
+    response = client.get("/results/testjob?limit=0")
+    assert response.status_code == 422
+
+
+def test_compressed_records_are_readable(client):
+    record = {
+        "url": "http://example.com/gz",
+        "title": "Compressed",
+        "metadata": {},
+        "content": "Compressed content"
+    }
+    with open(os.path.join("data", "testjob", "20231010130000.json.gz"), "wb") as f:
+        f.write(gzip.compress(json.dumps(record).encode("utf-8")))
+
+    response = client.get("/results/testjob")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == 4
+    # The compressed record is the newest one
+    assert data["results"][0] == record
+
+
+def test_etag_not_modified(client):
+    response = client.get("/results/testjob")
+    etag = response.headers["etag"]
+
+    cached = client.get("/results/testjob", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    other_page = client.get("/results/testjob?limit=1", headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+
+def test_cached_page_is_served(client, monkeypatch):
+    first = client.get("/results/testjob")
+
+    def fail_load(*args, **kwargs):
+        raise AssertionError("cached page should not read records")
+    monkeypatch.setattr("nds_crawler_svc.routers.results._load_record", fail_load)
+
+    second = client.get("/results/testjob")
+    assert second.status_code == 200
+    assert second.content == first.content
+
+
+def test_store_invalidates_cached_page(client):
+    from nds_crawler_svc.storage import store_crawled_data
+
+    first = client.get("/results/testjob")
+    store_crawled_data("testjob", {
+        "url": "http://example.com/new",
+        "title": "New",
+        "metadata": {},
+        "content": "New content"
+    })
+
+    response = client.get("/results/testjob", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 4
+
+
+def test_offset_page_reads_only_its_records(client, monkeypatch):
+    from nds_crawler_svc.routers import results
+
+    loaded = []
+    original = results._load_record
+
+    def tracking_load(file_path, fields):
+        loaded.append(os.path.basename(file_path))
+        return original(file_path, fields)
+    monkeypatch.setattr("nds_crawler_svc.routers.results._load_record", tracking_load)
+
+    data = client.get("/results/testjob?limit=2&page=2").json()
+    # Totals come from the record keys, malformed records included
+    assert data["total_pages"] == 2
+    assert loaded == ["20231010100000.json", "20231010090000.json"]
+    assert len(data["results"]) == 1
+
+
+def test_fields_projection_reads_the_header(client, monkeypatch):
+    from nds_crawler_svc.storage import store_crawled_data
+
+    store_crawled_data("testjob", {
+        "url": "http://example.com/new",
+        "title": "New",
+        "metadata": {},
+        "content": "New content"
+    })
+
+    def fail_read(*args, **kwargs):
+        raise AssertionError("projection should not decode the record")
+    monkeypatch.setattr("nds_crawler_svc.storage.read_crawled_data", fail_read)
+
+    response = client.get("/results/testjob?fields=url,title&limit=1")
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"url": "http://example.com/new", "title": "New"}]
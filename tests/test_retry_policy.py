@@ -0,0 +1,219 @@
+import socket
+
+import httpx
+import pytest
+
+from nds_crawler_svc.service import retry_policy as rp
+from nds_crawler_svc.service.retry_policy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HostCircuitBreakers,
+    RetryPolicy,
+    is_retryable_error,
+    is_retryable_status,
+    parse_retry_after,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class ScriptedClient:
+    """Returns (or raises) the scripted outcomes in order and records each call's headers."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append(kwargs.get("headers"))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(rp.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def make_policy(max_attempts=3, threshold=5):
+    return RetryPolicy(HostCircuitBreakers(threshold, 60, 10), max_attempts, base_delay=0.1, max_delay=5)
+
+
+def test_status_classification():
+    assert is_retryable_status(503)
+    assert is_retryable_status(429)
+    assert not is_retryable_status(404)
+    assert not is_retryable_status(301)
+
+
+def test_error_classification():
+    assert is_retryable_error(httpx.ReadTimeout("timeout"))
+    assert is_retryable_error(httpx.ConnectError("refused"))
+    assert not is_retryable_error(httpx.RequestError("generic"))
+
+    try:
+        try:
+            raise socket.gaierror("Name or service not known")
+        except socket.gaierror as e:
+            raise httpx.ConnectError("dns failure") from e
+    except httpx.ConnectError as dns_error:
+        assert not is_retryable_error(dns_error)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_circuit_breaker_transitions(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rp.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    now[0] += 10
+    # A single probe is allowed after the cool-down
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_status(sleeps):
+    client = ScriptedClient([FakeResponse(503), FakeResponse(200)])
+    policy = make_policy()
+
+    response = await policy.fetch(client, "http://example.com", headers={"User-Agent": "crawler"})
+
+    assert response.status_code == 200
+    # Retries repeat the request as-is
+    assert client.calls == [{"User-Agent": "crawler"}, {"User-Agent": "crawler"}]
+    assert len(sleeps) == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_is_not_held_while_waiting_to_retry(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    events = []
+
+    async def fake_sleep(delay):
+        events.append("sleep")
+    monkeypatch.setattr(rp.asyncio, "sleep", fake_sleep)
+
+    @asynccontextmanager
+    async def slot():
+        events.append("acquire")
+        yield
+        events.append("release")
+
+    client = ScriptedClient([FakeResponse(503), FakeResponse(200)])
+    await make_policy().fetch(client, "http://example.com", slot=slot)
+
+    assert events == ["acquire", "release", "sleep", "acquire", "release"]
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_permanent_status(sleeps):
+    client = ScriptedClient([FakeResponse(404)])
+
+    response = await make_policy().fetch(client, "http://example.com")
+
+    assert response.status_code == 404
+    assert len(client.calls) == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_dns_failure(sleeps):
+    client = ScriptedClient([httpx.RequestError("unknown host")])
+
+    with pytest.raises(httpx.RequestError):
+        await make_policy().fetch(client, "http://example.com")
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_respects_retry_after(sleeps):
+    client = ScriptedClient([FakeResponse(429, {"retry-after": "3"}), FakeResponse(200)])
+
+    await make_policy().fetch(client, "http://example.com")
+
+    assert sleeps[0] >= 3
+
+
+@pytest.mark.asyncio
+async def test_gives_up_when_retry_after_exceeds_max_delay(sleeps):
+    client = ScriptedClient([FakeResponse(503, {"retry-after": "3600"})])
+
+    response = await make_policy().fetch(client, "http://example.com")
+
+    assert response.status_code == 503
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_refuses_requests(sleeps):
+    policy = make_policy(max_attempts=2, threshold=2)
+    client = ScriptedClient([FakeResponse(500), FakeResponse(500)])
+    await policy.fetch(client, "http://example.com/a")
+
+    with pytest.raises(CircuitOpenError):
+        await policy.fetch(client, "http://example.com/b")
+    # The tripped host received no further requests
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_does_not_wedge_the_breaker(monkeypatch):
+    import asyncio
+
+    now = [1000.0]
+    monkeypatch.setattr(rp.time, "monotonic", lambda: now[0])
+    policy = make_policy(max_attempts=1, threshold=1)
+    breaker = policy.breakers.get("example.com")
+    breaker.record_failure()
+    now[0] += 60
+
+    class HangingClient:
+        async def get(self, url, **kwargs):
+            await asyncio.Event().wait()
+
+    probe = asyncio.ensure_future(policy.fetch(HangingClient(), "http://example.com"))
+    await asyncio.sleep(0)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    # The next request gets to probe the host
+    assert breaker.allow_request()
+
+
+def test_parking_is_bounded():
+    breakers = HostCircuitBreakers(5, 60, parked_per_host=1)
+
+    assert breakers.park("example.com", "http://example.com/a", 1)
+    assert not breakers.park("example.com", "http://example.com/b", 1)
+    assert breakers.drain_parked("example.com") == [("http://example.com/a", 1, {})]
+    assert breakers.drain_parked("example.com") == []
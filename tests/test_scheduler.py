@@ -23,11 +23,50 @@ def override_cleanup(monkeypatch):
 
 
 def test_startup_event_schedules_cleanup():
-    # Run the asynchronous startup_event
-    asyncio.run(startup_event())
+    async def start():
+        await startup_event()
+        # The immediate cleanup runs in the background after start-up
+        await app.state.boot_maintenance
+
+    asyncio.run(start())
     # Check that dummy_cleanup was called during startup_event (immediate cleanup invocation)
     assert dummy_cleanup.called, "cleanup_old_data was not invoked during startup_event"
     # Verify that the scheduler is attached to the app state
     assert hasattr(app.state, "scheduler"), "Scheduler not attached to app.state"
     # Shutdown scheduler after test to clean up
     app.state.scheduler.shutdown()
+
+
+
+def test_startup_does_not_wait_for_boot_cleanup(monkeypatch):
+    import threading
+
+    release = threading.Event()
+
+    def slow_cleanup():
+        release.wait(5)
+        slow_cleanup.called = True
+
+    slow_cleanup.called = False
+    monkeypatch.setattr("nds_crawler_svc.app.cleanup_old_data", slow_cleanup)
+
+    async def start():
+        await startup_event()
+        # Ready while the cleanup is still running
+        assert app.state.ready
+        assert not app.state.boot_maintenance.done()
+        release.set()
+        await app.state.boot_maintenance
+
+    asyncio.run(start())
+    assert slow_cleanup.called
+    app.state.scheduler.shutdown()
+
+
+def test_ready_endpoint(client):
+    assert client.get("/ready").json() == {"status": "ready"}
+    app.state.ready = False
+    try:
+        assert client.get("/ready").status_code == 503
+    finally:
+        app.state.ready = True
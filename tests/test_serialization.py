@@ -0,0 +1,30 @@
+import pytest
+
+from nds_crawler_svc import serialization
+
+
+@pytest.mark.parametrize("backend", list(serialization.BACKENDS))
+def test_backend_roundtrip(backend):
+    dumps, loads = serialization.BACKENDS[backend]
+    data = {"url": "http://example.com", "links": ["http://example.com/ä"], "metadata": {"n": 1}}
+
+    encoded = dumps(data)
+
+    assert isinstance(encoded, bytes)
+    assert loads(encoded) == data
+    assert loads(encoded.decode("utf-8")) == data
+
+
+@pytest.mark.parametrize("backend", list(serialization.BACKENDS))
+def test_backend_error_types(backend):
+    dumps, loads = serialization.BACKENDS[backend]
+
+    with pytest.raises(TypeError):
+        dumps({"key": lambda x: x})
+    with pytest.raises(ValueError):
+        loads(b"{malformed json")
+
+
+def test_stdlib_json_always_available():
+    assert "json" in serialization.BACKENDS
+    assert serialization.BACKEND in serialization.BACKENDS
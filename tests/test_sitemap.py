@@ -0,0 +1,187 @@
+import datetime
+import gzip
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+from nds_crawler_svc.models.url_revisit_schedule import UrlRevisitSchedule
+from nds_crawler_svc.service.frontier import SEED_CASH, CrawlFrontier
+from nds_crawler_svc.service.sitemap import ingest_sitemaps, parse_lastmod
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+IMAGE_NS = 'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"'
+
+INDEX = f"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex {NS}>
+  <sitemap><loc>http://example.com/pages.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+PAGES = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS} {IMAGE_NS}>
+  <url><loc>http://example.com/new</loc><lastmod>2026-02-01</lastmod></url>
+  <url><loc>http://example.com/unchanged</loc><lastmod>2026-01-01T00:00:00+00:00</lastmod></url>
+  <url>
+    <loc>http://example.com/gallery</loc>
+    <image:image><image:loc>http://example.com/photo.jpg</image:loc></image:image>
+  </url>
+  <url><loc>http://other.com/foreign</loc></url>
+</urlset>"""
+
+
+def make_transport(robots_status=200):
+    def handler(request):
+        path = request.url.path
+        if path == "/robots.txt":
+            if robots_status != 200:
+                return httpx.Response(robots_status)
+            return httpx.Response(200, text="User-agent: *\nSitemap: http://example.com/index.xml\n")
+        if path == "/index.xml":
+            return httpx.Response(200, content=INDEX.encode())
+        if path == "/sitemap.xml":
+            return httpx.Response(200, content=PAGES.encode())
+        if path == "/pages.xml.gz":
+            return httpx.Response(200, content=gzip.compress(PAGES.encode()))
+        return httpx.Response(404)
+    return httpx.MockTransport(handler)
+
+
+def job_kwargs(policy=None):
+    return {"policy": policy, "job_id": "sitemap-job", "priority": "normal", "weight": 1.0}
+
+
+def test_parse_lastmod():
+    assert parse_lastmod("2026-02-01") == datetime.datetime(2026, 2, 1)
+    assert parse_lastmod("2026-02-01T10:00:00+02:00") == datetime.datetime(2026, 2, 1, 8)
+    assert parse_lastmod("yesterday") is None
+    assert parse_lastmod(None) is None
+
+
+@pytest.mark.asyncio
+async def test_ingest_follows_robots_index_and_gzip(monkeypatch, session_local):
+    session = session_local()
+    session.add(UrlRevisitSchedule(
+        url="http://example.com/unchanged", content_hash="h",
+        first_crawled_at=datetime.datetime(2026, 1, 5), last_crawled_at=datetime.datetime(2026, 1, 5),
+        last_linked_at=datetime.datetime(2026, 1, 5),
+        next_crawl_at=datetime.datetime(2026, 2, 5), crawl_count=1, change_count=0, revisit_interval=86400,
+    ))
+    session.commit()
+    session.close()
+    monkeypatch.setattr("nds_crawler_svc.service.sitemap.SessionLocal", session_local)
+
+    frontier = CrawlFrontier(workers=1)
+    queued = await ingest_sitemaps("http://example.com/", frontier, job_kwargs(), SEED_CASH,
+                                   transport=make_transport())
+
+    # Unchanged since its last crawl, foreign host and image URLs are left out
+    assert queued == 2
+    urls = sorted(frontier.pop()[0] for _ in range(2))
+    assert urls == ["http://example.com/gallery", "http://example.com/new"]
+    assert frontier.pop() is None
+
+
+@pytest.mark.asyncio
+async def test_ingest_falls_back_to_sitemap_xml_and_applies_policy():
+    from nds_crawler_svc.service.crawl_policy import CrawlPolicy
+
+    policy = CrawlPolicy(seeds=["http://example.com/"], deny=["gallery"])
+    frontier = CrawlFrontier(workers=1)
+    queued = await ingest_sitemaps("http://example.com/", frontier, job_kwargs(policy), SEED_CASH,
+                                   transport=make_transport(robots_status=404))
+
+    assert queued == 2
+    assert {frontier.pop()[0] for _ in range(2)} == {"http://example.com/new", "http://example.com/unchanged"}
+
+
+@pytest.mark.asyncio
+async def test_ingest_without_sitemaps_queues_nothing():
+    transport = httpx.MockTransport(lambda request: httpx.Response(404))
+    frontier = CrawlFrontier(workers=1)
+    assert await ingest_sitemaps("http://example.com/", frontier, job_kwargs(), SEED_CASH, transport=transport) == 0
+
+
+@pytest.mark.asyncio
+async def test_ingest_splits_the_cash_over_listed_entries(monkeypatch, session_local):
+    monkeypatch.setattr("nds_crawler_svc.service.sitemap.SessionLocal", session_local)
+    frontier = CrawlFrontier(workers=1)
+    await ingest_sitemaps("http://example.com/", frontier, job_kwargs(), 0.5, transport=make_transport())
+
+    # The index passes its cash to its only child, which lists three pages of the site
+    assert frontier._cash == pytest.approx({
+        "http://example.com/new": 0.5 / 3,
+        "http://example.com/unchanged": 0.5 / 3,
+        "http://example.com/gallery": 0.5 / 3,
+    })
+
+
+@pytest.mark.asyncio
+async def test_ingest_releases_the_slot_while_the_body_streams(monkeypatch):
+    held = []
+    held_while_streaming = []
+
+    @asynccontextmanager
+    async def slot(job_id, priority, weight):
+        held.append(job_id)
+        try:
+            yield
+        finally:
+            held.remove(job_id)
+
+    async def body():
+        held_while_streaming.append(bool(held))
+        yield PAGES.encode()
+
+    def handler(request):
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(200, content=body())
+        return httpx.Response(404)
+
+    monkeypatch.setattr("nds_crawler_svc.service.sitemap.crawl_scheduler.slot", slot)
+    frontier = CrawlFrontier(workers=1)
+    queued = await ingest_sitemaps("http://example.com/", frontier, job_kwargs(), SEED_CASH,
+                                   transport=httpx.MockTransport(handler))
+
+    assert queued == 3
+    assert held_while_streaming == [False]
+
+
+@pytest.mark.asyncio
+async def test_robots_txt_goes_through_the_slot_and_breaker(monkeypatch):
+    from nds_crawler_svc.service.retry_policy import HostCircuitBreakers, RetryPolicy
+
+    held = []
+    requested = []
+
+    @asynccontextmanager
+    async def slot(job_id, priority, weight):
+        held.append(job_id)
+        try:
+            yield
+        finally:
+            held.remove(job_id)
+
+    def handler(request):
+        return httpx.Response(404)
+
+    async def recording_get(self, url, **kwargs):
+        requested.append((url, bool(held)))
+        return await original_get(self, url, **kwargs)
+
+    breakers = HostCircuitBreakers(1, 60, 10)
+    monkeypatch.setattr("nds_crawler_svc.service.sitemap.retry_policy", RetryPolicy(breakers, 1, 0, 0))
+    monkeypatch.setattr("nds_crawler_svc.service.sitemap.crawl_scheduler.slot", slot)
+    original_get = httpx.AsyncClient.get
+    monkeypatch.setattr(httpx.AsyncClient, "get", recording_get)
+
+    frontier = CrawlFrontier(workers=1)
+    await ingest_sitemaps("http://example.com/", frontier, job_kwargs(), SEED_CASH,
+                          transport=httpx.MockTransport(handler))
+    assert requested == [("http://example.com/robots.txt", True)]
+
+    # With the host's breaker open robots.txt is not requested, and /sitemap.xml is tried
+    breakers.get("example.com").record_failure()
+    requested.clear()
+    await ingest_sitemaps("http://example.com/", frontier, job_kwargs(), SEED_CASH,
+                          transport=httpx.MockTransport(handler))
+    assert requested == []
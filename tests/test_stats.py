@@ -0,0 +1,12 @@
+from nds_crawler_svc.stats import percentile
+
+
+def test_percentile():
+    samples = [5, 1, 4, 2, 3]
+    assert percentile(samples, 0.5) == 3
+    assert percentile(samples, 0.99) == 5
+    assert percentile(samples, 0.0) == 1
+
+
+def test_percentile_of_no_samples():
+    assert percentile([], 0.5) == 0.0
@@ -2,8 +2,16 @@ import os
 import json
 import pytest
 import datetime
+import logging
 
-from nds_crawler_svc.storage import store_crawled_data, STORAGE_DIR
+from nds_crawler_svc.storage import (
+    STORAGE_DIR,
+    read_crawled_data,
+    read_record_header,
+    record_key,
+    store_crawled_data,
+    train_compression_dictionary,
+)
 
 
 # Fixture to override the STORAGE_DIR to a temporary directory during tests
@@ -62,3 +70,91 @@ def test_store_crawled_data_file_write_error(monkeypatch):
 
     result = store_crawled_data(job_id, data)
     assert "Error: failed to write data to file" in result
+
+
+def test_store_crawled_data_gzip_roundtrip(monkeypatch):
+    monkeypatch.setattr("nds_crawler_svc.storage.COMPRESSION", "gzip")
+    data = {"url": "http://example.com", "links": ["http://example.com/a"] * 50}
+
+    result = store_crawled_data("test_job", data)
+
+    assert result.endswith(".json.gz")
+    with open(result, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    assert read_crawled_data(result) == data
+
+
+def test_store_crawled_data_zstd_roundtrip(monkeypatch):
+    pytest.importorskip("zstandard")
+    monkeypatch.setattr("nds_crawler_svc.storage.COMPRESSION", "zstd")
+    data = {"url": "http://example.com", "links": ["http://example.com/a"] * 50}
+
+    result = store_crawled_data("test_job", data)
+
+    assert result.endswith(".json.zst")
+    assert read_crawled_data(result) == data
+
+
+def test_store_crawled_data_zstd_falls_back_to_gzip(monkeypatch, caplog):
+    monkeypatch.setattr("nds_crawler_svc.storage.COMPRESSION", "zstd")
+    monkeypatch.setattr("nds_crawler_svc.storage.zstandard", None)
+
+    monkeypatch.setattr("nds_crawler_svc.storage._fallbacks_logged", set())
+
+    with caplog.at_level(logging.WARNING):
+        result = store_crawled_data("test_job", {"key": "value"})
+        store_crawled_data("test_job", {"key": "other value"})
+
+    assert result.endswith(".json.gz")
+    assert read_crawled_data(result) == {"key": "value"}
+    # The fallback is logged once, not for every record
+    assert sum("zstandard is not installed" in message for message in caplog.messages) == 1
+
+
+def test_zstd_dictionary_roundtrip(tmp_path, monkeypatch):
+    pytest.importorskip("zstandard")
+    samples = [
+        {"url": f"http://example.com/{i}", "links": [f"http://example.com/{i}/{j}" for j in range(i % 7)]}
+        for i in range(500)
+    ]
+    dict_path = train_compression_dictionary(samples, str(tmp_path / "records.dict"), dict_size=4096)
+    monkeypatch.setattr("nds_crawler_svc.storage.COMPRESSION", "zstd")
+    monkeypatch.setattr("nds_crawler_svc.storage.ZSTD_DICT_PATH", dict_path)
+
+    result = store_crawled_data("test_job", samples[3])
+
+    assert read_crawled_data(result) == samples[3]
+
+
+def test_record_key():
+    assert record_key("20231010120000.json") == "20231010120000"
+    assert record_key("20231010120000.json.gz") == "20231010120000"
+    assert record_key("20231010120000.json.zst") == "20231010120000"
+    assert record_key("notes.txt") is None
+
+
+def test_record_header_is_stored_uncompressed(monkeypatch):
+    monkeypatch.setattr("nds_crawler_svc.storage.COMPRESSION", "gzip")
+    data = {"url": "http://example.com", "title": "Example", "metadata": {}, "content": "x" * 1000}
+    result = store_crawled_data("test_job", data)
+
+    assert read_record_header(result) == {"url": "http://example.com", "title": "Example", "metadata": {}}
+    assert record_key(os.path.basename(result).replace(".json.gz", ".head.json")) is None
+    # Records without header fields get no header
+    assert read_record_header(store_crawled_data("test_job", {"key": "value"})) is None
+
+
+def test_records_stored_in_the_same_microsecond_are_kept(tmp_path, monkeypatch):
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 1, 1, 12, 0, 0, 123456)
+
+    monkeypatch.setattr("nds_crawler_svc.storage.datetime.datetime", FrozenDatetime)
+    paths = [store_crawled_data("test_job", {"n": n}) for n in range(3)]
+
+    keys = [record_key(os.path.basename(path)) for path in paths]
+    assert keys == ["20260101120000123456", "20260101120000123456-001", "20260101120000123456-002"]
+    # Later records sort after earlier ones
+    assert sorted(keys) == keys
+    assert [read_crawled_data(path)["n"] for path in paths] == [0, 1, 2]
@@ -36,3 +36,41 @@ def test_new_url_submission(client):
     response = client.post("/submit_url", json={"url": url})
     assert response.status_code == 200
     assert "submitted" in response.json().get("message", "")
+
+
+def test_claim_url_is_granted_once(db_session):
+    from nds_crawler_svc.service.deduplication import claim_url, release_claim
+
+    url = "http://example.com/claimed"
+    claim = claim_url(url, db_session)
+    assert claim
+    # A second worker finds the URL taken
+    assert not claim_url(url, db_session)
+
+    release_claim(claim, db_session)
+    assert db_session.query(RecentlyCrawledUrl).filter_by(url=url).first() is None
+    assert claim_url(url, db_session)
+
+
+def test_claim_url_takes_over_expired_entry(db_session):
+    from nds_crawler_svc.service.deduplication import claim_url
+
+    url = "http://example.com/expired"
+    db_session.add(RecentlyCrawledUrl(url=url, crawl_timestamp=datetime.utcnow() - timedelta(days=10)))
+    db_session.commit()
+
+    assert claim_url(url, db_session)
+    assert not claim_url(url, db_session)
+
+
+def test_release_restores_a_taken_over_entry(db_session):
+    from nds_crawler_svc.service.deduplication import claim_url, release_claim
+
+    url = "http://example.com/expired-again"
+    crawled_at = datetime.utcnow() - timedelta(days=10)
+    db_session.add(RecentlyCrawledUrl(url=url, crawl_timestamp=crawled_at))
+    db_session.commit()
+
+    release_claim(claim_url(url, db_session), db_session)
+    db_session.expire_all()
+    assert db_session.query(RecentlyCrawledUrl).filter_by(url=url).one().crawl_timestamp == crawled_at
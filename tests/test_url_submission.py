@@ -29,6 +29,7 @@ def test_valid_submission(client, monkeypatch):
     assert response.status_code == 200
     data = response.json()
     assert data.get("message") == "URL submitted for crawling."
+    assert "job_id" in data
     # Verify that the crawling job was scheduled
     assert dummy_create_task.called is True
 
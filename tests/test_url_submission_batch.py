@@ -73,3 +73,53 @@ def test_valid_submission(monkeypatch, client):
     assert data.get("status") == "Crawling jobs initiated"
     # Only unique valid URLs should be scheduled: "http://example.com" and "https://example.org"
     assert dummy_create_task.called is True
+
+
+def test_invalid_policy(client):
+    response = client.post("/submit", json={"urls": ["http://example.com"], "policy": {"scope": "planet"}})
+    assert response.status_code == 400
+    assert "Invalid crawl policy" in response.json().get("detail", "")
+
+
+def test_submission_with_policy(monkeypatch, client):
+    calls = []
+    def fake_start_crawling_job(url, **kwargs):
+        calls.append((url, kwargs))
+        return asyncio.sleep(0)
+    monkeypatch.setattr("nds_crawler_svc.routers.url_submission_batch.start_crawling_job", fake_start_crawling_job)
+    policy = {"scope": "same_host", "deny": [r"/login"], "max_depth": 2, "max_pages": 50}
+    response = client.post("/submit", json={"urls": ["http://example.com"], "policy": policy})
+    assert response.status_code == 200
+    # The policy is passed to the scheduled crawl
+    assert len(calls) == 1
+    assert calls[0][1]["policy"].max_pages == 50
+
+
+@pytest.mark.parametrize("payload", [
+    {"urls": ["http://example.com"], "priority": "urgent"},
+    {"urls": ["http://example.com"], "weight": 0},
+    {"urls": ["http://example.com"], "weight": "heavy"},
+])
+def test_invalid_scheduling_options(client, payload):
+    response = client.post("/submit", json=payload)
+    assert response.status_code == 400
+
+
+def test_submission_scheduling_options(monkeypatch, client):
+    calls = []
+    def fake_start_crawling_job(url, **kwargs):
+        calls.append(kwargs)
+        return asyncio.sleep(0)
+    monkeypatch.setattr("nds_crawler_svc.routers.url_submission_batch.start_crawling_job", fake_start_crawling_job)
+    response = client.post("/submit", json={"urls": ["http://example.com"], "priority": "bulk", "weight": 2})
+    assert response.status_code == 200
+    assert calls[0]["priority"] == "bulk"
+    assert calls[0]["weight"] == 2.0
+    # Pages are stored under the returned job id
+    assert calls[0]["job_id"] == response.json()["job_id"]
+
+
+def test_submit_rejects_invalid_use_sitemaps(client):
+    response = client.post("/submit", json={"urls": ["http://example.com"], "use_sitemaps": "yes"})
+    assert response.status_code == 400
+    assert "use_sitemaps" in response.json()["detail"]
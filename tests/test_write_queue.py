@@ -0,0 +1,85 @@
+import concurrent.futures
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+from nds_crawler_svc.models.base import Base, configure_sqlite
+from nds_crawler_svc.models.recently_crawled_urls import RecentlyCrawledUrl
+from nds_crawler_svc.service.deduplication import claim_url, is_recently_crawled
+from nds_crawler_svc.write_queue import WriteQueue
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'crawler.db'}")
+    configure_sqlite(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def add_url(url, session):
+    session.add(RecentlyCrawledUrl(url=url))
+    session.commit()
+    return url
+
+
+def test_pragmas_are_applied(engine):
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -64 * 1024
+
+
+def test_writes_are_batched(engine):
+    writer = WriteQueue(lambda: engine, batch_size=50, max_wait=0.05)
+    try:
+        futures = [writer.submit(add_url, f"http://example.com/{i}") for i in range(100)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        writer.stop()
+
+    assert results == [f"http://example.com/{i}" for i in range(100)]
+    stats = writer.stats()
+    assert stats["writes"] == 100
+    assert stats["batches"] < 100
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM recently_crawled_urls")).scalar() == 100
+
+
+def test_failed_write_does_not_roll_back_its_batch(engine):
+    writer = WriteQueue(lambda: engine, batch_size=10, max_wait=0.05)
+    try:
+        futures = [writer.submit(add_url, url) for url in ("http://a.com/", "http://a.com/", "http://b.com/")]
+        concurrent.futures.wait(futures, timeout=5)
+    finally:
+        writer.stop()
+
+    assert futures[0].result() == "http://a.com/"
+    with pytest.raises(IntegrityError):
+        futures[1].result()
+    assert futures[2].result() == "http://b.com/"
+    assert writer.stats()["failures"] == 1
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM recently_crawled_urls")).scalar() == 2
+
+
+def test_claims_through_the_writer(engine):
+    from sqlalchemy.orm import sessionmaker
+
+    writer = WriteQueue(lambda: engine, batch_size=10, max_wait=0.01)
+    try:
+        first = writer.submit(claim_url, "http://example.com/page").result(timeout=5)
+        second = writer.submit(claim_url, "http://example.com/page").result(timeout=5)
+    finally:
+        writer.stop()
+
+    assert first and not second
+    session = sessionmaker(bind=engine)()
+    try:
+        assert is_recently_crawled("http://example.com/page", session)
+    finally:
+        session.close()